@@ -0,0 +1,3 @@
+from .loaders import load
+
+__all__ = ["load"]
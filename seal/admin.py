@@ -0,0 +1,224 @@
+import logging
+from functools import lru_cache
+
+from django.conf import settings
+from django.contrib.admin.views.main import ChangeList
+from django.db.models.constants import LOOKUP_SEP
+from django.db.models.fields import DeferredAttribute
+from django.db.models.fields.related import (
+    ForwardManyToOneDescriptor,
+    ReverseOneToOneDescriptor,
+)
+
+from .query import SealableQuerySet
+from .recording import record_unsealed_accesses
+
+logger = logging.getLogger("seal.admin")
+
+
+def get_object_paths(objs):
+    """
+    Map the id of objs and of the objects reachable from them through their
+    related fields and prefetched objects caches to a (path, selectable)
+    tuple where path is the lookup prefix leading to the object and
+    selectable whether it can be reached through select_related().
+    """
+    paths = {}
+    stack = [(obj, "", True) for obj in objs]
+    while stack:
+        obj, prefix, selectable = stack.pop()
+        if id(obj) in paths:
+            continue
+        paths[id(obj)] = (prefix, selectable)
+        for name, related_obj in obj._state.fields_cache.items():
+            if related_obj is not None:
+                stack.append((related_obj, prefix + name + LOOKUP_SEP, selectable))
+        prefetched_objects_cache = getattr(obj, "_prefetched_objects_cache", {})
+        for name, queryset in prefetched_objects_cache.items():
+            stack.extend(
+                (related_obj, prefix + name + LOOKUP_SEP, False)
+                for related_obj in queryset._result_cache or ()
+            )
+    return paths
+
+
+class ChangeListLookups:
+    """Lookups inferred from the unsealed accesses of changelist renders."""
+
+    def __init__(self, select_related=(), prefetch_related=(), fields=()):
+        self.select_related = frozenset(select_related)
+        self.prefetch_related = frozenset(prefetch_related)
+        self.fields = frozenset(fields)
+
+    def __repr__(self):
+        return "<ChangeListLookups select_related=%r prefetch_related=%r fields=%r>" % (
+            sorted(self.select_related),
+            sorted(self.prefetch_related),
+            sorted(self.fields),
+        )
+
+    def __bool__(self):
+        return bool(self.select_related or self.prefetch_related or self.fields)
+
+    def __or__(self, other):
+        return ChangeListLookups(
+            self.select_related | other.select_related,
+            self.prefetch_related | other.prefetch_related,
+            self.fields | other.fields,
+        )
+
+    @classmethod
+    def from_accesses(cls, objs, accesses):
+        """Infer lookups from the unsealed accesses performed on objs."""
+        paths = get_object_paths(objs)
+        select_related, prefetch_related, fields = set(), set(), set()
+        for access in accesses:
+            try:
+                prefix, selectable = paths[id(access.instance)]
+            except KeyError:
+                # Instance retrieved independently from the changelist.
+                continue
+            descriptor = getattr(access.instance.__class__, access.name, None)
+            path = prefix + access.name
+            if isinstance(descriptor, DeferredAttribute):
+                # Only the changelist model fields are ever deferred.
+                if not prefix:
+                    fields.add(access.name)
+            elif selectable and isinstance(
+                descriptor, (ForwardManyToOneDescriptor, ReverseOneToOneDescriptor)
+            ):
+                select_related.add(path)
+            else:
+                prefetch_related.add(path)
+        return cls(select_related, prefetch_related, fields)
+
+
+class SealableChangeListMixin:
+    def get_queryset(self, request, *args, **kwargs):
+        queryset = super().get_queryset(request, *args, **kwargs)
+        if isinstance(queryset, SealableQuerySet):
+            queryset = self.model_admin.get_sealed_changelist_queryset(
+                request, queryset, self.list_display
+            )
+        return queryset
+
+
+@lru_cache(maxsize=100)
+def _sealable_changelist_type_factory(changelist_cls):
+    if issubclass(changelist_cls, SealableChangeListMixin):
+        return changelist_cls
+    return type(
+        f"Sealable{changelist_cls.__name__}",
+        (SealableChangeListMixin, changelist_cls),
+        {},
+    )
+
+
+SealableChangeList = _sealable_changelist_type_factory(ChangeList)
+
+
+class SealableModelAdmin:
+    """
+    ModelAdmin mixin that seals changelist querysets and infers the
+    select_related(), prefetch_related() and optionally only() lookups their
+    list_display requires from the unsealed attribute accesses performed
+    while rendering them.
+    """
+
+    # Whether or not to restrict the fields of the changelist model that are
+    # loaded to the ones of list_display and the inferred ones.
+    seal_changelist_only = False
+    # Whether or not to log a report of unsealed attribute accesses and
+    # inferred lookups for each changelist render, defaults to DEBUG.
+    seal_changelist_report = None
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._seal_changelist_lookups = {}
+
+    def get_changelist(self, request, **kwargs):
+        changelist_cls = super().get_changelist(request, **kwargs)
+        return _sealable_changelist_type_factory(changelist_cls)
+
+    def get_seal_changelist_lookups(self, list_display):
+        """Return the inferred lookups for list_display."""
+        return self._seal_changelist_lookups.get(
+            tuple(list_display), ChangeListLookups()
+        )
+
+    def get_sealed_changelist_queryset(self, request, queryset, list_display):
+        lookups = self.get_seal_changelist_lookups(list_display)
+        select_related = sorted(lookups.select_related)
+        if select_related and queryset.query.select_related is True:
+            # Adding select_related() lookups would disable unrestricted
+            # select_related(), prefetch them instead.
+            queryset = queryset.prefetch_related(*select_related)
+        elif select_related:
+            queryset = queryset.select_related(*select_related)
+        if lookups.prefetch_related:
+            queryset = queryset.prefetch_related(*sorted(lookups.prefetch_related))
+        if self.seal_changelist_only:
+            opts = self.model._meta
+            fields = set(lookups.fields)
+            fields.update(
+                name.split(LOOKUP_SEP, 1)[0]
+                for name in select_related
+                if queryset.query.select_related is not True
+            )
+            fields.update(name for name in list_display if isinstance(name, str))
+            deferred = [
+                field.attname
+                for field in opts.concrete_fields
+                if not field.primary_key
+                and field.name not in fields
+                and field.attname not in fields
+            ]
+            if deferred:
+                queryset = queryset.defer(*deferred)
+        return queryset.seal()
+
+    def changelist_view(self, request, extra_context=None):
+        with record_unsealed_accesses() as accesses:
+            response = super().changelist_view(request, extra_context)
+        if getattr(response, "is_rendered", True):
+            self._learn_response_lookups(response, accesses)
+            return response
+        render = response.render
+
+        def recording_render():
+            # Keep the response lazy and record the accesses performed while
+            # its template is rendered, usually once the view returned. The
+            # wrapper is removed first to keep the response picklable.
+            del response.render
+            with record_unsealed_accesses() as render_accesses:
+                rendered = render()
+            self._learn_response_lookups(response, accesses + render_accesses)
+            return rendered
+
+        response.render = recording_render
+        return response
+
+    def _learn_response_lookups(self, response, accesses):
+        context_data = getattr(response, "context_data", None) or {}
+        changelist = context_data.get("cl")
+        if isinstance(changelist, SealableChangeListMixin):
+            self._learn_changelist_lookups(changelist, accesses)
+
+    def _learn_changelist_lookups(self, changelist, accesses):
+        key = tuple(changelist.list_display)
+        lookups = self.get_seal_changelist_lookups(key)
+        inferred = ChangeListLookups.from_accesses(changelist.result_list, accesses)
+        if inferred:
+            self._seal_changelist_lookups[key] = lookups | inferred
+        report = self.seal_changelist_report
+        if report is None:
+            report = settings.DEBUG
+        if report and accesses:
+            logger.warning(
+                "%d unsealed attribute accesses while rendering %s changelist, "
+                "inferred %r.",
+                len(accesses),
+                self.model._meta.label,
+                inferred,
+                extra={"accesses": accesses},
+            )
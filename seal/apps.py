@@ -1,4 +1,36 @@
+from fnmatch import fnmatchcase
+
 from django.apps import AppConfig, apps
+from django.conf import settings
+from django.core import checks
+
+
+def get_seal_models_patterns():
+    return [pattern.lower() for pattern in getattr(settings, "SEAL_MODELS", ())]
+
+
+def match_seal_models(model, patterns):
+    """
+    Return whether or not model is referenced by the SEAL_MODELS labels or
+    glob patterns.
+    """
+    label_lower = model._meta.concrete_model._meta.label_lower
+    return any(fnmatchcase(label_lower, pattern) for pattern in patterns)
+
+
+def check_seal_models(app_configs=None, **kwargs):
+    errors = []
+    models = apps.get_models()
+    for pattern in get_seal_models_patterns():
+        if not any(match_seal_models(model, [pattern]) for model in models):
+            errors.append(
+                checks.Warning(
+                    "SEAL_MODELS entry '%s' doesn't match any installed model."
+                    % pattern,
+                    id="seal.W001",
+                )
+            )
+    return errors
 
 
 class SealAppConfig(AppConfig):
@@ -6,7 +38,11 @@ class SealAppConfig(AppConfig):
 
     def ready(self):
         from .descriptors import make_contenttypes_sealable
-        from .models import SealableModel, make_model_sealable
+        from .models import (
+            SealableModel,
+            make_model_managers_sealable,
+            make_model_sealable,
+        )
 
         try:
             apps.get_app_config("contenttypes")
@@ -15,8 +51,22 @@ class SealAppConfig(AppConfig):
         else:
             make_contenttypes_sealable()
 
+        patterns = get_seal_models_patterns()
+        setting_models = [
+            model
+            for model in apps.get_models()
+            if not issubclass(model, SealableModel)
+            and match_seal_models(model, patterns)
+        ]
+        for model in setting_models:
+            if not model._meta.proxy:
+                make_model_sealable(model)
+            make_model_managers_sealable(model)
+
         for model in apps.get_models():
             opts = model._meta
             if opts.proxy or not issubclass(model, SealableModel):
                 continue
             make_model_sealable(model)
+
+        checks.register(check_seal_models)
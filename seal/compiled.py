@@ -0,0 +1,197 @@
+import threading
+from collections import OrderedDict, namedtuple
+from functools import lru_cache
+
+from django.core.exceptions import EmptyResultSet, FullResultSet
+
+CompiledQuery = namedtuple(
+    "CompiledQuery",
+    ["sql_prefix", "sql_suffix", "select", "klass_info", "annotation_col_map"],
+)
+
+
+class CompiledQueryCache:
+    """
+    Bounded cache of compiled sealed queries, keyed by their structural
+    fingerprint, that evicts the least recently used ones.
+    """
+
+    def __init__(self, maxsize=256):
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._entries)
+
+    @property
+    def hit_rate(self):
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+    def get(self, key):
+        with self._lock:
+            try:
+                entry = self._entries[key]
+            except KeyError:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry
+
+    def set(self, key, entry):
+        with self._lock:
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.hits = self.misses = 0
+
+
+compiled_query_cache = CompiledQueryCache()
+
+
+def _freeze_select_related(select_related):
+    if isinstance(select_related, dict):
+        return tuple(
+            sorted(
+                (name, _freeze_select_related(nested))
+                for name, nested in select_related.items()
+            )
+        )
+    return select_related
+
+
+def get_query_fingerprint(query, using):
+    """
+    Return a hashable fingerprint of everything but the WHERE clause that
+    determines the SQL a model query compiles to or None if the query has a
+    shape that cannot be cached.
+    """
+    if (
+        query.annotations
+        or query.extra
+        or query.extra_tables
+        or query.extra_order_by
+        or query.combinator
+        or query.group_by is not None
+        or query.distinct_fields
+        or query.select_for_update
+        or query.values_select
+        or query.select
+        or not query.default_cols
+        or query.subquery
+        or getattr(query, "_filtered_relations", None)
+    ):
+        return None
+    if not all(isinstance(ordering, str) for ordering in query.order_by):
+        return None
+    alias_refcount = query.alias_refcount
+    joins = tuple(
+        (
+            alias,
+            join.table_name,
+            getattr(join, "join_type", None),
+            getattr(join, "parent_alias", None),
+            getattr(join, "join_field", None),
+            # Compilation always uses the base table.
+            alias_refcount[alias] > 0 or getattr(join, "join_type", None) is None,
+        )
+        for alias, join in query.alias_map.items()
+    )
+    if not joins:
+        # Compilation sets up the base table alias, make sure queries
+        # fingerprint the same before and after their first compilation.
+        db_table = query.get_meta().db_table
+        joins = ((db_table, db_table, None, None, None, True),)
+    return (
+        query.model,
+        using,
+        joins,
+        bool(query.where),
+        _freeze_select_related(query.select_related),
+        query.max_depth,
+        frozenset(query.deferred_loading[0]),
+        query.deferred_loading[1],
+        query.order_by,
+        query.default_ordering,
+        query.standard_ordering,
+        query.low_mark,
+        query.high_mark,
+        query.distinct,
+    )
+
+
+def compile_query(compiler):
+    """
+    Compile the query of compiler into a CompiledQuery which SQL is split
+    around its WHERE clause or return None if it cannot be.
+    """
+    query = compiler.query
+    try:
+        sql, params = compiler.as_sql()
+    except (EmptyResultSet, FullResultSet):
+        return None
+    if query.where:
+        try:
+            where_sql, where_params = compiler.compile(query.where)
+        except (EmptyResultSet, FullResultSet):
+            return None
+        where = " WHERE " + where_sql
+        # Only the WHERE clause is allowed to have parameters.
+        if sql.count(where) != 1 or tuple(params) != tuple(where_params):
+            return None
+        end = sql.index(where) + len(where)
+        sql_prefix, sql_suffix = sql[: end - len(where_sql)], sql[end:]
+    elif params:
+        return None
+    else:
+        sql_prefix, sql_suffix = sql, ""
+    return CompiledQuery(
+        sql_prefix,
+        sql_suffix,
+        compiler.select,
+        compiler.klass_info,
+        compiler.annotation_col_map,
+    )
+
+
+@lru_cache(maxsize=100)
+def _cached_sql_compiler_type_factory(compiler_cls):
+    def as_sql(self, *args, **kwargs):
+        return self._cached_sql
+
+    return type(
+        f"CachedSQL{compiler_cls.__name__}", (compiler_cls,), {"as_sql": as_sql}
+    )
+
+
+def get_cached_sql_compiler(query, using, compiled):
+    """
+    Return a compiler of query that reuses the compiled SQL and only compiles
+    its WHERE clause or None if it can't be.
+    """
+    compiler = query.get_compiler(using=using)
+    if query.where:
+        try:
+            where_sql, params = compiler.compile(query.where)
+        except (EmptyResultSet, FullResultSet):
+            return None
+        sql = compiled.sql_prefix + where_sql + compiled.sql_suffix
+    else:
+        sql, params = compiled.sql_prefix, ()
+    compiler.__class__ = _cached_sql_compiler_type_factory(compiler.__class__)
+    compiler._cached_sql = (sql, tuple(params))
+    compiler.select = compiled.select
+    compiler.klass_info = compiled.klass_info
+    compiler.annotation_col_map = compiled.annotation_col_map
+    compiler.col_count = len(compiled.select)
+    compiler.has_extra_select = False
+    return compiler
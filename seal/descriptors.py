@@ -1,7 +1,10 @@
+import sys
 import warnings
 from functools import lru_cache
 
-from django.db.models import QuerySet
+from django.db import connections
+from django.db.models import Q, QuerySet
+from django.db.models.constants import LOOKUP_SEP
 from django.db.models.fields import DeferredAttribute
 from django.db.models.fields.related import (
     ForeignKeyDeferredAttribute,
@@ -13,15 +16,33 @@ from django.db.models.fields.related import (
 )
 from django.utils.functional import cached_property
 
-from . import models
+from . import evaluation, models
 from .exceptions import UnsealedAttributeAccess
 from .query import SealableQuerySet
+from .signals import unsealed_attribute_access
 
 
 def _bare_repr(instance):
     return "<%s instance>" % instance.__class__.__name__
 
 
+def _warn_unsealed_access(instance, name, message, stacklevel):
+    """
+    Warn about an attribute access on a sealed instance that would incur a
+    database query or raise if the instance is frozen.
+    """
+    unsealed_attribute_access.send(
+        sender=instance.__class__,
+        instance=instance,
+        name=name,
+        message=message,
+        frame=sys._getframe(stacklevel),
+    )
+    if getattr(instance._state, "frozen", False):
+        raise UnsealedAttributeAccess(message)
+    warnings.warn(message, category=UnsealedAttributeAccess, stacklevel=stacklevel + 1)
+
+
 class _SealedRelatedQuerySet(QuerySet):
     """
     QuerySet that prevents any fetching from taking place on its current form.
@@ -29,6 +50,24 @@ class _SealedRelatedQuerySet(QuerySet):
     As soon as the query is cloned it gets unsealed.
     """
 
+    _sealed_instance = None
+    _sealed_name = None
+
+    def _warn_sealed_fetch(self, stacklevel):
+        if self._sealed_instance is None:
+            warnings.warn(
+                self._sealed_warning,
+                category=UnsealedAttributeAccess,
+                stacklevel=stacklevel + 1,
+            )
+        else:
+            _warn_unsealed_access(
+                self._sealed_instance,
+                self._sealed_name,
+                self._sealed_warning,
+                stacklevel=stacklevel + 1,
+            )
+
     def _clone(self, *args, **kwargs):
         clone = super()._clone(*args, **kwargs)
         clone.__class__ = self._unsealed_class
@@ -36,18 +75,28 @@ class _SealedRelatedQuerySet(QuerySet):
 
     def __getitem__(self, item):
         if self._result_cache is None:
-            warnings.warn(
-                self._sealed_warning, category=UnsealedAttributeAccess, stacklevel=2
-            )
+            self._warn_sealed_fetch(stacklevel=2)
         return super().__getitem__(item)
 
     def _fetch_all(self):
         if self._result_cache is None:
-            warnings.warn(
-                self._sealed_warning, category=UnsealedAttributeAccess, stacklevel=3
-            )
+            self._warn_sealed_fetch(stacklevel=3)
         super()._fetch_all()
 
+    def count(self):
+        if self._result_cache is None:
+            self._warn_sealed_fetch(stacklevel=2)
+        return super().count()
+
+    def exists(self):
+        if self._result_cache is None:
+            self._warn_sealed_fetch(stacklevel=2)
+        return super().exists()
+
+    def aggregate(self, *args, **kwargs):
+        self._warn_sealed_fetch(stacklevel=2)
+        return super().aggregate(*args, **kwargs)
+
     def __reduce__(self):
         return (
             _unpickle_sealed_related_queryset,
@@ -56,6 +105,168 @@ class _SealedRelatedQuerySet(QuerySet):
         )
 
 
+@lru_cache(maxsize=100)
+def _get_pk_lookups(model):
+    pk = model._meta.pk
+    names = {"pk", pk.name, pk.attname}
+    return frozenset(names | {"%s__exact" % name for name in names})
+
+
+class _PrefetchedRelatedQuerySet(QuerySet):
+    """
+    QuerySet of prefetched related objects of a sealed instance that evaluates
+    supported filtering, ordering and retrieval in memory.
+
+    Operations that cannot be evaluated in memory return a sealed related
+    queryset that warns when fetched.
+    """
+
+    _sealed_instance = None
+    _sealed_name = None
+    _pk_index = None
+
+    def _clone(self, *args, **kwargs):
+        clone = super()._clone(*args, **kwargs)
+        clone.__class__ = self._unsealed_class
+        return seal_related_queryset(
+            clone, self._sealed_warning, self._sealed_instance, self._sealed_name
+        )
+
+    def _unsealed_clone(self):
+        clone = self._unsealed_class._clone(self)
+        clone.__class__ = self._unsealed_class
+        return clone
+
+    def delete(self):
+        # Deletion collects the objects to delete by fetching a clone of the
+        # queryset which must not be sealed.
+        return self._unsealed_clone().delete()
+
+    delete.alters_data = True
+    delete.queryset_only = True
+
+    def _evaluated_clone(self, results):
+        clone = self._unsealed_class._clone(self)
+        clone._result_cache = results
+        clone._prefetch_done = True
+        clone._sealed_warning = self._sealed_warning
+        clone._sealed_instance = self._sealed_instance
+        clone._sealed_name = self._sealed_name
+        return clone
+
+    def _filter_or_exclude(self, negate, args, kwargs):
+        if self._result_cache is not None and not self.query.is_sliced:
+            q = ~Q(*args, **kwargs) if negate else Q(*args, **kwargs)
+            try:
+                results = evaluation.filter_objects(self.model, self._result_cache, q)
+            except evaluation.Unsupported:
+                pass
+            else:
+                clone = self._evaluated_clone(results)
+                clone._filter_or_exclude_inplace(negate, args, kwargs)
+                return clone
+        return super()._filter_or_exclude(negate, args, kwargs)
+
+    def all(self):
+        if self._result_cache is not None:
+            return self._evaluated_clone(self._result_cache)
+        return super().all()
+
+    def order_by(self, *field_names):
+        if self._result_cache is not None:
+            try:
+                results = evaluation.order_objects(
+                    self.model,
+                    self._result_cache,
+                    field_names,
+                    connections[self.db].features.nulls_order_largest,
+                )
+            except evaluation.Unsupported:
+                pass
+            else:
+                clone = self._evaluated_clone(results)
+                clone.query.clear_ordering(force=True, clear_default=False)
+                clone.query.add_ordering(*field_names)
+                return clone
+        return super().order_by(*field_names)
+
+    def reverse(self):
+        if self._result_cache is not None:
+            results = self._result_cache
+            if self.ordered:
+                results = results[::-1]
+            clone = self._evaluated_clone(results)
+            clone.query.standard_ordering = not clone.query.standard_ordering
+            return clone
+        return super().reverse()
+
+    def _does_not_exist(self):
+        return self.model.DoesNotExist(
+            "%s matching query does not exist." % self.model._meta.object_name
+        )
+
+    def get(self, *args, **kwargs):
+        if self._result_cache is not None:
+            if not args and len(kwargs) == 1:
+                ((lookup, value),) = kwargs.items()
+                if lookup in _get_pk_lookups(self.model):
+                    try:
+                        pk = evaluation.to_python(self.model._meta.pk, value)
+                    except evaluation.Unsupported:
+                        pass
+                    else:
+                        pk_index = self._pk_index
+                        if pk_index is None:
+                            pk_index = {obj.pk: obj for obj in self._result_cache}
+                            # Frozen objects must not be mutated.
+                            if not getattr(
+                                self._sealed_instance._state, "frozen", False
+                            ):
+                                self._pk_index = pk_index
+                        try:
+                            return pk_index[pk]
+                        except KeyError:
+                            raise self._does_not_exist()
+            try:
+                results = evaluation.filter_objects(
+                    self.model, self._result_cache, Q(*args, **kwargs)
+                )
+            except evaluation.Unsupported:
+                pass
+            else:
+                if len(results) == 1:
+                    return results[0]
+                if not results:
+                    raise self._does_not_exist()
+                raise self.model.MultipleObjectsReturned(
+                    "get() returned more than one %s -- it returned %d!"
+                    % (self.model._meta.object_name, len(results))
+                )
+        return super().get(*args, **kwargs)
+
+    def aggregate(self, *args, **kwargs):
+        if self._result_cache is not None:
+            try:
+                return evaluation.aggregate_objects(
+                    self.model, self._result_cache, args, kwargs
+                )
+            except evaluation.Unsupported:
+                _warn_unsealed_access(
+                    self._sealed_instance,
+                    self._sealed_name,
+                    self._sealed_warning,
+                    stacklevel=2,
+                )
+        return super().aggregate(*args, **kwargs)
+
+    def __reduce__(self):
+        return (
+            _unpickle_prefetched_related_queryset,
+            (self._unsealed_class,),
+            self.__getstate__(),
+        )
+
+
 class SealedPrefetchMixin(object):
     def _get_default_prefetch_queryset(self):
         return self.get_queryset()
@@ -93,21 +304,60 @@ def _sealed_related_queryset_type_factory(queryset_cls):
     )
 
 
+@lru_cache(maxsize=100)
+def _prefetched_related_queryset_type_factory(queryset_cls):
+    if issubclass(queryset_cls, _PrefetchedRelatedQuerySet):
+        return queryset_cls
+    if issubclass(queryset_cls, _SealedRelatedQuerySet):
+        queryset_cls = queryset_cls._unsealed_class
+    return type(
+        f"Prefetched{queryset_cls.__name__}",
+        (_PrefetchedRelatedQuerySet, queryset_cls),
+        {
+            "_unsealed_class": queryset_cls,
+        },
+    )
+
+
+def _unpickle_prefetched_related_queryset(queryset_cls):
+    cls = _prefetched_related_queryset_type_factory(queryset_cls)
+    return cls.__new__(cls)
+
+
 def _unpickle_sealed_related_queryset(queryset_cls):
     cls = _sealed_related_queryset_type_factory(queryset_cls)
     return cls.__new__(cls)
 
 
-def seal_related_queryset(queryset, warning):
+def seal_related_queryset(queryset, warning, instance=None, name=None):
     """
     Seal a related queryset to prevent it from being fetched directly.
     """
     queryset.__class__ = _sealed_related_queryset_type_factory(queryset.__class__)
     queryset._sealed_warning = warning
+    queryset._sealed_instance = instance
+    queryset._sealed_name = name
+    return queryset
+
+
+def seal_prefetched_queryset(queryset, warning, instance, name):
+    """
+    Allow the prefetched related queryset of a sealed instance to be filtered,
+    ordered and retrieved from in memory.
+    """
+    queryset.__class__ = _prefetched_related_queryset_type_factory(queryset.__class__)
+    queryset._sealed_warning = warning
+    queryset._sealed_instance = instance
+    queryset._sealed_name = name
     return queryset
 
 
-def create_sealable_related_manager(related_manager_cls, field_name):
+def create_sealable_related_manager(
+    related_manager_cls, field_name, accessor_name=None
+):
+    if accessor_name is None:
+        accessor_name = field_name
+
     class SealableRelatedManager(SealedPrefetchMixin, related_manager_cls):
         def _get_default_prefetch_queryset(self):
             # By-pass `related_manager_cls.get_queryset()` as that's the default
@@ -115,26 +365,96 @@ def create_sealable_related_manager(related_manager_cls, field_name):
             # no `queryset` is specified.
             return super(related_manager_cls, self).get_queryset()
 
+        def _get_prefetch_cache_name(self):
+            try:
+                return self.prefetch_cache_name
+            except AttributeError:
+                return self.field.related_query_name()
+
+        def _is_prefetched(self):
+            prefetched_objects_cache = getattr(
+                self.instance, "_prefetched_objects_cache", {}
+            )
+            return self._get_prefetch_cache_name() in prefetched_objects_cache
+
         def get_queryset(self):
             if getattr(self.instance._state, "sealed", False):
+                prefetch_cache_name = self._get_prefetch_cache_name()
+                warning = 'Attempt to fetch many-to-many field "%s" on sealed %s.' % (
+                    field_name,
+                    _bare_repr(self.instance),
+                )
                 try:
-                    prefetch_cache_name = self.prefetch_cache_name
-                except AttributeError:
-                    prefetch_cache_name = self.field.related_query_name()
-                try:
-                    return self.instance._prefetched_objects_cache[prefetch_cache_name]
+                    queryset = self.instance._prefetched_objects_cache[
+                        prefetch_cache_name
+                    ]
                 except (AttributeError, KeyError):
-                    warning = (
-                        'Attempt to fetch many-to-many field "%s" on sealed %s.'
-                        % (
-                            field_name,
-                            _bare_repr(self.instance),
+                    if getattr(self.instance._state, "frozen", False):
+                        _warn_unsealed_access(
+                            self.instance, accessor_name, warning, stacklevel=2
                         )
-                    )
                     related_queryset = super().get_queryset()
-                    return seal_related_queryset(related_queryset, warning)
+                    return seal_related_queryset(
+                        related_queryset, warning, self.instance, accessor_name
+                    )
+                if isinstance(queryset, _PrefetchedRelatedQuerySet):
+                    return queryset
+                return seal_prefetched_queryset(
+                    queryset, warning, self.instance, accessor_name
+                )
             return super().get_queryset()
 
+        def _get_related_annotation(self, name):
+            """
+            Return the value of the instance's annotation of the `name` lookup
+            of the relationship or raise KeyError if it's missing or the
+            relationship was prefetched.
+            """
+            if self._is_prefetched():
+                raise KeyError(name)
+            return self.instance.__dict__["%s%s%s" % (field_name, LOOKUP_SEP, name)]
+
+        def _remove_prefetched_objects(self):
+            super()._remove_prefetched_objects()
+            # Annotations of the relationship are stale once it's mutated.
+            prefix = field_name + LOOKUP_SEP
+            instance_dict = self.instance.__dict__
+            for name in [name for name in instance_dict if name.startswith(prefix)]:
+                del instance_dict[name]
+
+        def count(self):
+            if getattr(self.instance._state, "sealed", False):
+                try:
+                    return self._get_related_annotation("count")
+                except KeyError:
+                    return self.get_queryset().count()
+            return super().count()
+
+        def exists(self):
+            if getattr(self.instance._state, "sealed", False):
+                try:
+                    return self._get_related_annotation("exists")
+                except KeyError:
+                    pass
+                try:
+                    return self._get_related_annotation("count") > 0
+                except KeyError:
+                    return self.get_queryset().exists()
+            return super().exists()
+
+        def aggregate(self, *args, **kwargs):
+            if (
+                getattr(self.instance._state, "sealed", False)
+                and not self._is_prefetched()
+            ):
+                try:
+                    return evaluation.aggregate_annotations(
+                        args, kwargs, self._get_related_annotation
+                    )
+                except (evaluation.Unsupported, KeyError):
+                    pass
+            return super().aggregate(*args, **kwargs)
+
     return SealableRelatedManager
 
 
@@ -158,11 +478,18 @@ class SealableDeferredAttribute(DeferredAttribute):
                 self.field_name,
                 _bare_repr(instance),
             )
-            warnings.warn(message, category=UnsealedAttributeAccess, stacklevel=2)
+            _warn_unsealed_access(instance, self.field_name, message, stacklevel=2)
         return super().__get__(instance, cls)
 
 
 class SealableForwardOneToOneDescriptor(SealedPrefetchMixin, ForwardOneToOneDescriptor):
+    @cached_property
+    def _parent_attnames(self):
+        return frozenset(
+            field.attname
+            for field in self.field.remote_field.model._meta.concrete_fields
+        )
+
     def get_object(self, instance):
         sealed = getattr(instance._state, "sealed", False)
         if sealed:
@@ -174,17 +501,15 @@ class SealableForwardOneToOneDescriptor(SealedPrefetchMixin, ForwardOneToOneDesc
                 # Because it's a parent link, all the data is available in the
                 # instance, so populate the parent model with this data.
 
-                fields = {field.attname for field in rel_model._meta.concrete_fields}
-
                 # If any of the related model's fields are deferred, prevent
                 # the query from being performed.
-                if any(field in fields for field in deferred):
+                if not self._parent_attnames.isdisjoint(deferred):
                     message = 'Attempt to fetch related field "%s" on sealed %s.' % (
                         self.field.name,
                         _bare_repr(instance),
                     )
-                    warnings.warn(
-                        message, category=UnsealedAttributeAccess, stacklevel=3
+                    _warn_unsealed_access(
+                        instance, self.field.name, message, stacklevel=3
                     )
                 else:
                     # When none of the fields inherited from the parent link
@@ -193,13 +518,15 @@ class SealableForwardOneToOneDescriptor(SealedPrefetchMixin, ForwardOneToOneDesc
                     # Make sure this in-memory instance is sealed as well.
                     obj = super().get_object(instance)
                     obj.seal()
+                    if getattr(instance._state, "frozen", False):
+                        obj._state.frozen = True
                     return obj
             else:
                 message = 'Attempt to fetch related field "%s" on sealed %s.' % (
                     self.field.name,
                     _bare_repr(instance),
                 )
-                warnings.warn(message, category=UnsealedAttributeAccess, stacklevel=3)
+                _warn_unsealed_access(instance, self.field.name, message, stacklevel=3)
         return super().get_object(instance)
 
 
@@ -211,7 +538,9 @@ class SealableReverseOneToOneDescriptor(SealedPrefetchMixin, ReverseOneToOneDesc
                 self.related.name,
                 _bare_repr(instance),
             )
-            warnings.warn(message, category=UnsealedAttributeAccess, stacklevel=3)
+            _warn_unsealed_access(
+                instance, self.related.get_accessor_name(), message, stacklevel=3
+            )
         return super().get_queryset(**hints)
 
 
@@ -222,7 +551,7 @@ class SealableForwardManyToOneDescriptor(ForwardManyToOneDescriptor):
                 self.field.name,
                 _bare_repr(instance),
             )
-            warnings.warn(message, category=UnsealedAttributeAccess, stacklevel=3)
+            _warn_unsealed_access(instance, self.field.name, message, stacklevel=3)
         return super().get_object(instance)
 
 
@@ -230,15 +559,23 @@ class SealableReverseManyToOneDescriptor(ReverseManyToOneDescriptor):
     @cached_property
     def related_manager_cls(self):
         related_manager_cls = super().related_manager_cls
-        return create_sealable_related_manager(related_manager_cls, self.rel.name)
+        return create_sealable_related_manager(
+            related_manager_cls, self.rel.name, self.rel.get_accessor_name()
+        )
 
 
 class SealableManyToManyDescriptor(ManyToManyDescriptor):
     @cached_property
     def related_manager_cls(self):
         related_manager_cls = super().related_manager_cls
-        field_name = self.rel.name if self.reverse else self.field.name
-        return create_sealable_related_manager(related_manager_cls, field_name)
+        if self.reverse:
+            field_name = self.rel.name
+            accessor_name = self.rel.get_accessor_name()
+        else:
+            field_name = accessor_name = self.field.name
+        return create_sealable_related_manager(
+            related_manager_cls, field_name, accessor_name
+        )
 
 
 class SealableForeignKeyDeferredAttribute(
@@ -264,6 +601,8 @@ def make_contenttypes_sealable():
         ReverseGenericManyToOneDescriptor,
     )
 
+    from .loaders import get_content_types
+
     # Ensure the function is idempotent.
     if GenericForeignKey in sealable_descriptor_classes:
         return
@@ -280,10 +619,35 @@ def make_contenttypes_sealable():
                     self.name,
                     _bare_repr(instance),
                 )
-                warnings.warn(message, category=UnsealedAttributeAccess, stacklevel=2)
+                _warn_unsealed_access(instance, self.name, message, stacklevel=2)
 
             return super().__get__(instance, cls=cls)
 
+        def _get_sealed_prefetch(self, get_prefetch, instances, *args):
+            if not getattr(instances[0]._state, "sealed", False):
+                return get_prefetch(instances, *args)
+            ct_attname = self.model._meta.get_field(self.ct_field).attname
+            # Resolve the content types of all instances at once.
+            get_content_types(
+                {getattr(instance, ct_attname) for instance in instances} - {None},
+                instances[0]._state.db,
+            )
+            related_objs, *rest = get_prefetch(instances, *args)
+            related_objs = list(related_objs)
+            for related_obj in related_objs:
+                related_obj._state.sealed = True
+            return (related_objs, *rest)
+
+        def get_prefetch_queryset(self, instances, queryset=None):
+            return self._get_sealed_prefetch(
+                super().get_prefetch_queryset, instances, queryset
+            )
+
+        def get_prefetch_querysets(self, instances, querysets=None):
+            return self._get_sealed_prefetch(
+                super().get_prefetch_querysets, instances, querysets
+            )
+
     class SealableReverseGenericManyToOneDescriptor(ReverseGenericManyToOneDescriptor):
         @cached_property
         def related_manager_cls(self):
@@ -0,0 +1,264 @@
+import operator
+
+from django.core.exceptions import FieldDoesNotExist, ValidationError
+from django.db.models import Count, F, Max, Min, Q, Sum
+from django.db.models.constants import LOOKUP_SEP
+from django.db.models.expressions import Star
+
+
+class Unsupported(Exception):
+    """
+    Raised when a lookup or ordering cannot be evaluated in memory.
+    """
+
+
+def _compare(op):
+    def lookup(value, rhs):
+        return value is not None and op(value, rhs)
+
+    return lookup
+
+
+LOOKUPS = {
+    "exact": operator.eq,
+    "in": lambda value, rhs: value is not None and value in rhs,
+    "gt": _compare(operator.gt),
+    "gte": _compare(operator.ge),
+    "lt": _compare(operator.lt),
+    "lte": _compare(operator.le),
+    "isnull": lambda value, rhs: (value is None) is rhs,
+}
+
+
+def _resolve_field(opts, name):
+    if name == "pk":
+        return opts.pk
+    try:
+        field = opts.get_field(name)
+    except FieldDoesNotExist:
+        for field in opts.concrete_fields:
+            if field.attname == name:
+                return field
+        raise Unsupported(name)
+    if not getattr(field, "concrete", False) or field.many_to_many:
+        raise Unsupported(name)
+    if field.is_relation and len(field.foreign_related_fields) != 1:
+        raise Unsupported(name)
+    return field
+
+
+def to_python(field, value):
+    """
+    Convert a lookup value to the Python value of ``field`` attribute or raise
+    ``Unsupported``.
+    """
+    if hasattr(value, "resolve_expression"):
+        raise Unsupported(value)
+    if field.is_relation:
+        target_field = field.foreign_related_fields[0]
+        if isinstance(value, field.remote_field.model):
+            value = getattr(value, target_field.attname)
+        field = target_field
+    if value is None:
+        return value
+    try:
+        return field.to_python(value)
+    except ValidationError:
+        raise Unsupported(value)
+
+
+def _compile_lookup(opts, lookup, value):
+    parts = lookup.split(LOOKUP_SEP)
+    if len(parts) > 2:
+        raise Unsupported(lookup)
+    field = _resolve_field(opts, parts[0])
+    lookup_name = parts[1] if len(parts) == 2 else "exact"
+    if lookup_name not in LOOKUPS:
+        raise Unsupported(lookup)
+    if lookup_name == "isnull":
+        if not isinstance(value, bool):
+            raise Unsupported(value)
+        rhs = value
+    elif lookup_name == "in":
+        if hasattr(value, "resolve_expression"):
+            raise Unsupported(value)
+        rhs = [to_python(field, item) for item in value]
+        try:
+            rhs = frozenset(rhs)
+        except TypeError:
+            pass
+    else:
+        rhs = to_python(field, value)
+        if rhs is None:
+            if lookup_name != "exact":
+                raise Unsupported(value)
+            lookup_name, rhs = "isnull", True
+    attname = field.attname
+    test = LOOKUPS[lookup_name]
+
+    def predicate(obj):
+        try:
+            value = obj.__dict__[attname]
+        except KeyError:
+            raise Unsupported(attname)
+        return test(value, rhs)
+
+    return predicate
+
+
+def compile_filter(model, q):
+    """
+    Compile a ``Q`` object into a predicate evaluated against model instances
+    or raise ``Unsupported``.
+    """
+    opts = model._meta
+    predicates = []
+    for child in q.children:
+        if isinstance(child, Q):
+            predicates.append(compile_filter(model, child))
+        elif isinstance(child, tuple):
+            predicates.append(_compile_lookup(opts, *child))
+        else:
+            raise Unsupported(child)
+    combine = any if q.connector == Q.OR else all
+    negated = q.negated
+
+    def predicate(obj):
+        return combine(child(obj) for child in predicates) is not negated
+
+    return predicate
+
+
+def filter_objects(model, objs, q):
+    """
+    Return the objects matching ``q`` using Python semantics for comparisons
+    or raise ``Unsupported``.
+    """
+    predicate = compile_filter(model, q)
+    try:
+        return [obj for obj in objs if predicate(obj)]
+    except TypeError as exc:
+        raise Unsupported(exc)
+
+
+def order_objects(model, objs, field_names, nulls_largest=False):
+    """
+    Return the objects ordered by ``field_names`` or raise ``Unsupported``.
+
+    ``None`` values are considered smaller than any other value unless
+    ``nulls_largest`` is true, as backends order them differently. Strings
+    are compared by code point regardless of the database collation.
+    """
+    opts = model._meta
+    ordering = []
+    for field_name in field_names:
+        if not isinstance(field_name, str) or field_name == "?":
+            raise Unsupported(field_name)
+        descending = field_name.startswith("-")
+        field = _resolve_field(opts, field_name.lstrip("-"))
+        # Ordering by a relation uses the related model's ordering.
+        if field.is_relation and field.name == field_name.lstrip("-"):
+            raise Unsupported(field_name)
+        ordering.append((field.attname, descending))
+    objs = list(objs)
+    try:
+        for attname, descending in reversed(ordering):
+            objs.sort(
+                key=lambda obj: (
+                    (obj.__dict__[attname] is None) is nulls_largest,
+                    obj.__dict__[attname],
+                ),
+                reverse=descending,
+            )
+    except KeyError as exc:
+        raise Unsupported(exc)
+    except TypeError as exc:
+        raise Unsupported(exc)
+    return objs
+
+
+AGGREGATES = {
+    Count: len,
+    Sum: lambda values: sum(values) if values else None,
+    Min: lambda values: min(values) if values else None,
+    Max: lambda values: max(values) if values else None,
+}
+
+
+def get_aggregates(args, kwargs):
+    """
+    Return the aggregates passed to ``aggregate()`` by alias or raise
+    ``Unsupported``.
+    """
+    aggregates = dict(kwargs)
+    for arg in args:
+        try:
+            aggregates[arg.default_alias] = arg
+        except (AttributeError, TypeError):
+            raise Unsupported(arg)
+    return aggregates
+
+
+def aggregate_annotations(args, kwargs, get_annotation):
+    """
+    Return the aggregates passed to ``aggregate()`` from the annotations of
+    the same aggregates returned by get_annotation for their default alias or
+    raise ``Unsupported``.
+    """
+    result = {}
+    for alias, aggregate in get_aggregates(args, kwargs).items():
+        # Filtered and distinct aggregates share the default alias of the
+        # plain aggregate and can't be told apart from it.
+        if getattr(aggregate, "filter", None) is not None or getattr(
+            aggregate, "distinct", False
+        ):
+            raise Unsupported(aggregate)
+        default = getattr(aggregate, "default", None)
+        if hasattr(default, "resolve_expression"):
+            raise Unsupported(default)
+        try:
+            default_alias = aggregate.default_alias
+        except (AttributeError, TypeError):
+            raise Unsupported(aggregate)
+        value = get_annotation(default_alias)
+        result[alias] = default if value is None else value
+    return result
+
+
+def aggregate_objects(model, objs, args, kwargs):
+    """
+    Return the ``Count``, ``Sum``, ``Min`` and ``Max`` aggregates passed to
+    ``aggregate()`` computed over the objects or raise ``Unsupported``.
+    """
+    opts = model._meta
+    result = {}
+    for alias, aggregate in get_aggregates(args, kwargs).items():
+        function = AGGREGATES.get(type(aggregate))
+        if function is None or aggregate.filter is not None:
+            raise Unsupported(aggregate)
+        default = getattr(aggregate, "default", None)
+        if hasattr(default, "resolve_expression"):
+            raise Unsupported(default)
+        try:
+            (source,) = aggregate.source_expressions
+        except ValueError:
+            raise Unsupported(aggregate)
+        if isinstance(source, F):
+            attname = _resolve_field(opts, source.name).attname
+            try:
+                values = [obj.__dict__[attname] for obj in objs]
+            except KeyError:
+                raise Unsupported(attname)
+            values = [value for value in values if value is not None]
+        elif isinstance(source, Star):
+            values = list(objs)
+        else:
+            raise Unsupported(source)
+        try:
+            if aggregate.distinct:
+                values = set(values)
+            value = function(values)
+        except TypeError as exc:
+            raise Unsupported(exc)
+        result[alias] = default if value is None else value
+    return result
@@ -1,2 +1,6 @@
 class UnsealedAttributeAccess(Warning):
     pass
+
+
+class FrozenInstanceError(Exception):
+    pass
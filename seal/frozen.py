@@ -0,0 +1,170 @@
+import threading
+from collections import defaultdict
+
+from django.db.models import Model
+from django.db.models.signals import (
+    m2m_changed,
+    post_delete,
+    post_save,
+    pre_delete,
+    pre_save,
+)
+
+from .exceptions import FrozenInstanceError
+from .introspection import get_prefetch_accessors, is_object_list
+
+_lock = threading.Lock()
+# Mapping of cache keys to tuples of frozen instances.
+_frozen_results = {}
+# Mapping of concrete models to the cache keys whose graph they are part of.
+_frozen_keys = defaultdict(set)
+# Mapping of concrete models to the number of times they were invalidated.
+_generations = defaultdict(int)
+
+
+def iter_object_graph(objs):
+    """
+    Iterate over objs and all the objects reachable from them through their
+    related fields, prefetched objects caches and ``to_attr`` prefetched
+    objects, each object only once.
+    """
+    seen = set()
+    stack = list(objs)
+    while stack:
+        obj = stack.pop()
+        if id(obj) in seen:
+            continue
+        seen.add(id(obj))
+        yield obj
+        stack.extend(
+            related_obj
+            for related_obj in obj._state.fields_cache.values()
+            if related_obj is not None
+        )
+        prefetched_objects_cache = getattr(obj, "_prefetched_objects_cache", None)
+        if prefetched_objects_cache:
+            for queryset in prefetched_objects_cache.values():
+                stack.extend(queryset._result_cache or ())
+        for name, value in obj.__dict__.items():
+            if name.startswith("_"):
+                continue
+            if isinstance(value, Model):
+                stack.append(value)
+            elif is_object_list(value):
+                stack.extend(value)
+
+
+def freeze(objs):
+    """
+    Seal and freeze objs and all the objects reachable from them through their
+    related fields, prefetched objects caches and ``to_attr`` prefetched
+    objects.
+
+    Frozen instances raise UnsealedAttributeAccess instead of warning on
+    attribute accesses that would incur a database query and raise
+    FrozenInstanceError when saved or deleted.
+
+    Return the set of concrete models of the frozen objects.
+    """
+    _connect_signals()
+    models = set()
+    for obj in iter_object_graph(objs):
+        obj._state.sealed = True
+        obj._state.frozen = True
+        models.add(obj._meta.concrete_model)
+        prefetched_objects_cache = getattr(obj, "_prefetched_objects_cache", None)
+        if prefetched_objects_cache:
+            accessors = get_prefetch_accessors(obj.__class__)
+            for cache_name in list(prefetched_objects_cache):
+                accessor = accessors.get(cache_name)
+                if accessor is not None:
+                    # Seal prefetched querysets and apply their deferred
+                    # filter now as accessing them must not mutate frozen
+                    # objects.
+                    getattr(obj, accessor).get_queryset().query
+    return models
+
+
+def get_frozen(key, queryset):
+    """
+    Return the frozen results of queryset cached under key, evaluating and
+    freezing them on the first call.
+    """
+    try:
+        return _frozen_results[key]
+    except KeyError:
+        pass
+    with _lock:
+        try:
+            return _frozen_results[key]
+        except KeyError:
+            pass
+        # Results are stored in a tuple to prevent mutations of the shared
+        # container and to keep the garbage collector away from it once it
+        # has been moved to the permanent generation through gc.freeze().
+        generations = dict(_generations)
+        results = tuple(queryset)
+        models = freeze(results)
+        models.add(queryset.model._meta.concrete_model)
+        if any(_generations[model] != generations.get(model, 0) for model in models):
+            # An object of the graph was written to during its evaluation,
+            # the results might be stale.
+            return results
+        _frozen_results[key] = results
+        for model in models:
+            _frozen_keys[model].add(key)
+    return results
+
+
+def invalidate(key=None):
+    """
+    Discard the frozen results cached under key or all of them if no key is
+    provided.
+    """
+    with _lock:
+        if key is None:
+            _frozen_results.clear()
+            _frozen_keys.clear()
+        else:
+            _frozen_results.pop(key, None)
+            for keys in _frozen_keys.values():
+                keys.discard(key)
+
+
+def invalidate_model(model):
+    """Discard the frozen results whose object graph include model."""
+    model = model._meta.concrete_model
+    # Prevent results being evaluated from being cached.
+    _generations[model] += 1
+    keys = _frozen_keys.get(model)
+    if not keys:
+        return
+    with _lock:
+        for key in keys:
+            _frozen_results.pop(key, None)
+        keys.clear()
+
+
+def _prevent_frozen_write(sender, instance, **kwargs):
+    if getattr(instance._state, "frozen", False):
+        raise FrozenInstanceError(
+            "Cannot save or delete frozen %s." % instance.__class__.__name__
+        )
+
+
+def _invalidate_sender(sender, **kwargs):
+    invalidate_model(sender)
+
+
+def _invalidate_m2m_changed(sender, instance, model, **kwargs):
+    invalidate_model(sender)
+    invalidate_model(instance.__class__)
+    invalidate_model(model)
+
+
+def _connect_signals():
+    pre_save.connect(_prevent_frozen_write, dispatch_uid="seal.frozen.pre_save")
+    pre_delete.connect(_prevent_frozen_write, dispatch_uid="seal.frozen.pre_delete")
+    post_save.connect(_invalidate_sender, dispatch_uid="seal.frozen.post_save")
+    post_delete.connect(_invalidate_sender, dispatch_uid="seal.frozen.post_delete")
+    m2m_changed.connect(_invalidate_m2m_changed, dispatch_uid="seal.frozen.m2m_changed")
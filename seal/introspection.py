@@ -0,0 +1,40 @@
+from functools import lru_cache
+
+from django.db import models
+
+
+@lru_cache(maxsize=100)
+def get_concrete_attnames(model):
+    return tuple(field.attname for field in model._meta.concrete_fields)
+
+
+@lru_cache(maxsize=100)
+def get_prefetch_accessors(model):
+    """
+    Return a mapping of the possible prefetch cache names of the many-valued
+    relationships of model to their accessor name.
+    """
+    accessors = {}
+    for field in model._meta.get_fields():
+        if not (field.one_to_many or field.many_to_many):
+            continue
+        if field.concrete or not field.auto_created:
+            accessors[field.name] = field.name
+            continue
+        accessor = field.get_accessor_name()
+        if accessor is None:
+            # Hidden relationships can't be prefetched.
+            continue
+        # The cache name of reverse relationships is either their accessor
+        # or query name depending on Django's version.
+        accessors[field.name] = accessors[accessor] = accessor
+    return accessors
+
+
+def is_object_list(value):
+    """Return whether value is a non-empty list of model instances."""
+    return (
+        type(value) is list
+        and len(value) > 0
+        and all(isinstance(item, models.Model) for item in value)
+    )
@@ -0,0 +1,316 @@
+import asyncio
+from collections import defaultdict
+
+from asgiref.sync import sync_to_async
+from django.core.exceptions import ObjectDoesNotExist
+from django.db import connections, models
+from django.db.models.constants import LOOKUP_SEP
+from django.db.models.query import prefetch_related_objects
+
+from .introspection import get_prefetch_accessors
+from .query import (
+    _get_prefetch_executor,
+    get_select_related_getters,
+    walk_select_relateds,
+)
+from .workers import worker_task
+
+
+def is_relation_loaded(instance, name):
+    """Return whether the name relation of instance is already loaded."""
+    descriptor = getattr(instance.__class__, name)
+    if hasattr(descriptor, "is_cached"):
+        return descriptor.is_cached(instance)
+    prefetched_objects_cache = getattr(instance, "_prefetched_objects_cache", ())
+    # Reverse relationships might be cached under their query name instead of
+    # their accessor name.
+    return name in prefetched_objects_cache or any(
+        accessor == name and cache_name in prefetched_objects_cache
+        for cache_name, accessor in get_prefetch_accessors(instance.__class__).items()
+    )
+
+
+def get_loaded_relation(instance, name):
+    """
+    Return the related object, or list of related objects, of the already
+    loaded name relation of instance.
+    """
+    try:
+        value = getattr(instance, name)
+    except ObjectDoesNotExist:
+        # Reverse one-to-one relationships raise on missing objects.
+        return None
+    if isinstance(value, models.Manager):
+        return list(value.all())
+    return value
+
+
+def seal_loaded_relation(instance, name):
+    """Seal the related objects of the loaded name relation of instance."""
+    value = get_loaded_relation(instance, name)
+    if value is None:
+        return
+    if not isinstance(value, list):
+        value = [value]
+    for related_obj in value:
+        related_obj._state.sealed = True
+
+
+def _chunks(objs, batch_size):
+    for start in range(0, len(objs), batch_size):
+        yield objs[start : start + batch_size]  # noqa: E203
+
+
+def _copy_loaded_fields(instance, fetched, attnames, select_fields, getters):
+    instance_dict = instance.__dict__
+    snapshot = getattr(instance._state, "snapshot", None)
+    for attname in attnames:
+        if attname not in instance_dict:
+            value = instance_dict[attname] = fetched.__dict__[attname]
+            if snapshot is not None:
+                snapshot[attname] = value
+    for field in select_fields:
+        if field.is_cached(instance):
+            continue
+        related_obj = field.get_cached_value(fetched, default=None)
+        field.set_cached_value(instance, related_obj)
+        if related_obj is not None and field.one_to_one:
+            remote_field = field.remote_field if field.concrete else field.field
+            remote_field.set_cached_value(related_obj, instance)
+    if getattr(instance._state, "sealed", False):
+        # Seal the select related of the fetched instance, which are now the
+        # ones of instance, like sealed querysets do.
+        for related_obj in walk_select_relateds(fetched, getters):
+            related_obj._state.sealed = True
+
+
+def _load_fields(model, db, instances, fields, select, batch_size):
+    """
+    Load the deferred fields and select related of instances through one
+    primary key lookup query per batch.
+    """
+    opts = model._meta
+    attnames = [opts.get_field(name).attname for name in fields]
+    select_fields = [
+        opts.get_field(lookup.split(LOOKUP_SEP, 1)[0]) for lookup in select
+    ]
+    pending = {}
+    for instance in instances:
+        instance_dict = instance.__dict__
+        if any(attname not in instance_dict for attname in attnames) or any(
+            not field.is_cached(instance) for field in select_fields
+        ):
+            # Merged querysets can retrieve distinct instances of a row.
+            pending.setdefault(instance.pk, []).append(instance)
+    if not pending:
+        return
+    queryset = model._base_manager.db_manager(db).only(
+        *fields, *(field.name for field in select_fields)
+    )
+    select_related_getters = ()
+    if select:
+        queryset = queryset.select_related(*select)
+        select_related_getters = get_select_related_getters(queryset.query, opts)
+    pks = list(pending)
+    if batch_size is None:
+        batch_size = connections[db].ops.bulk_batch_size(["pk"], pks)
+    for batch in _chunks(pks, batch_size):
+        for fetched in queryset.filter(pk__in=batch):
+            for instance in pending[fetched.pk]:
+                _copy_loaded_fields(
+                    instance, fetched, attnames, select_fields, select_related_getters
+                )
+
+
+def load(instances, fields=(), select=(), prefetch=(), batch_size=None):
+    """
+    Load the deferred fields, select related and prefetch related lookups of
+    already retrieved model instances in batches.
+
+    Deferred fields and ``select`` lookups are loaded through one primary key
+    lookup query per model and batch of ``batch_size`` instances while
+    ``prefetch`` lookups are loaded through ``prefetch_related_objects()``.
+    Loaded objects are sealed when the instances they are attached to are.
+    """
+    groups = {}
+    for instance in instances:
+        groups.setdefault((instance.__class__, instance._state.db), []).append(instance)
+    prefetch_names = {
+        getattr(lookup, "prefetch_to", lookup).split(LOOKUP_SEP, 1)[0]
+        for lookup in prefetch
+    }
+    for (model, db), group in groups.items():
+        if fields or select:
+            _load_fields(model, db, group, fields, select, batch_size)
+        if not prefetch:
+            continue
+        size = batch_size or connections[db].ops.bulk_batch_size(["pk"], group)
+        for batch in _chunks(group, size):
+            prefetch_related_objects(batch, *prefetch)
+            for instance in batch:
+                if getattr(instance._state, "sealed", False):
+                    for name in prefetch_names:
+                        seal_loaded_relation(instance, name)
+
+
+def get_content_types(ids, using):
+    """
+    Return the content types of ids by id from the ``ContentTypeManager``
+    cache, retrieving the missing ones through a single query.
+    """
+    from django.contrib.contenttypes.models import ContentType
+
+    manager = ContentType.objects.db_manager(using)
+    cache = manager._cache.get(using, {})
+    missing = [ct_id for ct_id in ids if ct_id not in cache]
+    if missing:
+        for content_type in manager.filter(pk__in=missing):
+            manager._add_to_cache(using, content_type)
+    return {ct_id: manager.get_for_id(ct_id) for ct_id in ids}
+
+
+@worker_task
+def _fetch_objects_task(queryset):
+    return list(queryset)
+
+
+def load_generic_foreign_key(instances, name, concurrent=False):
+    """
+    Load the name generic foreign key of instances through a single query per
+    content type.
+
+    Content types are resolved from the ``ContentTypeManager`` cache and the
+    queries are performed concurrently, each in its own thread and database
+    connection, when ``concurrent`` is true and the database isn't in an
+    atomic block. Loaded objects are sealed when the instances they are
+    attached to are.
+    """
+    groups = defaultdict(list)
+    for instance in instances:
+        descriptor = getattr(instance.__class__, name)
+        if descriptor.is_cached(instance):
+            continue
+        ct_attname = instance._meta.get_field(descriptor.ct_field).attname
+        ct_id = getattr(instance, ct_attname)
+        fk_val = getattr(instance, descriptor.fk_field)
+        if ct_id is None or fk_val is None:
+            descriptor.set_cached_value(instance, None)
+            continue
+        groups[instance._state.db, ct_id].append((instance, descriptor, fk_val))
+    ct_ids = defaultdict(set)
+    for using, ct_id in groups:
+        ct_ids[using].add(ct_id)
+    content_types = {
+        using: get_content_types(ids, using) for using, ids in ct_ids.items()
+    }
+    querysets = {}
+    for (using, ct_id), entries in groups.items():
+        related_model = content_types[using][ct_id].model_class()
+        pk_field = related_model._meta.pk
+        querysets[using, ct_id] = related_model._base_manager.db_manager(using).filter(
+            pk__in={pk_field.to_python(fk_val) for _, _, fk_val in entries}
+        )
+    if (
+        concurrent
+        and len(querysets) > 1
+        # Other connections can't see uncommitted changes.
+        and not any(connections[using].in_atomic_block for using, _ in querysets)
+    ):
+        executor = _get_prefetch_executor()
+        futures = {
+            key: executor.submit(_fetch_objects_task, queryset)
+            for key, queryset in querysets.items()
+        }
+        results = {key: future.result() for key, future in futures.items()}
+    else:
+        results = {key: list(queryset) for key, queryset in querysets.items()}
+    for key, entries in groups.items():
+        related_objs = {related_obj.pk: related_obj for related_obj in results[key]}
+        pk_field = content_types[key[0]][key[1]].model_class()._meta.pk
+        for instance, descriptor, fk_val in entries:
+            related_obj = related_objs.get(pk_field.to_python(fk_val))
+            if related_obj is not None and getattr(instance._state, "sealed", False):
+                related_obj._state.sealed = True
+            descriptor.set_cached_value(instance, related_obj)
+
+
+class SealedRelationLoader:
+    """
+    Asynchronous loader that batches the loading of relations of model
+    instances requested during the same event loop iteration.
+
+    A single query is performed per (model, relation) pair through
+    ``prefetch_related_objects()`` and the loaded objects are sealed when
+    the instances they are attached to are. A loader should be used for the
+    duration of a single request.
+    """
+
+    def __init__(self):
+        self._queue = {}
+        self._dispatch_scheduled = False
+        # The event loop only keeps weak references to tasks.
+        self._tasks = set()
+
+    async def load(self, instance, name):
+        """
+        Return the related object, or list of related objects, of the name
+        relation of instance.
+        """
+        if is_relation_loaded(instance, name):
+            return get_loaded_relation(instance, name)
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._queue.setdefault((instance.__class__, name), []).append(
+            (instance, future)
+        )
+        if not self._dispatch_scheduled:
+            self._dispatch_scheduled = True
+            loop.call_soon(self._dispatch)
+        return await future
+
+    async def load_many(self, instances, name):
+        """Return the loaded name relation of each of instances."""
+        return await asyncio.gather(
+            *(self.load(instance, name) for instance in instances)
+        )
+
+    def _dispatch(self):
+        batches, self._queue = self._queue, {}
+        self._dispatch_scheduled = False
+        task = asyncio.ensure_future(self._load_batches(batches))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _load_batches(self, batches):
+        try:
+            errors = await sync_to_async(self._load_batches_sync)(batches)
+        except Exception as exc:
+            errors = dict.fromkeys(batches, exc)
+        for key, entries in batches.items():
+            error = errors.get(key)
+            for instance, future in entries:
+                if future.done():
+                    continue
+                if error is not None:
+                    future.set_exception(error)
+                else:
+                    future.set_result(get_loaded_relation(instance, key[1]))
+
+    @staticmethod
+    def _load_batches_sync(batches):
+        errors = {}
+        for key, entries in batches.items():
+            name = key[1]
+            # The same instance might have been requested multiple times.
+            instances = list(
+                {id(instance): instance for instance, _ in entries}.values()
+            )
+            try:
+                prefetch_related_objects(instances, name)
+            except Exception as exc:
+                errors[key] = exc
+                continue
+            for instance in instances:
+                if getattr(instance._state, "sealed", False):
+                    seal_loaded_relation(instance, name)
+        return errors
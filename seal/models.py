@@ -1,15 +1,29 @@
+import copy
+import copyreg
+from datetime import date, datetime, time, timedelta
+from decimal import Decimal
+from functools import lru_cache
+from uuid import UUID
+
 from django.apps import apps
 from django.core import checks
 from django.db import models
-from django.db.models.fields.related import lazy_related_operation
+from django.db.models.base import DEFERRED, ModelState
+from django.db.models.fields.related import (
+    ForeignKeyDeferredAttribute,
+    lazy_related_operation,
+)
+from django.db.models.signals import post_init, post_save, pre_init, pre_save
 
 from . import descriptors
-from .query import SealableQuerySet
+from .profiles import check_fetch_profiles
+from .query import SealableQuerySet, take_snapshot
 
 
 class BaseSealableManager(models.manager.Manager):
-    def __init__(self, seal=None):
+    def __init__(self, seal=None, replica=None):
         self._seal_queryset = seal
+        self._seal_replica = replica
         super().__init__()
 
     def _get_model(self):
@@ -27,6 +41,8 @@ class BaseSealableManager(models.manager.Manager):
 
     def get_queryset(self):
         queryset = super().get_queryset()
+        if self._seal_replica is not None:
+            queryset._hints = {**queryset._hints, "seal_replica": self._seal_replica}
         if self._seal_queryset:
             queryset = queryset.seal()
         return queryset
@@ -71,6 +87,126 @@ class SealableModel(models.Model):
     class Meta:
         abstract = True
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        if (
+            pre_init.has_listeners(cls)
+            or post_init.has_listeners(cls)
+            or not _has_plain_init(cls)
+        ):
+            return super().from_db(db, field_names, values)
+        # Bypass Model.__init__() and its per-field setattr() calls when it
+        # would only assign values to the instance's __dict__ anyway.
+        new = cls.__new__(cls)
+        state = new._state = ModelState()
+        state.adding = False
+        state.db = db
+        new.__dict__.update(zip(field_names, values))
+        return new
+
+    def get_deferred_fields(self):
+        """
+        Return the set of deferred field attnames of the instance.
+
+        Sealed instances retrieved together share their set of deferred fields
+        which remains valid until one of them is loaded or assigned. Checking
+        that is linear in the number of deferred fields, and constant for
+        instances without any, rather than in the number of concrete fields.
+        """
+        deferred_fields = getattr(self._state, "deferred_fields", None)
+        if deferred_fields is not None:
+            if not deferred_fields:
+                return deferred_fields
+            instance_dict = self.__dict__
+            for attname in deferred_fields:
+                if attname in instance_dict:
+                    break
+            else:
+                return deferred_fields
+        return super().get_deferred_fields()
+
+    def get_dirty_fields(self):
+        """
+        Return the names of the loaded fields which value changed since the
+        instance was retrieved by a queryset sealed with track_changes=True or
+        None if its changes are not tracked.
+        """
+        snapshot = getattr(self._state, "snapshot", None)
+        if snapshot is None:
+            return None
+        instance_dict = self.__dict__
+        dirty_fields = []
+        for field in self._meta.concrete_fields:
+            attname = field.attname
+            try:
+                value = instance_dict[attname]
+            except KeyError:
+                continue
+            # Deferred fields assigned after retrieval are dirty as well as
+            # values that can be mutated in place.
+            original = snapshot.get(attname, DEFERRED)
+            if (
+                type(value) is not type(original)
+                or type(value) not in _IMMUTABLE_TYPES
+                or value != original
+            ):
+                dirty_fields.append(field.name)
+        return dirty_fields
+
+    def _update_snapshot(self, update_fields=None):
+        if update_fields is None:
+            self._state.snapshot = take_snapshot(self)
+            return
+        snapshot = self._state.snapshot
+        instance_dict = self.__dict__
+        for name in update_fields:
+            attname = self._meta.get_field(name).attname
+            if attname in instance_dict:
+                snapshot[attname] = instance_dict[attname]
+
+    def save(self, *args, **kwargs):
+        tracked = getattr(self._state, "snapshot", None) is not None
+        if (
+            tracked
+            and not args
+            and kwargs.get("update_fields") is None
+            and not kwargs.get("force_insert")
+            and kwargs.get("using") in (None, self._state.db)
+        ):
+            dirty_fields = self.get_dirty_fields()
+            # Changing the primary key of an instance saves a new row.
+            if self._meta.pk.name not in dirty_fields:
+                # Values computed by pre_save(), such as auto_now ones, are
+                # only saved for fields part of update_fields.
+                update_fields = dirty_fields + [
+                    name
+                    for name in _get_pre_save_field_names(self.__class__)
+                    if name not in dirty_fields
+                ]
+                if not update_fields:
+                    self._save_unchanged(kwargs.get("using") or self._state.db)
+                    return
+                kwargs["update_fields"] = update_fields
+        super().save(*args, **kwargs)
+        if tracked:
+            self._update_snapshot(kwargs.get("update_fields"))
+
+    def _save_unchanged(self, using):
+        # Nothing needs to be written but receivers still expect to be notified
+        # of the save as Model.save() would have done without update_fields.
+        origin = self.__class__
+        pre_save.send(
+            sender=origin, instance=self, raw=False, using=using, update_fields=None
+        )
+        post_save.send(
+            sender=origin,
+            instance=self,
+            created=False,
+            update_fields=None,
+            raw=False,
+            using=using,
+        )
+
     def seal(self):
         """
         Seal the instance to turn deferred and related fields access that would
@@ -90,9 +226,63 @@ class SealableModel(models.Model):
                     obj=cls,
                 )
             )
+        errors.extend(check_fetch_profiles(cls))
         return errors
 
 
+# Values of these types cannot be mutated in place and can thus be compared to
+# their snapshotted value to determine whether or not they changed.
+_IMMUTABLE_TYPES = frozenset(
+    {
+        type(None),
+        bool,
+        int,
+        float,
+        str,
+        bytes,
+        Decimal,
+        date,
+        datetime,
+        time,
+        timedelta,
+        UUID,
+    }
+)
+
+
+@lru_cache(maxsize=None)
+def _get_pre_save_field_names(model):
+    """
+    Return the names of the concrete fields of model whose pre_save() can
+    change their value when an existing row is updated.
+    """
+    names = []
+    for field in model._meta.concrete_fields:
+        if type(field).pre_save is models.Field.pre_save:
+            continue
+        # Date and time fields only change on update when auto_now is set.
+        if getattr(field, "auto_now", True) is False:
+            continue
+        names.append(field.name)
+    return tuple(names)
+
+
+@lru_cache(maxsize=None)
+def _has_plain_init(model):
+    """
+    Return whether Model.__init__() assigns concrete field values of model
+    instances to their __dict__ without side effects.
+    """
+    if model.__init__ is not models.Model.__init__:
+        return False
+    for field in model._meta.concrete_fields:
+        descriptor = getattr(model, field.attname, None)
+        descriptor_setter = getattr(type(descriptor), "__set__", None)
+        if descriptor_setter not in (None, ForeignKeyDeferredAttribute.__set__):
+            return False
+    return True
+
+
 def make_descriptor_sealable(model, attname):
     """
     Make a descriptor sealable if a sealable class is defined.
@@ -113,7 +303,7 @@ def make_remote_field_descriptor_sealable(model, related_model, remote_field):
     """
     Make a remote field descriptor sealable if a sealable class is defined.
     """
-    if not issubclass(related_model, SealableModel):
+    if not is_model_sealable(related_model):
         return
     accessor_name = remote_field.get_accessor_name()
     # Self-referential many-to-many fields don't have a reverse accessor.
@@ -131,6 +321,7 @@ def make_model_sealable(model):
     done loading models such as from an AppConfig.ready().
     """
     opts = model._meta
+    _sealable_models.add(opts.concrete_model)
     for field in opts.local_fields + opts.local_many_to_many + opts.private_fields:
         name = field.name
         attnames = {name, getattr(field, "attname", name)}
@@ -152,3 +343,67 @@ def make_model_sealable(model):
     if not issubclass(model, SealableModel):
         for related_object in opts.related_objects:
             make_descriptor_sealable(model, related_object.get_accessor_name())
+
+
+# Non-SealableModel subclasses made sealable.
+_sealable_models = set()
+
+
+def is_model_sealable(model):
+    return issubclass(model, SealableModel) or (
+        model._meta.concrete_model in _sealable_models
+    )
+
+
+class _SealableQuerySetType(type):
+    pass
+
+
+@lru_cache(maxsize=None)
+def _sealable_queryset_type_factory(queryset_cls):
+    if issubclass(queryset_cls, SealableQuerySet):
+        return queryset_cls
+    metaclass = type(queryset_cls)
+    if metaclass is type:
+        # Allow instances of the dynamically created class to be pickled.
+        metaclass = _SealableQuerySetType
+    return metaclass(
+        f"Sealable{queryset_cls.__name__}",
+        (SealableQuerySet, queryset_cls),
+        {"__module__": queryset_cls.__module__, "_unsealable_class": queryset_cls},
+    )
+
+
+copyreg.pickle(
+    _SealableQuerySetType,
+    lambda cls: (_sealable_queryset_type_factory, (cls._unsealable_class,)),
+)
+
+
+def _deconstruct_unsealable_manager(manager):
+    # Managers made sealable deconstruct as their original class to leave
+    # migrations unaffected.
+    unsealable_manager = copy.copy(manager)
+    unsealable_manager.__class__ = manager._unsealable_class
+    return unsealable_manager.deconstruct()
+
+
+@lru_cache(maxsize=None)
+def _sealable_manager_type_factory(manager_cls):
+    queryset_cls = _sealable_queryset_type_factory(manager_cls._queryset_class)
+    sealable_manager_cls = manager_cls.from_queryset(
+        queryset_cls, f"Sealable{manager_cls.__name__}"
+    )
+    sealable_manager_cls._unsealable_class = manager_cls
+    sealable_manager_cls.deconstruct = _deconstruct_unsealable_manager
+    return sealable_manager_cls
+
+
+def make_model_managers_sealable(model):
+    """
+    Make the managers of a non-SealableModel subclass return SealableQuerySet
+    instances.
+    """
+    for manager in model._meta.managers:
+        if not issubclass(manager._queryset_class, SealableQuerySet):
+            manager.__class__ = _sealable_manager_type_factory(manager.__class__)
@@ -0,0 +1,119 @@
+import os
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+
+from django.db import connections
+from django.db.models import Max, Min
+
+from .workers import worker_task
+
+
+def get_pk_ranges(queryset, partitions):
+    """
+    Return up to ``partitions`` contiguous (lower, upper) primary key ranges,
+    lower inclusive and upper exclusive, covering the rows of queryset.
+
+    Integer primary keys are split evenly between their minimum and maximum
+    values while other ones are split at row count quantiles. The lower bound
+    of the first range and the upper bound of the last one are None.
+    """
+    queryset = queryset.order_by()
+    bounds = queryset.aggregate(lower=Min("pk"), upper=Max("pk"))
+    lower, upper = bounds["lower"], bounds["upper"]
+    if lower is None:
+        return []
+    if isinstance(lower, int) and isinstance(upper, int):
+        step = (upper - lower + 1) / partitions
+        boundaries = [lower + int(step * index) for index in range(1, partitions)]
+    else:
+        count = queryset.count()
+        pks = queryset.order_by("pk").values_list("pk", flat=True)
+        boundaries = [
+            pks[count * index // partitions] for index in range(1, partitions)
+        ]
+    boundaries = sorted(set(boundaries) - {lower})
+    return list(zip([None, *boundaries], [*boundaries, None]))
+
+
+def get_partitions(queryset, partitions):
+    """Return the querysets of the primary key ranges of queryset."""
+    querysets = []
+    for lower, upper in get_pk_ranges(queryset, partitions):
+        partition = queryset
+        if lower is not None:
+            partition = partition.filter(pk__gte=lower)
+        if upper is not None:
+            partition = partition.filter(pk__lt=upper)
+        querysets.append(partition)
+    return querysets
+
+
+def _initialize_worker():
+    import django
+    from django.apps import apps
+
+    if not apps.ready:
+        django.setup()
+    # Connections inherited from a forked parent process share its sockets
+    # and must neither be used nor closed.
+    for connection in connections.all(initialized_only=True):
+        connection.connection = None
+
+
+def _get_queryset_state(queryset):
+    # Pickling a queryset evaluates it, send its unevaluated state instead.
+    queryset.query
+    return (queryset.__class__, {**queryset.__dict__, "_result_cache": None})
+
+
+@worker_task
+def _evaluate_partition_task(function, queryset_state):
+    queryset_class, state = queryset_state
+    queryset = queryset_class.__new__(queryset_class)
+    queryset.__dict__.update(state)
+    return [function(obj) for obj in queryset]
+
+
+def parallel_map(function, queryset, partitions=None, ordered=True, executor=None):
+    """
+    Split the sealed queryset into primary key ranges, evaluate each of them
+    with ``executor``, a process pool by default, and yield the results of
+    calling function with each retrieved instance.
+
+    Results are streamed in primary key range order when ``ordered`` is true
+    and as soon as partitions complete otherwise. In an atomic block,
+    partitions are evaluated in the current process as other connections
+    can't see uncommitted changes.
+    """
+    if partitions is None:
+        partitions = (os.cpu_count() or 1) * 4
+    querysets = get_partitions(queryset, partitions)
+    if connections[queryset.db].in_atomic_block:
+        for partition in querysets:
+            yield from map(function, partition)
+        return
+    owned_executor = executor is None
+    if owned_executor:
+        executor = ProcessPoolExecutor(initializer=_initialize_worker)
+    futures = []
+    try:
+        for partition in querysets:
+            futures.append(
+                executor.submit(
+                    _evaluate_partition_task, function, _get_queryset_state(partition)
+                )
+            )
+        if ordered:
+            for future in futures:
+                yield from future.result()
+            return
+        pending = set(futures)
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                yield from future.result()
+    finally:
+        # Don't evaluate the remaining partitions if iteration is abandoned.
+        for future in futures:
+            future.cancel()
+        if owned_executor:
+            executor.shutdown(cancel_futures=True)
@@ -0,0 +1,304 @@
+from functools import lru_cache
+from inspect import signature
+
+from django.core import checks
+from django.core.exceptions import FieldDoesNotExist
+from django.db.models import Prefetch
+from django.db.models.constants import LOOKUP_SEP
+from django.utils.functional import cached_property
+
+
+class FetchProfile:
+    """
+    Named combination of only()/defer(), select_related(), prefetch_related()
+    and seal() options declared through the ``seal_profiles`` attribute of
+    SealableModel subclasses and applied by ``SealableQuerySet.profile()``.
+    """
+
+    def __init__(
+        self, *, only=None, defer=(), select_related=(), prefetch_related=(), **seal
+    ):
+        self.only = tuple(only) if only is not None else None
+        self.defer = tuple(defer)
+        self.select_related = tuple(select_related)
+        self.prefetch_related = tuple(prefetch_related)
+        self.seal = seal
+        self.model = None
+
+    def bind(self, model, name):
+        """Return a copy of the profile bound to model under name."""
+        profile = self.__class__.__new__(self.__class__)
+        profile.__dict__.update(self.__dict__)
+        profile.model = model
+        profile.name = name
+        return profile
+
+    @cached_property
+    def select_related_lookups(self):
+        """The query select_related structure of the profile."""
+        if not self.select_related:
+            return False
+        queryset = self.model._base_manager.select_related(*self.select_related)
+        return queryset.query.select_related
+
+    @cached_property
+    def select_related_getters(self):
+        """The select related walker plan of the profile."""
+        from .query import get_restricted_select_related_getters
+
+        return tuple(
+            get_restricted_select_related_getters(
+                self.select_related_lookups, self.model._meta
+            )
+        )
+
+    def apply(self, queryset):
+        """Apply the profile to queryset and seal it."""
+        if self.only is not None:
+            queryset = queryset.only(*self.only)
+        if self.defer:
+            queryset = queryset.defer(*self.defer)
+        if self.select_related:
+            queryset = queryset.select_related(*self.select_related)
+        if self.prefetch_related:
+            queryset = queryset.prefetch_related(*self.prefetch_related)
+        queryset = queryset.seal(**self.seal)
+        queryset._seal_profile = self
+        return queryset
+
+    def _check_lookup(self, option, lookup, follow_attributes=False):
+        opts = self.model._meta
+        for name in lookup.split(LOOKUP_SEP):
+            if opts is None:
+                break
+            try:
+                field = opts.get_field(name)
+            except FieldDoesNotExist:
+                # Prefetching through arbitrary attributes is allowed.
+                if follow_attributes and hasattr(opts.model, name):
+                    break
+                return [self._lookup_error(option, lookup, name)]
+            if option == "select_related" and (
+                not field.is_relation or field.many_to_many or field.one_to_many
+            ):
+                return [self._lookup_error(option, lookup, name)]
+            if field.is_relation and field.related_model is not None:
+                opts = field.related_model._meta
+            else:
+                opts = None
+        return []
+
+    def _lookup_error(self, option, lookup, name):
+        return checks.Error(
+            "Fetch profile '%s' %s lookup '%s' refers to '%s' which is not a "
+            "valid field." % (self.name, option, lookup, name),
+            id="seal.E004",
+            obj=self.model,
+        )
+
+    def check(self):
+        errors = []
+        for option in ("only", "defer", "select_related"):
+            for lookup in getattr(self, option) or ():
+                errors.extend(self._check_lookup(option, lookup))
+        for lookup in self.prefetch_related:
+            if isinstance(lookup, Prefetch):
+                lookup = lookup.prefetch_through
+            errors.extend(
+                self._check_lookup("prefetch_related", lookup, follow_attributes=True)
+            )
+        return errors
+
+
+def _freeze_declaration(declaration):
+    """
+    Turn a fields declaration into a sorted tuple of (name, nested) pairs
+    where nested is None for fields that don't declare nested fields.
+    """
+    if isinstance(declaration, type) or hasattr(declaration, "fields"):
+        declaration = get_serializer_declaration(declaration)
+    items = {}
+    if isinstance(declaration, dict):
+        declaration = [declaration]
+    for item in declaration:
+        if isinstance(item, str):
+            items.setdefault(item, None)
+            continue
+        for name, nested in item.items():
+            if nested is None or nested is True:
+                items.setdefault(name, None)
+            else:
+                items[name] = _freeze_declaration(nested)
+    return tuple(sorted(items.items()))
+
+
+def get_serializer_declaration(serializer):
+    """
+    Return the fields declaration of a serializer class or instance exposing
+    Django REST framework's ``fields`` interface.
+    """
+    if isinstance(serializer, type):
+        serializer = serializer()
+    declaration = {}
+    for field in serializer.fields.values():
+        if getattr(field, "write_only", False):
+            continue
+        nested_serializer = getattr(field, "child", field)
+        nested = None
+        if hasattr(nested_serializer, "fields"):
+            # Nested serializers, possibly declared with many=True.
+            nested = get_serializer_declaration(nested_serializer)
+        if field.source == "*":
+            if nested:
+                declaration.update(nested)
+            continue
+        *path, name = field.source.split(".")
+        target = declaration
+        for part in path:
+            if not isinstance(target.get(part), dict):
+                target[part] = {}
+            target = target[part]
+        if nested is not None or not isinstance(target.get(name), dict):
+            target[name] = nested
+    return declaration
+
+
+def _infer_lookups(opts, declaration, prefix=""):
+    """
+    Return the only(), select_related() and prefetch_related() lookups
+    required to access the fields of a frozen declaration.
+    """
+    only, select_related, prefetch_related = [], [], []
+    for name, nested in declaration:
+        try:
+            field = opts.get_field(name)
+        except FieldDoesNotExist:
+            # Attributes and properties can't be inferred.
+            continue
+        path = prefix + name
+        if not field.is_relation:
+            only.append(path)
+        elif field.many_to_many or field.one_to_many:
+            if nested is None:
+                prefetch_related.append(path)
+            else:
+                prefetch_related.append(
+                    Prefetch(path, _get_prefetch_queryset(field, nested))
+                )
+        elif field.related_model is None:
+            # Generic foreign keys.
+            only.extend([prefix + field.ct_field, prefix + field.fk_field])
+            prefetch_related.append(path)
+        else:
+            only.append(path)
+            if nested is None and field.concrete:
+                # Only the value of the foreign key is required.
+                continue
+            select_related.append(path)
+            lookups = _infer_lookups(
+                field.related_model._meta, nested or (), path + LOOKUP_SEP
+            )
+            only.extend(lookups[0])
+            select_related.extend(lookups[1])
+            prefetch_related.extend(lookups[2])
+    return only, select_related, prefetch_related
+
+
+def _get_prefetch_queryset(field, declaration):
+    only, select_related, prefetch_related = _infer_lookups(
+        field.related_model._meta, declaration
+    )
+    remote_field = getattr(field, "field", None)
+    if remote_field is not None and field.one_to_many:
+        # The foreign key is required to attach objects to their instance.
+        only.append(remote_field.name)
+    elif hasattr(field, "object_id_field_name"):
+        only.extend([field.content_type_field_name, field.object_id_field_name])
+    queryset = field.related_model._default_manager.only(*only or ["pk"])
+    if select_related:
+        queryset = queryset.select_related(*select_related)
+    if prefetch_related:
+        queryset = queryset.prefetch_related(*prefetch_related)
+    return queryset
+
+
+@lru_cache(maxsize=100)
+def _get_fields_fetch_profile(model, declaration, seal):
+    only, select_related, prefetch_related = _infer_lookups(model._meta, declaration)
+    profile = FetchProfile(
+        only=only or ["pk"],
+        select_related=select_related,
+        prefetch_related=prefetch_related,
+        **dict(seal),
+    )
+    return profile.bind(model, "fields")
+
+
+@lru_cache(maxsize=100)
+def _get_serializer_fetch_profile(model, serializer, seal):
+    # Serializer classes are keyed by identity as retrieving their declaration
+    # instantiates them and walks their fields.
+    return _get_fields_fetch_profile(model, _freeze_declaration(serializer), seal)
+
+
+def get_fields_fetch_profile(model, fields, **seal):
+    """
+    Return a fetch profile of model that loads the fields and relationships
+    output by fields, a nested mapping or iterable of names or a Django REST
+    framework serializer class, and nothing more.
+
+    Relationships declared without nested fields are only loaded as their
+    primary key values and declared names that are not model fields, such as
+    properties, are ignored. Profiles are cached.
+    """
+    seal = tuple(sorted(seal.items()))
+    if isinstance(fields, type):
+        return _get_serializer_fetch_profile(model, fields, seal)
+    return _get_fields_fetch_profile(model, _freeze_declaration(fields), seal)
+
+
+@lru_cache(maxsize=None)
+def get_fetch_profiles(model):
+    """Return the bound fetch profiles of model by name."""
+    profiles = {}
+    for name, profile in getattr(model, "seal_profiles", {}).items():
+        if not isinstance(profile, FetchProfile):
+            profile = FetchProfile(**profile)
+        profiles[name] = profile.bind(model, name)
+    return profiles
+
+
+def check_fetch_profiles(model):
+    seal_profiles = getattr(model, "seal_profiles", {})
+    if not isinstance(seal_profiles, dict):
+        return [
+            checks.Error(
+                "'seal_profiles' must be a dictionary.",
+                id="seal.E003",
+                obj=model,
+            )
+        ]
+    from .query import SealableQuerySet
+
+    errors = []
+    seal_signature = signature(SealableQuerySet.seal)
+    for name, profile in seal_profiles.items():
+        try:
+            if not isinstance(profile, FetchProfile):
+                profile = FetchProfile(**profile)
+            seal_signature.bind(None, **profile.seal)
+        except TypeError as exc:
+            errors.append(
+                checks.Error(
+                    "Fetch profile '%s' is invalid: %s." % (name, exc),
+                    hint="Fetch profiles must be FetchProfile instances or "
+                    "dictionaries of FetchProfile arguments.",
+                    id="seal.E003",
+                    obj=model,
+                )
+            )
+    if errors:
+        return errors
+    for profile in get_fetch_profiles(model).values():
+        errors.extend(profile.check())
+    return errors
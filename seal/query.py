@@ -1,9 +1,33 @@
+import copy
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from contextvars import copy_context
 from functools import partial
 from operator import attrgetter
 
-from django.db import models
+from django.db import connections, models, transaction
+from django.db.models.constants import LOOKUP_SEP
+from django.db.models.query import (
+    get_related_populators,
+    normalize_prefetch_lookups,
+    prefetch_related_objects,
+)
 from django.db.models.query_utils import select_related_descend
 
+from .compiled import (
+    compile_query,
+    compiled_query_cache,
+    get_cached_sql_compiler,
+    get_query_fingerprint,
+)
+from .exceptions import UnsealedAttributeAccess
+from .frozen import get_frozen
+from .introspection import get_concrete_attnames
+from .partitions import parallel_map
+from .profiles import FetchProfile, get_fetch_profiles
+from .tracing import get_current_span, is_tracing, start_span, timed_walker
+from .workers import worker_task
+
 cached_value_getter = attrgetter("get_cached_value")
 
 
@@ -35,6 +59,26 @@ def get_unrestricted_select_related_getters(opts, max_depth, cur_depth=1):
         )
 
 
+def get_select_related_getters(query, opts):
+    """Turn the select_related of query into a tree of attribute getters."""
+    select_related = query.select_related
+    if isinstance(select_related, dict):
+        return tuple(get_restricted_select_related_getters(select_related, opts))
+    return tuple(
+        get_unrestricted_select_related_getters(opts, max_depth=query.max_depth)
+    )
+
+
+def take_snapshot(obj):
+    """Return a mapping of the loaded concrete field values of obj."""
+    instance_dict = obj.__dict__
+    return {
+        attname: instance_dict[attname]
+        for attname in get_concrete_attnames(obj.__class__)
+        if attname in instance_dict
+    }
+
+
 def walk_select_relateds(obj, getters):
     """Walk select related of obj from getters."""
     for getter, nested_getters in getters:
@@ -46,12 +90,111 @@ def walk_select_relateds(obj, getters):
         yield from walk_select_relateds(related_obj, nested_getters)
 
 
+def intern_select_relateds(obj, getters, interned):
+    """
+    Walk select related of obj from getters while replacing many-to-one
+    related objects already encountered at the same position of the tree by
+    their first occurrence.
+    """
+    for node in getters:
+        getter, nested_getters = node
+        related_obj = getter(obj)
+        if related_obj is None:
+            continue
+        field = getter.__self__
+        if field.many_to_one:
+            # Objects retrieved through the same select related path share
+            # their loaded fields and nested select related.
+            key = (id(node), related_obj.pk)
+            interned_obj = interned.get(key)
+            if interned_obj is not None:
+                field.set_cached_value(obj, interned_obj)
+                continue
+            interned[key] = related_obj
+        yield related_obj
+        yield from intern_select_relateds(related_obj, nested_getters, interned)
+
+
+def group_prefetch_lookups(lookups):
+    """
+    Group prefetch lookups that share a top level relationship and thus
+    have to be performed sequentially.
+    """
+    groups = []
+    for lookup in normalize_prefetch_lookups(lookups):
+        names = {
+            lookup.prefetch_through.split(LOOKUP_SEP, 1)[0],
+            lookup.prefetch_to.split(LOOKUP_SEP, 1)[0],
+        }
+        group_lookups = [lookup]
+        for group in groups[:]:
+            if group[0] & names:
+                groups.remove(group)
+                names |= group[0]
+                group_lookups = group[1] + group_lookups
+        groups.append((names, group_lookups))
+    return [group_lookups for _, group_lookups in groups]
+
+
+_prefetch_executor = None
+_prefetch_executor_lock = threading.Lock()
+
+
+def _get_prefetch_executor():
+    global _prefetch_executor
+    if _prefetch_executor is None:
+        with _prefetch_executor_lock:
+            if _prefetch_executor is None:
+                _prefetch_executor = ThreadPoolExecutor(
+                    thread_name_prefix="seal-prefetch"
+                )
+    return _prefetch_executor
+
+
+@worker_task
+def _prefetch_related_objects_task(instances, lookups):
+    prefetch_related_objects(instances, *lookups)
+
+
+def prefetch_related_objects_concurrently(instances, lookup_groups):
+    """
+    Perform each group of prefetch lookups in a distinct thread, and thus
+    on its own database connection.
+    """
+    for instance in instances:
+        # Prevent concurrent initialization of the prefetched objects and
+        # related fields caches from losing results.
+        if not hasattr(instance, "_prefetched_objects_cache"):
+            instance._prefetched_objects_cache = {}
+        instance._state.fields_cache
+    executor = _get_prefetch_executor()
+    # Run tasks in a copy of the current context to preserve the state of
+    # context variables such as the current evaluation span.
+    futures = [
+        executor.submit(
+            copy_context().run, _prefetch_related_objects_task, instances, lookups
+        )
+        for lookups in lookup_groups
+    ]
+    for future in futures:
+        future.result()
+
+
 class SealedModelIterable(models.query.ModelIterable):
     def _sealed_iterator(self):
         """Iterate over objects and seal them."""
         objs = super().__iter__()
+        deferred_fields = None
+        track_changes = self.queryset._seal_track_changes
         for obj in objs:
-            obj._state.sealed = True
+            if deferred_fields is None:
+                # All the objects share the same set of deferred fields.
+                deferred_fields = frozenset(obj.get_deferred_fields())
+            state = obj._state
+            state.sealed = True
+            state.deferred_fields = deferred_fields
+            if track_changes:
+                state.snapshot = take_snapshot(obj)
             yield obj
 
     def _sealed_related_iterator(self, related_walker):
@@ -61,44 +204,465 @@ class SealedModelIterable(models.query.ModelIterable):
                 related_obj._state.sealed = True
             yield obj
 
-    def __iter__(self):
+    def _get_related_walker(self, select_related_getters=None):
+        """Return a function that walks the select related of an object."""
         query = self.queryset.query
-        select_related = query.select_related
-        if select_related:
-            opts = self.queryset.model._meta
-            if isinstance(select_related, dict):
-                select_related_getters = tuple(
-                    get_restricted_select_related_getters(
-                        self.queryset.query.select_related, opts
-                    )
-                )
-            else:
-                select_related_getters = tuple(
-                    get_unrestricted_select_related_getters(
-                        opts, max_depth=query.max_depth
-                    )
-                )
+        if not query.select_related:
+            return None
+        if select_related_getters is None:
+            select_related_getters = self._get_select_related_getters()
+        if self.queryset._seal_intern:
+            related_walker = partial(
+                intern_select_relateds,
+                getters=select_related_getters,
+                interned={},
+            )
+        else:
             related_walker = partial(
                 walk_select_relateds, getters=select_related_getters
             )
+        span = get_current_span(self.queryset)
+        # Lazy results walk select related objects after the evaluation.
+        if span is not None and not self.queryset._seal_lazy:
+            return timed_walker(span, related_walker)
+        return related_walker
+
+    def _get_select_related_getters(self):
+        query = self.queryset.query
+        profile = self.queryset._seal_profile
+        if profile is not None and query.select_related == (
+            profile.select_related_lookups
+        ):
+            # Reuse the walker plan built once for the profile.
+            return profile.select_related_getters
+        return get_select_related_getters(query, self.queryset.model._meta)
+
+    def _cached_sql_iterator(self):
+        """
+        Iterate over sealed objects using the cached compiled SQL and row
+        building plan of the queryset's shape or return None if it can't be.
+        """
+        queryset = self.queryset
+        query = queryset.query
+        db = queryset.db
+        key = get_query_fingerprint(query, db)
+        if key is None:
+            return None
+        entry = compiled_query_cache.get(key)
+        if entry is None:
+            compiler = query.get_compiler(using=db)
+            compiled = compile_query(compiler)
+            if compiled is None:
+                return None
+            entry = (
+                compiled,
+                SealedRowBuilder(compiler, db),
+                (self._get_select_related_getters() if query.select_related else None),
+            )
+            compiled_query_cache.set(key, entry)
+        compiled, builder, select_related_getters = entry
+        compiler = get_cached_sql_compiler(query, db, compiled)
+        if compiler is None:
+            return None
+        results = compiler.execute_sql(
+            chunked_fetch=self.chunked_fetch, chunk_size=self.chunk_size
+        )
+        builder = builder.bind(
+            related_walker=self._get_related_walker(select_related_getters),
+            known_related_objects=get_known_related_objects(queryset),
+            track_changes=queryset._seal_track_changes,
+        )
+        return map(builder.build, compiler.results_iter(results))
+
+    def __iter__(self):
+        if self.queryset._seal_cache_sql:
+            iterator = self._cached_sql_iterator()
+            if iterator is not None:
+                yield from iterator
+                return
+        related_walker = self._get_related_walker()
+        if related_walker is not None:
             iterator = self._sealed_related_iterator(related_walker)
         else:
             iterator = self._sealed_iterator()
         yield from iterator
 
 
+def get_klass_info_column_names(klass_info, select, prefix=""):
+    """
+    Yield the attribute path and position of the selected columns of
+    klass_info and its related klass infos.
+    """
+    for index in klass_info["select_fields"]:
+        yield prefix + select[index][0].target.attname, index
+    for related_klass_info in klass_info.get("related_klass_infos", ()):
+        field = related_klass_info["field"]
+        if related_klass_info["reverse"]:
+            name = field.related_query_name()
+        else:
+            name = field.name
+        yield from get_klass_info_column_names(
+            related_klass_info, select, prefix + name + LOOKUP_SEP
+        )
+
+
+def get_known_related_objects(queryset):
+    """
+    Return the known related objects of queryset along with a getter of the
+    value they are keyed by on objects.
+    """
+    opts = queryset.model._meta
+    return [
+        (
+            field,
+            related_objs,
+            attrgetter(
+                *[
+                    (
+                        field.attname
+                        if from_field == "self"
+                        else opts.get_field(from_field).attname
+                    )
+                    for from_field in field.from_fields
+                ]
+            ),
+        )
+        for field, related_objs in queryset._known_related_objects.items()
+    ]
+
+
+class SealedRowBuilder:
+    """
+    Build sealed model instances from rows of an executed model query
+    compiler the same way SealedModelIterable does.
+    """
+
+    def __init__(
+        self,
+        compiler,
+        db,
+        related_walker=None,
+        known_related_objects=(),
+        track_changes=False,
+    ):
+        select, klass_info = compiler.select, compiler.klass_info
+        self.model = klass_info["model"]
+        self.db = db
+        select_fields = klass_info["select_fields"]
+        self.model_fields_slice = slice(select_fields[0], select_fields[-1] + 1)
+        self.init_list = [
+            column[0].target.attname for column in select[self.model_fields_slice]
+        ]
+        self.related_populators = get_related_populators(klass_info, select, db)
+        self.annotation_col_map = compiler.annotation_col_map
+        self.related_walker = related_walker
+        self.known_related_objects = known_related_objects
+        self.track_changes = track_changes
+        self.deferred_fields = None
+
+    def bind(self, related_walker=None, known_related_objects=(), track_changes=False):
+        """Return a copy of the builder for a distinct evaluation."""
+        builder = copy.copy(self)
+        builder.related_walker = related_walker
+        builder.known_related_objects = known_related_objects
+        builder.track_changes = track_changes
+        return builder
+
+    def build(self, row):
+        """Build the sealed model instance of row."""
+        obj = self.model.from_db(self.db, self.init_list, row[self.model_fields_slice])
+        for related_populator in self.related_populators:
+            related_populator.populate(row, obj)
+        for attr_name, col_pos in self.annotation_col_map.items():
+            setattr(obj, attr_name, row[col_pos])
+        for field, rel_objs, rel_getter in self.known_related_objects:
+            if field.is_cached(obj):
+                continue
+            try:
+                rel_obj = rel_objs[rel_getter(obj)]
+            except KeyError:
+                pass
+            else:
+                setattr(obj, field.name, rel_obj)
+        if self.deferred_fields is None:
+            self.deferred_fields = frozenset(obj.get_deferred_fields())
+        state = obj._state
+        state.sealed = True
+        state.deferred_fields = self.deferred_fields
+        if self.track_changes:
+            state.snapshot = take_snapshot(obj)
+        if self.related_walker is not None:
+            for related_obj in self.related_walker(obj):
+                related_obj._state.sealed = True
+        return obj
+
+
+class SealedColumns:
+    """
+    Column oriented results of a sealed queryset.
+
+    Each selected column is stored in a tuple retrievable by its attribute
+    path (e.g. ``"location__latitude"``). Accessing a column that wasn't
+    selected through ``only()``/``defer()`` and ``select_related()`` raises
+    UnsealedAttributeAccess and sealed model instances are only built on
+    demand through ``row()`` and ``rows()``.
+    """
+
+    def __init__(self, queryset):
+        self.model = queryset.model
+        db = queryset.db
+        compiler = queryset.query.get_compiler(using=db)
+        results = compiler.execute_sql()
+        rows = list(compiler.results_iter(results))
+        if rows:
+            self._columns = tuple(zip(*rows))
+        else:
+            self._columns = ((),) * len(compiler.select)
+        self._len = len(rows)
+        del rows
+        self._positions = dict(
+            get_klass_info_column_names(compiler.klass_info, compiler.select)
+        )
+        self._positions.update(compiler.annotation_col_map)
+        self._builder = SealedRowBuilder(
+            compiler,
+            db,
+            related_walker=queryset._iterable_class(queryset)._get_related_walker(),
+            track_changes=queryset._seal_track_changes,
+        )
+
+    def __repr__(self):
+        return "<SealedColumns %s: %s>" % (self.model.__name__, ", ".join(self.names))
+
+    def __len__(self):
+        return self._len
+
+    def __contains__(self, name):
+        return name in self._positions
+
+    def __getitem__(self, name):
+        try:
+            position = self._positions[name]
+        except KeyError:
+            raise UnsealedAttributeAccess(
+                'Attempt to fetch undeclared column "%s" on sealed <%s columns>.'
+                % (name, self.model.__name__)
+            ) from None
+        return self._columns[position]
+
+    @property
+    def names(self):
+        return tuple(self._positions)
+
+    def row(self, index):
+        """Build the sealed model instance of the row at index."""
+        return self._builder.build(tuple(column[index] for column in self._columns))
+
+    def rows(self):
+        """Iterate over the sealed model instances of each row."""
+        for index in range(self._len):
+            yield self.row(index)
+
+
+class LazySealedResults:
+    """
+    Sequence of the rows of a sealed queryset that builds and seals model
+    instances on first access.
+    """
+
+    def __init__(self, rows, builder):
+        self._rows = rows
+        self._objs = [None] * len(rows)
+        self._builder = builder
+
+    def __len__(self):
+        return len(self._rows)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self._rows)))]
+        obj = self._objs[index]
+        if obj is None:
+            obj = self._objs[index] = self._builder.build(self._rows[index])
+            # Only keep a reference to the built instance.
+            self._rows[index] = None
+        return obj
+
+    def __iter__(self):
+        for index in range(len(self._rows)):
+            yield self[index]
+
+    def __reduce__(self):
+        return list, (list(self),)
+
+
+class SealedRawModelIterable(models.query.RawModelIterable):
+    def __iter__(self):
+        """Iterate over objects and seal them."""
+        deferred_fields = None
+        for obj in super().__iter__():
+            if deferred_fields is None:
+                deferred_fields = frozenset(obj.get_deferred_fields())
+            state = obj._state
+            state.sealed = True
+            state.deferred_fields = deferred_fields
+            yield obj
+
+
+class SealableRawQuerySet(models.query.RawQuerySet):
+    _iterable_class = models.query.RawModelIterable
+
+    def _clone(self):
+        clone = super()._clone()
+        clone._iterable_class = self._iterable_class
+        return clone
+
+    def iterator(self):
+        yield from self._iterable_class(self)
+
+    def using(self, alias):
+        clone = super().using(alias)
+        clone.__class__ = self.__class__
+        clone._iterable_class = self._iterable_class
+        return clone
+
+    def seal(self, iterable_class=SealedRawModelIterable):
+        if not issubclass(iterable_class, SealedRawModelIterable):
+            raise TypeError(
+                "iterable_class %r is not a subclass of SealedRawModelIterable"
+                % iterable_class
+            )
+        clone = self._clone()
+        clone._iterable_class = iterable_class
+        return clone
+
+
 class SealableQuerySet(models.QuerySet):
     _base_manager_class = None
+    _seal_intern = False
+    _seal_concurrent_prefetch = False
+    _seal_lazy = False
+    _seal_track_changes = False
+    _seal_profile = None
+    _seal_cache_sql = False
+
+    def _clone(self):
+        clone = super()._clone()
+        clone._seal_intern = self._seal_intern
+        clone._seal_concurrent_prefetch = self._seal_concurrent_prefetch
+        clone._seal_lazy = self._seal_lazy
+        clone._seal_track_changes = self._seal_track_changes
+        clone._seal_profile = self._seal_profile
+        clone._seal_cache_sql = self._seal_cache_sql
+        return clone
+
+    def _fetch_all(self):
+        if self._result_cache is None and issubclass(
+            self._iterable_class, SealedModelIterable
+        ):
+            if is_tracing():
+                self._traced_fetch_all()
+                return
+            if self._seal_lazy:
+                self._result_cache = self._lazy_sealed_results()
+        super()._fetch_all()
+
+    def _traced_fetch_all(self):
+        with start_span(self) as span:
+            with span.building():
+                if self._seal_lazy:
+                    self._result_cache = self._lazy_sealed_results()
+                else:
+                    self._result_cache = list(self._iterable_class(self))
+            span.rows = len(self._result_cache)
+            if self._prefetch_related_lookups and not self._prefetch_done:
+                with span.phase("prefetch"):
+                    self._prefetch_related_objects()
+
+    def _lazy_sealed_results(self):
+        db = self.db
+        compiler = self.query.get_compiler(using=db)
+        results = compiler.execute_sql()
+        rows = list(compiler.results_iter(results))
+        if not rows:
+            return []
+        known_related_objects = get_known_related_objects(self)
+        builder = SealedRowBuilder(
+            compiler,
+            db,
+            related_walker=self._iterable_class(self)._get_related_walker(),
+            known_related_objects=known_related_objects,
+            track_changes=self._seal_track_changes,
+        )
+        return LazySealedResults(rows, builder)
 
-    def as_manager(cls, seal=None):
-        manager = cls._base_manager_class.from_queryset(cls)(seal=seal)
+    def _prefetch_related_objects(self):
+        if (
+            self._seal_concurrent_prefetch
+            and len(self._result_cache) > 0
+            # Other connections can't see uncommitted changes.
+            and not connections[self.db].in_atomic_block
+        ):
+            lookup_groups = group_prefetch_lookups(self._prefetch_related_lookups)
+            if len(lookup_groups) > 1:
+                prefetch_related_objects_concurrently(self._result_cache, lookup_groups)
+                self._prefetch_done = True
+                return
+        super()._prefetch_related_objects()
+
+    def as_manager(cls, seal=None, replica=None):
+        manager = cls._base_manager_class.from_queryset(cls)(seal=seal, replica=replica)
         manager._built_with_as_manager = True
         return manager
 
     as_manager.queryset_only = True
     as_manager = classmethod(as_manager)
 
-    def seal(self, iterable_class=SealedModelIterable):
+    def raw(self, raw_query, params=(), translations=None, using=None):
+        queryset = super().raw(
+            raw_query, params=params, translations=translations, using=using
+        )
+        queryset.__class__ = SealableRawQuerySet
+        if issubclass(self._iterable_class, SealedModelIterable):
+            queryset = queryset.seal()
+        return queryset
+
+    def seal(
+        self,
+        iterable_class=SealedModelIterable,
+        *,
+        intern=None,
+        concurrent_prefetch=None,
+        lazy=None,
+        track_changes=None,
+        cache_sql=None,
+    ):
+        """
+        Seal the queryset to turn deferred and related fields access that
+        would require fetching from the database into warnings.
+
+        When ``intern`` is true, many-to-one objects retrieved through
+        ``select_related()`` that refer to the same row are shared between
+        the instances of the result set instead of being duplicated.
+
+        When ``concurrent_prefetch`` is true, ``prefetch_related()`` lookups
+        that don't share a top level relationship are performed concurrently
+        in distinct threads, and thus database connections, when not in an
+        atomic block.
+
+        When ``lazy`` is true, model instances are only built and sealed once
+        their row is first accessed after the queryset is evaluated.
+
+        When ``track_changes`` is true, the loaded field values of model
+        instances are snapshotted so ``save()`` only updates the changed ones.
+
+        When ``cache_sql`` is true, the SQL compiled for the queryset and its
+        row building plan are cached by shape, all but the WHERE clause, and
+        reused by querysets of the same shape.
+
+        Sealed querysets provide a ``sealed`` hint to database routers such
+        as ``seal.routers.SealedReplicaRouter``.
+        """
         if self._fields is not None:
             raise TypeError("Cannot call seal() after .values() or .values_list()")
         if not issubclass(iterable_class, SealedModelIterable):
@@ -108,4 +672,122 @@ class SealableQuerySet(models.QuerySet):
             )
         clone = self._clone()
         clone._iterable_class = iterable_class
+        # Allow database routers to tell sealed reads apart, the hints are
+        # shared between clones so they must be copied.
+        clone._hints = {**clone._hints, "sealed": True}
+        if intern is not None:
+            clone._seal_intern = intern
+        if concurrent_prefetch is not None:
+            clone._seal_concurrent_prefetch = concurrent_prefetch
+        if lazy is not None:
+            clone._seal_lazy = lazy
+        if track_changes is not None:
+            clone._seal_track_changes = track_changes
+        if cache_sql is not None:
+            clone._seal_cache_sql = cache_sql
         return clone
+
+    def profile(self, name):
+        """
+        Apply the fetch profile declared under name in the model's
+        ``seal_profiles``, or the specified FetchProfile, and seal the
+        queryset.
+        """
+        if isinstance(name, FetchProfile):
+            profile = name
+            if profile.model is None:
+                profile = profile.bind(self.model, None)
+            return profile.apply(self)
+        try:
+            profile = get_fetch_profiles(self.model)[name]
+        except KeyError:
+            raise ValueError(
+                "%s has no fetch profile named '%s'." % (self.model.__name__, name)
+            ) from None
+        return profile.apply(self)
+
+    def bulk_save(self, objs, batch_size=None):
+        """
+        Update the changed fields of objs retrieved from a queryset sealed
+        with track_changes=True through one bulk_update() per distinct set of
+        changed fields and return the number of rows matched.
+        """
+        groups = {}
+        for obj in objs:
+            dirty_fields = obj.get_dirty_fields()
+            if dirty_fields is None:
+                raise ValueError(
+                    "bulk_save() can only be used with instances retrieved from "
+                    "a queryset sealed with track_changes=True."
+                )
+            if dirty_fields:
+                groups.setdefault(tuple(dirty_fields), []).append(obj)
+        if not groups:
+            return 0
+        self._for_write = True
+        rows_updated = 0
+        with transaction.atomic(using=self.db, savepoint=False):
+            for fields, group in groups.items():
+                rows_updated += self.bulk_update(group, fields, batch_size=batch_size)
+        for fields, group in groups.items():
+            for obj in group:
+                obj._update_snapshot(fields)
+        return rows_updated
+
+    def frozen(self, key):
+        """
+        Return the sealed results of the queryset from a process-wide cache
+        under key, evaluating them on the first call.
+
+        The results and the objects they reference through select and
+        prefetch related lookups are frozen; accesses that would incur a
+        query raise UnsealedAttributeAccess, writes raise FrozenInstanceError
+        and the cache entry is discarded on any change to one of the models
+        involved.
+        """
+        queryset = self
+        if not issubclass(queryset._iterable_class, SealedModelIterable):
+            queryset = queryset.seal()
+        return get_frozen(key, queryset)
+
+    def parallel_map(self, function, partitions=None, ordered=True, executor=None):
+        """
+        Yield the results of calling function with each instance of the
+        sealed queryset, evaluated in ``partitions`` primary key ranges by a
+        process pool, or ``executor``, where each worker uses its own
+        database connection.
+
+        Results are yielded in primary key range order when ``ordered`` is
+        true and as soon as each range is evaluated otherwise.
+        """
+        if self._fields is not None:
+            raise TypeError(
+                "Cannot call parallel_map() after .values() or .values_list()"
+            )
+        if self.query.is_sliced:
+            raise TypeError("Cannot call parallel_map() after a slice has been taken.")
+        queryset = self
+        if not issubclass(queryset._iterable_class, SealedModelIterable):
+            queryset = queryset.seal()
+        return parallel_map(
+            function,
+            queryset,
+            partitions=partitions,
+            ordered=ordered,
+            executor=executor,
+        )
+
+    def columnar(self):
+        """
+        Evaluate the queryset into column oriented SealedColumns restricted
+        to the fields loaded according to ``only()``/``defer()`` and
+        ``select_related()``.
+        """
+        if self._fields is not None:
+            raise TypeError("Cannot call columnar() after .values() or .values_list()")
+        if self._prefetch_related_lookups:
+            raise TypeError("Cannot call columnar() after .prefetch_related()")
+        queryset = self
+        if not issubclass(queryset._iterable_class, SealedModelIterable):
+            queryset = queryset.seal()
+        return SealedColumns(queryset)
@@ -0,0 +1,187 @@
+import sys
+from collections import namedtuple
+from contextlib import ExitStack, contextmanager
+from contextvars import ContextVar
+from time import perf_counter
+
+from django.db import connections
+
+from .signals import unsealed_attribute_access
+
+UnsealedAccess = namedtuple("UnsealedAccess", ["instance", "name", "message"])
+
+_recorders = ContextVar("seal_unsealed_access_recorders", default=())
+
+
+def _record_unsealed_access(sender, instance, name, message, **kwargs):
+    for records in _recorders.get():
+        records.append(UnsealedAccess(instance, name, message))
+
+
+unsealed_attribute_access.connect(
+    _record_unsealed_access, dispatch_uid="seal.recording"
+)
+
+
+@contextmanager
+def record_unsealed_accesses():
+    """
+    Record the unsealed attribute accesses performed in the current context
+    into the yielded list.
+    """
+    records = []
+    token = _recorders.set(_recorders.get() + (records,))
+    try:
+        yield records
+    finally:
+        _recorders.reset(token)
+
+
+class UnsealedAccessCost:
+    """
+    Cost of the unsealed accesses of an attribute performed from a call site.
+    """
+
+    __slots__ = (
+        "model",
+        "name",
+        "filename",
+        "lineno",
+        "function",
+        "count",
+        "queries",
+        "db_time",
+        "wall_time",
+    )
+
+    def __init__(self, model, name, filename, lineno, function):
+        self.model = model
+        self.name = name
+        self.filename = filename
+        self.lineno = lineno
+        self.function = function
+        self.count = 0
+        self.queries = 0
+        self.db_time = 0.0
+        self.wall_time = 0.0
+
+    def __repr__(self):
+        return "<%s %s.%s at %s:%d: %d accesses, %d queries, %.6fs>" % (
+            self.__class__.__name__,
+            self.model._meta.label,
+            self.name,
+            self.filename,
+            self.lineno,
+            self.count,
+            self.queries,
+            self.db_time,
+        )
+
+
+class UnsealedAccessProfile:
+    """
+    Attribute the queries executed on behalf of unsealed accesses to the
+    model, attribute and call site that performed them.
+
+    The database time of an access is the time spent executing the queries it
+    triggered and its wall-clock time spans from the access to the end of the
+    last of them.
+    """
+
+    def __init__(self):
+        self.costs = {}
+        self._access = None
+
+    def ranked(self):
+        """Return the access costs ranked by total database time."""
+        return sorted(self.costs.values(), key=lambda cost: cost.db_time, reverse=True)
+
+    def _start_access(self, model, name, frame):
+        self._end_access()
+        code = frame.f_code
+        key = (model, name, code.co_filename, frame.f_lineno)
+        cost = self.costs.get(key)
+        if cost is None:
+            cost = self.costs[key] = UnsealedAccessCost(
+                model, name, code.co_filename, frame.f_lineno, code.co_name
+            )
+        cost.count += 1
+        start = perf_counter()
+        # [cost, frame, instruction, start, end]
+        self._access = [cost, frame, frame.f_lasti, start, start]
+
+    def _end_access(self):
+        access = self._access
+        if access is not None:
+            cost, _, _, start, end = access
+            cost.wall_time += end - start
+            self._access = None
+
+    def _get_access(self):
+        """Return the access the current query is executed on behalf of."""
+        access = self._access
+        if access is None:
+            return None
+        frame, instruction = access[1], access[2]
+        # The access is over once its frame moved past the instruction that
+        # performed it or returned.
+        if frame.f_lasti == instruction:
+            current = sys._getframe(2)
+            while current is not None:
+                if current is frame:
+                    return access
+                current = current.f_back
+        self._end_access()
+        return None
+
+    def __call__(self, execute, sql, params, many, context):
+        access = self._get_access()
+        if access is None:
+            return execute(sql, params, many, context)
+        start = perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            end = access[4] = perf_counter()
+            cost = access[0]
+            cost.queries += 1
+            cost.db_time += end - start
+
+
+_profiles = ContextVar("seal_unsealed_access_profiles", default=())
+
+
+def _profile_unsealed_access(sender, instance, name, frame=None, **kwargs):
+    if frame is None:
+        return
+    for profile in _profiles.get():
+        profile._start_access(sender, name, frame)
+
+
+unsealed_attribute_access.connect(
+    _profile_unsealed_access, dispatch_uid="seal.recording.profile"
+)
+
+
+@contextmanager
+def profile_unsealed_accesses(using=None):
+    """
+    Attribute the database and wall-clock time of the queries performed
+    because of unsealed attribute accesses in the current context to their
+    model, attribute and call site in the yielded UnsealedAccessProfile.
+
+    Queries are captured on all database connections unless the aliases to
+    capture are specified through ``using``.
+    """
+    if using is None:
+        using = [connection.alias for connection in connections.all()]
+    profile = UnsealedAccessProfile()
+    token = _profiles.set(_profiles.get() + (profile,))
+    try:
+        with ExitStack() as stack:
+            for alias in using:
+                stack.enter_context(connections[alias].execute_wrapper(profile))
+            yield profile
+    finally:
+        _profiles.reset(token)
+        profile._end_access()
@@ -0,0 +1,78 @@
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.core.signals import request_finished, request_started
+from django.db import DEFAULT_DB_ALIAS, connections
+
+_pinned = ContextVar("seal_pinned", default=False)
+
+
+def pin_primary():
+    """
+    Route reads of sealed querysets to the primary database in the current
+    context until unpin_primary() is called.
+    """
+    _pinned.set(True)
+
+
+def unpin_primary(**kwargs):
+    _pinned.set(False)
+
+
+# Writes pin reads to the primary database until the end of the request.
+request_started.connect(unpin_primary, dispatch_uid="seal.routers.request_started")
+request_finished.connect(unpin_primary, dispatch_uid="seal.routers.request_finished")
+
+
+class SealedReplicaRouter:
+    """
+    Database router that sends reads of sealed querysets, including the ones
+    of sealed prefetch querysets, to the SEAL_REPLICA_DATABASE alias.
+
+    Reads are sent to the SEAL_PRIMARY_DATABASE alias instead while it's in an
+    atomic block or once a write was routed in the current context. Managers
+    can override the replica alias to use through their ``replica`` argument,
+    ``False`` disabling replica reads.
+    """
+
+    def __init__(self, primary=None, replica=None):
+        self._primary = primary
+        self._replica = replica
+
+    @property
+    def primary(self):
+        if self._primary is not None:
+            return self._primary
+        return getattr(settings, "SEAL_PRIMARY_DATABASE", DEFAULT_DB_ALIAS)
+
+    @property
+    def replica(self):
+        if self._replica is not None:
+            return self._replica
+        return getattr(settings, "SEAL_REPLICA_DATABASE", None)
+
+    def db_for_read(self, model, **hints):
+        if not hints.get("sealed"):
+            return None
+        replica = hints.get("seal_replica", True)
+        if replica is True:
+            replica = self.replica
+        if not replica:
+            return None
+        primary = self.primary
+        if _pinned.get() or connections[primary].in_atomic_block:
+            return primary
+        return replica
+
+    def db_for_write(self, model, **hints):
+        pin_primary()
+        instance = hints.get("instance")
+        if instance is not None and instance._state.db == self.replica:
+            # Instances retrieved from the replica are written to the primary.
+            return self.primary
+        return None
+
+    def allow_relation(self, obj1, obj2, **hints):
+        if {obj1._state.db, obj2._state.db} <= {self.primary, self.replica}:
+            return True
+        return None
@@ -0,0 +1,172 @@
+import pickle
+
+from django.apps import apps
+
+from .introspection import (
+    get_concrete_attnames,
+    get_prefetch_accessors,
+    is_object_list,
+)
+
+FORMAT_VERSION = 1
+
+
+def dumps(objs, protocol=pickle.HIGHEST_PROTOCOL):
+    """
+    Serialize a list of model instances, along with their select related,
+    prefetch related and ``to_attr`` prefetched objects, to bytes.
+
+    Each distinct combination of model, loaded fields and loaded relations is
+    stored once and instances are stored as tuples of values referring to
+    each other by position in a shared table of instances.
+    """
+    positions = {}
+    table = []
+
+    def ref(obj):
+        try:
+            return positions[id(obj)]
+        except KeyError:
+            position = positions[id(obj)] = len(table)
+            table.append(obj)
+            return position
+
+    roots = tuple(ref(obj) for obj in objs)
+    labels = {}
+    shapes = {}
+    rows = []
+    # Instances are appended to the table as they are referenced.
+    for obj in table:
+        model = obj.__class__
+        state = obj._state
+        obj_dict = obj.__dict__
+        concrete_attnames = get_concrete_attnames(model)
+        attnames = tuple(
+            attname for attname in concrete_attnames if attname in obj_dict
+        )
+        annotation_names = []
+        to_attr_names = []
+        for name, value in obj_dict.items():
+            if name.startswith("_") or name in concrete_attnames:
+                continue
+            if is_object_list(value):
+                to_attr_names.append(name)
+            else:
+                annotation_names.append(name)
+        fields_cache = state.fields_cache
+        prefetched_cache = getattr(obj, "_prefetched_objects_cache", {})
+        prefetch_accessors = get_prefetch_accessors(model)
+        prefetched = []
+        for cache_name, queryset in prefetched_cache.items():
+            try:
+                prefetched.append((cache_name, prefetch_accessors[cache_name]))
+            except KeyError:
+                raise ValueError(
+                    "Cannot serialize the %r prefetched objects of %r."
+                    % (cache_name, obj)
+                )
+        shape_key = (
+            model,
+            state.db,
+            getattr(state, "sealed", False),
+            getattr(state, "frozen", False),
+            attnames,
+            tuple(annotation_names),
+            tuple(fields_cache),
+            tuple(prefetched),
+            tuple(to_attr_names),
+        )
+        try:
+            shape = shapes[shape_key]
+        except KeyError:
+            labels.setdefault(model._meta.label_lower, len(labels))
+            shape = shapes[shape_key] = len(shapes)
+        row = [shape]
+        row.extend(obj_dict[attname] for attname in attnames)
+        row.extend(obj_dict[name] for name in annotation_names)
+        row.extend(
+            None if related_obj is None else ref(related_obj)
+            for related_obj in fields_cache.values()
+        )
+        row.extend(
+            tuple(map(ref, queryset._result_cache))
+            for queryset in prefetched_cache.values()
+        )
+        row.extend(tuple(map(ref, obj_dict[name])) for name in to_attr_names)
+        rows.append(tuple(row))
+    payload = (
+        FORMAT_VERSION,
+        tuple(labels),
+        tuple(
+            (labels[model._meta.label_lower], *shape_key)
+            for model, *shape_key in shapes
+        ),
+        tuple(rows),
+        roots,
+    )
+    return pickle.dumps(payload, protocol=protocol)
+
+
+def loads(data):
+    """
+    Deserialize bytes returned by ``dumps()`` to the list of model instances
+    they were serialized from.
+    """
+    version, labels, shapes, rows, roots = pickle.loads(data)
+    if version != FORMAT_VERSION:
+        raise ValueError("Unsupported serialization format version %r." % version)
+    model_classes = [apps.get_model(label) for label in labels]
+    shapes = [(model_classes[model_index], *shape) for model_index, *shape in shapes]
+    deferred_fields = {}
+    objs = []
+    for row in rows:
+        model, db, _, _, attnames, annotation_names, *_ = shapes[row[0]]
+        values = row[1 : 1 + len(attnames)]  # noqa: E203
+        obj = model.from_db(db, attnames, values)
+        if annotation_names:
+            annotations = row[1 + len(attnames) :]  # noqa: E203
+            obj.__dict__.update(zip(annotation_names, annotations))
+        objs.append(obj)
+    for obj, row in zip(objs, rows):
+        shape = row[0]
+        (
+            model,
+            _,
+            sealed,
+            frozen,
+            attnames,
+            annotation_names,
+            cached_names,
+            prefetched,
+            to_attr_names,
+        ) = shapes[shape]
+        position = 1 + len(attnames) + len(annotation_names)
+        if cached_names:
+            fields_cache = obj._state.fields_cache
+            for name in cached_names:
+                related = row[position]
+                fields_cache[name] = None if related is None else objs[related]
+                position += 1
+        if prefetched:
+            prefetched_cache = obj._prefetched_objects_cache = {}
+            for cache_name, accessor in prefetched:
+                queryset = getattr(obj, accessor).get_queryset()
+                queryset._result_cache = [objs[related] for related in row[position]]
+                queryset._prefetch_done = True
+                prefetched_cache[cache_name] = queryset
+                position += 1
+        for name in to_attr_names:
+            obj.__dict__[name] = [objs[related] for related in row[position]]
+            position += 1
+        if sealed:
+            state = obj._state
+            try:
+                state.deferred_fields = deferred_fields[shape]
+            except KeyError:
+                state.deferred_fields = deferred_fields[shape] = frozenset(
+                    obj.get_deferred_fields()
+                )
+            state.sealed = True
+            if frozen:
+                state.frozen = True
+    return [objs[root] for root in roots]
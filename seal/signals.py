@@ -0,0 +1,6 @@
+from django.dispatch import Signal
+
+# Sent with the instance, the name of the accessed attribute, the warning
+# message and the frame performing the access whenever an attribute access on
+# a sealed instance would incur a database query.
+unsealed_attribute_access = Signal()
@@ -0,0 +1,185 @@
+import logging
+import re
+from collections import namedtuple
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.db.models.constants import LOOKUP_SEP
+from django.db.models.fields import DeferredAttribute
+from django.db.models.fields.related import (
+    ForwardManyToOneDescriptor,
+    ReverseOneToOneDescriptor,
+)
+from django.template.base import Node
+from django.template.defaulttags import ForNode
+
+from .signals import unsealed_attribute_access
+
+logger = logging.getLogger("seal.templating")
+
+TemplateAccess = namedtuple(
+    "TemplateAccess",
+    ["template_name", "lineno", "expression", "loop_variable", "lookup", "message"],
+)
+
+_render_annotated_code = Node.render_annotated.__code__
+_for_render_code = ForNode.render.__code__
+_variable_re = re.compile(r"[\w.]+")
+
+_recorders = ContextVar("seal_template_access_recorders", default=())
+
+
+def get_rendering_nodes(frame):
+    """
+    Return the template node being rendered from frame and its innermost
+    enclosing {% for %} node.
+    """
+    node = loop = None
+    while frame is not None:
+        code = frame.f_code
+        if code is _for_render_code:
+            for_node = frame.f_locals.get("self")
+            if node is None:
+                # The loop sequence is being resolved.
+                node = for_node
+            elif for_node is not node:
+                loop = for_node
+                break
+        elif code is _render_annotated_code and node is None:
+            node = frame.f_locals.get("self")
+        frame = frame.f_back
+    return node, loop
+
+
+def get_lookup(instance, name, path):
+    """
+    Return the lookup that would have prevented the unsealed access of name
+    on instance reached through path.
+    """
+    descriptor = getattr(instance.__class__, name, None)
+    if isinstance(descriptor, DeferredAttribute):
+        return "field %r" % name
+    lookup = LOOKUP_SEP.join(path + [name])
+    if isinstance(descriptor, (ForwardManyToOneDescriptor, ReverseOneToOneDescriptor)):
+        return "select_related(%r)" % lookup
+    return "prefetch_related(%r)" % lookup
+
+
+def get_template_access(instance, name, message, frame):
+    """
+    Return the TemplateAccess of the unsealed access of name on instance
+    performed from frame or None if it wasn't performed while rendering a
+    template.
+    """
+    node, loop = get_rendering_nodes(frame)
+    if node is None or node.origin is None:
+        return None
+    contents = node.token.contents
+    expression = contents
+    path = []
+    for variable in _variable_re.findall(contents):
+        parts = variable.split(".")
+        if name in parts[1:]:
+            # Relationships traversed from the variable to the accessed one.
+            expression = variable
+            path = parts[1 : parts.index(name, 1)]  # noqa: E203
+            break
+    loop_variable = None
+    if loop is not None:
+        loop_variable = ", ".join(loop.loopvars)
+    return TemplateAccess(
+        node.origin.template_name or node.origin.name,
+        node.token.lineno,
+        expression,
+        loop_variable,
+        get_lookup(instance, name, path),
+        message,
+    )
+
+
+def _record_template_access(sender, instance, name, message, frame=None, **kwargs):
+    recorders = _recorders.get()
+    if not recorders or frame is None:
+        return
+    access = get_template_access(instance, name, message, frame)
+    if access is not None:
+        for report in recorders:
+            report.add(access)
+
+
+unsealed_attribute_access.connect(
+    _record_template_access, dispatch_uid="seal.templating"
+)
+
+
+class TemplateAccessReport:
+    """
+    Unsealed attribute accesses performed while rendering templates
+    aggregated by template location and lookup that would prevent them.
+    """
+
+    def __init__(self):
+        self.accesses = []
+        self.counts = {}
+
+    def add(self, access):
+        self.accesses.append(access)
+        key = (access.template_name, access.lineno, access.lookup)
+        self.counts[key] = self.counts.get(key, 0) + 1
+
+    def __len__(self):
+        return len(self.accesses)
+
+    def __iter__(self):
+        return iter(self.accesses)
+
+    def summary(self):
+        """
+        Return a list of (template_name, lineno, lookup, count) tuples
+        ordered by location.
+        """
+        return [(*key, count) for key, count in sorted(self.counts.items())]
+
+    def __str__(self):
+        return "\n".join(
+            "%s:%d needs %s (%d unsealed accesses)" % entry for entry in self.summary()
+        )
+
+
+@contextmanager
+def record_template_accesses():
+    """
+    Record the unsealed attribute accesses performed while rendering Django
+    templates in the current context into the yielded TemplateAccessReport.
+    """
+    report = TemplateAccessReport()
+    token = _recorders.set(_recorders.get() + (report,))
+    try:
+        yield report
+    finally:
+        _recorders.reset(token)
+
+
+class TemplateAccessReportMiddleware:
+    """
+    Middleware that logs the unsealed attribute accesses performed while
+    rendering the templates of each response.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        with record_template_accesses() as report:
+            response = self.get_response(request)
+        for template_name, lineno, lookup, count in report.summary():
+            logger.warning(
+                "%s:%d needs %s (%d unsealed accesses while rendering %s).",
+                template_name,
+                lineno,
+                lookup,
+                count,
+                request.path,
+                extra={"request": request, "accesses": report.accesses},
+            )
+        return response
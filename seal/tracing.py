@@ -0,0 +1,242 @@
+import json
+import threading
+import time
+from contextlib import ExitStack, contextmanager
+from contextvars import ContextVar
+from itertools import count
+from time import perf_counter
+
+from django.db import connections
+
+PHASES = ("sql", "build", "select_related", "prefetch")
+
+_exporters = ContextVar("seal_tracing_exporters", default=())
+_current_span = ContextVar("seal_tracing_span", default=None)
+_span_ids = count(1)
+
+
+class EvaluationSpan:
+    """
+    Timing of the evaluation of a sealed queryset broken down by phase.
+
+    The ``sql`` phase is the time spent executing the queries of the
+    evaluation and fetching their rows, ``build`` the time spent building and
+    sealing instances from rows, ``select_related`` the time spent walking
+    their select related objects and ``prefetch`` the time spent performing
+    prefetch lookups, including their queries. The evaluation of sealed
+    prefetch querysets is recorded as child spans.
+    """
+
+    __slots__ = (
+        "id",
+        "parent_id",
+        "model",
+        "db",
+        "start",
+        "duration",
+        "phases",
+        "rows",
+        "related_objects",
+        "_queryset",
+    )
+
+    def __init__(self, queryset, parent=None):
+        self.id = next(_span_ids)
+        self.parent_id = parent.id if parent is not None else None
+        self.model = queryset.model
+        self.db = queryset.db
+        self.start = time.time()
+        self.duration = None
+        self.phases = dict.fromkeys(PHASES, 0.0)
+        self.rows = 0
+        self.related_objects = 0
+        self._queryset = queryset
+
+    def __repr__(self):
+        return "<%s %s: %d rows, %.6fs>" % (
+            self.__class__.__name__,
+            self.model._meta.label,
+            self.rows,
+            self.duration or 0.0,
+        )
+
+    def as_dict(self):
+        return {
+            "id": self.id,
+            "parent_id": self.parent_id,
+            "model": self.model._meta.label,
+            "db": self.db,
+            "start": self.start,
+            "duration": self.duration,
+            "phases": dict(self.phases),
+            "rows": self.rows,
+            "related_objects": self.related_objects,
+        }
+
+    @contextmanager
+    def building(self):
+        """
+        Attribute the time spent in the block, minus the time spent executing
+        queries and walking select related objects, to the ``build`` phase.
+        """
+        phases = self.phases
+        sql, select_related = phases["sql"], phases["select_related"]
+        start = perf_counter()
+        try:
+            yield
+        finally:
+            phases["build"] += (
+                perf_counter()
+                - start
+                - (phases["sql"] - sql)
+                - (phases["select_related"] - select_related)
+            )
+
+    @contextmanager
+    def phase(self, name):
+        """Attribute the time spent in the block to the ``name`` phase."""
+        start = perf_counter()
+        try:
+            yield
+        finally:
+            self.phases[name] += perf_counter() - start
+
+
+class InMemoryExporter:
+    """Collect exported spans in the ``spans`` list."""
+
+    def __init__(self):
+        self.spans = []
+
+    def export(self, span):
+        self.spans.append(span)
+
+
+class JSONLinesExporter:
+    """
+    Write exported spans as JSON objects, one per line, to a file object or
+    append them to the file at path.
+    """
+
+    def __init__(self, file):
+        self._close = isinstance(file, str)
+        self.file = open(file, "a") if self._close else file
+        self._lock = threading.Lock()
+
+    def export(self, span):
+        line = json.dumps(span.as_dict())
+        with self._lock:
+            self.file.write(line + "\n")
+            self.file.flush()
+
+    def close(self):
+        if self._close:
+            self.file.close()
+
+
+def is_tracing():
+    """Return whether evaluations are traced in the current context."""
+    return bool(_exporters.get())
+
+
+def get_current_span(queryset):
+    """
+    Return the span of the current evaluation of queryset or None if it
+    isn't traced.
+    """
+    span = _current_span.get()
+    if span is not None and span._queryset is queryset:
+        return span
+    return None
+
+
+_FETCH_METHODS = ("fetchone", "fetchmany", "fetchall")
+
+
+def _timed_fetch(fetch):
+    def timed_fetch(*args):
+        span = _current_span.get()
+        if span is None:
+            return fetch(*args)
+        start = perf_counter()
+        try:
+            return fetch(*args)
+        finally:
+            span.phases["sql"] += perf_counter() - start
+
+    return timed_fetch
+
+
+def _time_query(execute, sql, params, many, context):
+    span = _current_span.get()
+    if span is None:
+        return execute(sql, params, many, context)
+    # Some backends, such as SQLite, only step through results as rows are
+    # fetched. Cursor wrappers delegate fetches to the underlying cursor
+    # which are shadowed by instance attributes.
+    cursor = context["cursor"]
+    for name in _FETCH_METHODS:
+        if name not in cursor.__dict__:
+            setattr(cursor, name, _timed_fetch(getattr(cursor, name)))
+    start = perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        span.phases["sql"] += perf_counter() - start
+
+
+@contextmanager
+def start_span(queryset):
+    """
+    Record the evaluation of queryset performed in the block into the yielded
+    EvaluationSpan and export it to the current exporters on exit.
+    """
+    parent = _current_span.get()
+    span = EvaluationSpan(queryset, parent)
+    start = perf_counter()
+    token = _current_span.set(span)
+    try:
+        with ExitStack() as stack:
+            # Queries can be executed on any alias, for example by prefetch
+            # querysets, and connections are per thread.
+            for alias in connections:
+                connection = connections[alias]
+                if _time_query not in connection.execute_wrappers:
+                    stack.enter_context(connection.execute_wrapper(_time_query))
+            yield span
+    finally:
+        _current_span.reset(token)
+        span.duration = perf_counter() - start
+        span._queryset = None
+        for exporter in _exporters.get():
+            exporter.export(span)
+
+
+def timed_walker(span, related_walker):
+    """
+    Wrap related_walker to attribute its time and the number of objects it
+    walks to span.
+    """
+
+    def walker(obj):
+        start = perf_counter()
+        related_objs = list(related_walker(obj))
+        span.phases["select_related"] += perf_counter() - start
+        span.related_objects += len(related_objs)
+        return related_objs
+
+    return walker
+
+
+@contextmanager
+def trace_evaluations(*exporters):
+    """
+    Export an EvaluationSpan for each evaluation of a sealed queryset
+    performed in the current context to exporters, objects with an
+    ``export(span)`` method.
+    """
+    token = _exporters.set(_exporters.get() + exporters)
+    try:
+        yield
+    finally:
+        _exporters.reset(token)
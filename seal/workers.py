@@ -0,0 +1,22 @@
+from functools import wraps
+
+from django.db import close_old_connections
+
+
+def worker_task(function):
+    """
+    Decorate a function run by a thread or process pool worker to dispose of
+    the database connections it used once it returns.
+    """
+
+    @wraps(function)
+    def task(*args, **kwargs):
+        try:
+            return function(*args, **kwargs)
+        finally:
+            # Workers use their own connections, make sure they are disposed
+            # of according to CONN_MAX_AGE as it's done at the end of
+            # requests.
+            close_old_connections()
+
+    return task
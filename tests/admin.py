@@ -0,0 +1,22 @@
+from django.contrib import admin
+
+from seal.admin import SealableModelAdmin
+
+from .models import SeaLion
+
+site = admin.AdminSite(name="seal")
+
+
+class SeaLionAdmin(SealableModelAdmin, admin.ModelAdmin):
+    list_display = ["height", "location_latitude", "previous_location_count"]
+
+    @admin.display
+    def location_latitude(self, obj):
+        return obj.location.latitude if obj.location else None
+
+    @admin.display
+    def previous_location_count(self, obj):
+        return len(obj.previous_locations.all())
+
+
+site.register(SeaLion, SeaLionAdmin)
@@ -6,6 +6,7 @@ from django.contrib.contenttypes.models import ContentType
 from django.db import models
 
 from seal.models import SealableModel
+from seal.profiles import FetchProfile
 
 
 class Nickname(SealableModel):
@@ -51,6 +52,18 @@ class SeaLion(SealableModel):
         Leak, models.CASCADE, null=True, related_name="sealion_soulmate"
     )
 
+    seal_profiles = {
+        "list": {
+            "only": ["height", "location__latitude"],
+            "select_related": ["location"],
+        },
+        "detail": FetchProfile(
+            select_related=["location"],
+            prefetch_related=["previous_locations"],
+            intern=True,
+        ),
+    }
+
     def __str__(self):
         return repr(self)
 
@@ -77,3 +90,9 @@ class SeaGull(SealableModel):
         SeaLion, models.CASCADE, null=True, related_name="gull"
     )
     nicknames = GenericRelation("Nickname")
+
+
+class Tide(SealableModel):
+    height = models.IntegerField()
+    updated_at = models.DateTimeField(auto_now=True)
+    created_at = models.DateTimeField(auto_now_add=True)
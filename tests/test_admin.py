@@ -0,0 +1,161 @@
+import warnings
+
+from django.contrib.auth.models import User
+from django.test import RequestFactory, TestCase, override_settings
+
+from seal.admin import ChangeListLookups, SealableChangeList
+from seal.exceptions import UnsealedAttributeAccess
+from seal.recording import record_unsealed_accesses
+
+from .admin import site
+from .models import Location, SeaLion
+
+
+class SealableModelAdminTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.superuser = User.objects.create_superuser("admin", "admin@example.com")
+        cls.location = Location.objects.create(latitude=51.585474, longitude=156.634331)
+        for height in range(3):
+            sealion = SeaLion.objects.create(
+                height=height, weight=100, location=cls.location
+            )
+            sealion.previous_locations.add(cls.location)
+
+    def setUp(self):
+        # Unsealed accesses are expected on the first changelist render.
+        warnings.simplefilter("ignore", category=UnsealedAttributeAccess)
+        self.addCleanup(warnings.resetwarnings)
+        self.client.force_login(self.superuser)
+        self.model_admin = site._registry[SeaLion]
+        self.addCleanup(self.model_admin._seal_changelist_lookups.clear)
+
+    def get_changelist(self):
+        response = self.client.get("/admin/tests/sealion/")
+        self.assertEqual(response.status_code, 200)
+        return response.context["cl"]
+
+    def test_changelist_class(self):
+        self.assertTrue(issubclass(self.get_changelist().__class__, SealableChangeList))
+
+    def test_lookups_inferred(self):
+        with record_unsealed_accesses() as accesses:
+            changelist = self.get_changelist()
+        self.assertEqual(
+            {access.name for access in accesses}, {"location", "previous_locations"}
+        )
+        for obj in changelist.result_list:
+            self.assertTrue(obj._state.sealed)
+        lookups = self.model_admin.get_seal_changelist_lookups(changelist.list_display)
+        self.assertEqual(lookups.select_related, {"location"})
+        self.assertEqual(lookups.prefetch_related, {"previous_locations"})
+        self.assertEqual(lookups.fields, set())
+        with record_unsealed_accesses() as accesses:
+            changelist = self.get_changelist()
+        self.assertEqual(accesses, [])
+        queryset = changelist.result_list
+        self.assertEqual(queryset.query.select_related, {"location": {}})
+        self.assertEqual(queryset._prefetch_related_lookups, ("previous_locations",))
+
+    def test_response_lazy(self):
+        request = RequestFactory().get("/admin/tests/sealion/")
+        request.user = self.superuser
+        response = self.model_admin.changelist_view(request)
+        self.assertIs(response.is_rendered, False)
+        list_display = response.context_data["cl"].list_display
+        self.assertFalse(self.model_admin.get_seal_changelist_lookups(list_display))
+        response.render()
+        self.assertIs(response.is_rendered, True)
+        lookups = self.model_admin.get_seal_changelist_lookups(list_display)
+        self.assertEqual(lookups.select_related, {"location"})
+        self.assertEqual(lookups.prefetch_related, {"previous_locations"})
+        self.assertNotIn("render", response.__dict__)
+
+    def test_fewer_queries(self):
+        self.get_changelist()
+        # Session, user, count, filtered count, results and prefetch.
+        with self.assertNumQueries(6):
+            with record_unsealed_accesses() as accesses:
+                self.get_changelist()
+        self.assertEqual(accesses, [])
+
+    def test_only(self):
+        self.model_admin.seal_changelist_only = True
+        self.addCleanup(setattr, self.model_admin, "seal_changelist_only", False)
+        with record_unsealed_accesses() as accesses:
+            changelist = self.get_changelist()
+        self.assertEqual(
+            changelist.result_list.query.deferred_loading,
+            (frozenset({"weight", "location_id", "leak_id", "leak_o2o_id"}), True),
+        )
+        # SeaLion.__str__ accesses the deferred weight field.
+        self.assertEqual(
+            {access.name for access in accesses},
+            {"weight", "location_id", "location", "previous_locations"},
+        )
+        with record_unsealed_accesses() as accesses:
+            changelist = self.get_changelist()
+        self.assertEqual(accesses, [])
+        self.assertEqual(
+            changelist.result_list.query.deferred_loading,
+            (frozenset({"leak_id", "leak_o2o_id"}), True),
+        )
+
+    def test_unrestricted_select_related(self):
+        self.model_admin.list_select_related = True
+        self.addCleanup(setattr, self.model_admin, "list_select_related", False)
+        self.get_changelist()
+        changelist = self.get_changelist()
+        self.assertIs(changelist.result_list.query.select_related, True)
+        self.assertEqual(
+            set(changelist.result_list._prefetch_related_lookups),
+            {"location", "previous_locations"},
+        )
+
+    @override_settings(DEBUG=True)
+    def test_report(self):
+        with self.assertLogs("seal.admin", "WARNING") as logs:
+            self.get_changelist()
+        (message,) = logs.output
+        self.assertIn(
+            "6 unsealed attribute accesses while rendering tests.SeaLion changelist",
+            message,
+        )
+
+    def test_report_disabled(self):
+        with self.assertNoLogs("seal.admin"):
+            self.get_changelist()
+
+
+class ChangeListLookupsTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.location = Location.objects.create(latitude=51.585474, longitude=156.634331)
+        cls.sealion = SeaLion.objects.create(
+            height=1, weight=100, location=cls.location
+        )
+        cls.sealion.previous_locations.add(cls.location)
+
+    def setUp(self):
+        warnings.simplefilter("ignore", category=UnsealedAttributeAccess)
+        self.addCleanup(warnings.resetwarnings)
+
+    def test_from_accesses(self):
+        sealions = list(SeaLion.objects.prefetch_related("previous_locations").seal())
+        (location,) = sealions[0].previous_locations.all()
+        other = Location.objects.seal().get()
+        with record_unsealed_accesses() as accesses:
+            list(location.previous_visitors.all())
+            # Instances not reachable from the results are ignored.
+            list(other.visitors.all())
+            sealions[0].location
+        lookups = ChangeListLookups.from_accesses(sealions, accesses)
+        self.assertEqual(lookups.select_related, {"location"})
+        self.assertEqual(
+            lookups.prefetch_related, {"previous_locations__previous_visitors"}
+        )
+        self.assertEqual(lookups.fields, set())
+
+    def test_empty(self):
+        self.assertFalse(ChangeListLookups())
+        self.assertTrue(ChangeListLookups(fields=["weight"]))
@@ -0,0 +1,137 @@
+import warnings
+
+from django.db import connection
+from django.db.models import Count
+from django.test import SimpleTestCase, TestCase
+from django.test.utils import CaptureQueriesContext
+
+from seal.compiled import (
+    CompiledQueryCache,
+    compiled_query_cache,
+    get_query_fingerprint,
+)
+from seal.exceptions import UnsealedAttributeAccess
+
+from .models import Location, SeaLion
+
+
+class CompiledQueryCacheTests(SimpleTestCase):
+    def test_lru(self):
+        cache = CompiledQueryCache(maxsize=2)
+        self.assertEqual(cache.hit_rate, 0)
+        cache.set("a", 1)
+        cache.set("b", 2)
+        self.assertEqual(cache.get("a"), 1)
+        cache.set("c", 3)
+        self.assertEqual(len(cache), 2)
+        self.assertIsNone(cache.get("b"))
+        self.assertEqual(cache.get("c"), 3)
+        self.assertEqual((cache.hits, cache.misses), (2, 1))
+        self.assertEqual(cache.hit_rate, 2 / 3)
+        cache.clear()
+        self.assertEqual((len(cache), cache.hits, cache.misses), (0, 0, 0))
+
+
+class CachedSQLTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.location = Location.objects.create(latitude=51.585474, longitude=156.634331)
+        cls.sealions = [
+            SeaLion.objects.create(height=height, weight=100, location=cls.location)
+            for height in range(3)
+        ]
+
+    def setUp(self):
+        warnings.filterwarnings("error", category=UnsealedAttributeAccess)
+        self.addCleanup(warnings.resetwarnings)
+        compiled_query_cache.clear()
+        self.addCleanup(compiled_query_cache.clear)
+
+    def test_reused(self):
+        queryset = SeaLion.objects.seal(cache_sql=True).order_by("pk")
+        self.assertEqual(list(queryset.filter(height=1)), self.sealions[1:2])
+        self.assertEqual((compiled_query_cache.hits, len(compiled_query_cache)), (0, 1))
+        with CaptureQueriesContext(connection) as ctx:
+            results = list(queryset.filter(height=2))
+        self.assertEqual(results, self.sealions[2:])
+        self.assertEqual(compiled_query_cache.hits, 1)
+        self.assertIn("2", ctx.captured_queries[0]["sql"])
+        self.assertTrue(results[0]._state.sealed)
+        self.assertEqual(results[0].get_deferred_fields(), set())
+        self.assertEqual(list(queryset.filter(height__in=[0, 1, 2])), self.sealions)
+        self.assertEqual(list(queryset.filter(height__in=[0, 2])), self.sealions[::2])
+        # Only the WHERE clause differs.
+        self.assertEqual(compiled_query_cache.hits, 3)
+        self.assertEqual(list(queryset.filter(height__in=[])), [])
+        self.assertEqual(list(queryset.filter(height=5)), [])
+
+    def test_query_unchanged(self):
+        queryset = SeaLion.objects.seal(cache_sql=True).filter(height=1)
+        fingerprint = get_query_fingerprint(queryset.query, "default")
+        list(queryset)
+        alias_refcount = dict(queryset.query.alias_refcount)
+        for _ in range(2):
+            queryset._result_cache = None
+            list(queryset)
+        self.assertEqual(queryset.query.alias_refcount, alias_refcount)
+        self.assertEqual(get_query_fingerprint(queryset.query, "default"), fingerprint)
+        self.assertEqual(compiled_query_cache.hits, 2)
+
+    def test_select_related_only(self):
+        queryset = (
+            SeaLion.objects.select_related("location")
+            .only("height", "location__latitude")
+            .seal(cache_sql=True)
+        )
+        for sealion in self.sealions:
+            with self.assertNumQueries(1):
+                instance = queryset.get(pk=sealion.pk)
+            self.assertEqual(instance.height, sealion.height)
+            self.assertEqual(instance.location.latitude, self.location.latitude)
+            self.assertTrue(instance.location._state.sealed)
+            message = (
+                'Attempt to fetch deferred field "weight" on sealed <SeaLion instance>'
+            )
+            with self.assertRaisesMessage(UnsealedAttributeAccess, message):
+                instance.weight
+        self.assertEqual(compiled_query_cache.hits, 2)
+
+    def test_distinct_shapes(self):
+        queryset = SeaLion.objects.seal(cache_sql=True).order_by("pk")
+        self.assertEqual(list(queryset.all()), self.sealions)
+        self.assertEqual(list(queryset[:1]), self.sealions[:1])
+        self.assertEqual(list(queryset[1:]), self.sealions[1:])
+        self.assertEqual(list(queryset.order_by("-pk")), self.sealions[::-1])
+        self.assertEqual(list(queryset.filter(location__latitude=0)), [])
+        self.assertEqual(compiled_query_cache.hits, 0)
+        self.assertEqual(len(compiled_query_cache), 5)
+
+    def test_uncacheable(self):
+        queryset = SeaLion.objects.annotate(Count("previous_locations")).seal(
+            cache_sql=True
+        )
+        self.assertEqual(len(queryset), 3)
+        self.assertEqual(len(compiled_query_cache), 0)
+
+    def test_known_related_objects(self):
+        location = Location.objects.seal().get()
+        queryset = location.visitors.all().seal(cache_sql=True)
+        for _ in range(2):
+            with self.assertNumQueries(1):
+                sealions = list(queryset.order_by("pk"))
+            self.assertEqual(sealions, self.sealions)
+            self.assertIs(sealions[0].location, location)
+        self.assertEqual(compiled_query_cache.hits, 1)
+
+    def test_iterator(self):
+        queryset = SeaLion.objects.seal(cache_sql=True).order_by("pk")
+        for _ in range(2):
+            self.assertEqual(list(queryset.iterator(chunk_size=1)), self.sealions)
+        self.assertEqual(compiled_query_cache.hits, 1)
+
+    def test_disabled(self):
+        self.assertEqual(len(SeaLion.objects.seal()), 3)
+        self.assertEqual(len(compiled_query_cache), 0)
+        queryset = SeaLion.objects.seal(cache_sql=True)
+        self.assertIs(queryset.filter(height=1)._seal_cache_sql, True)
+        self.assertIs(queryset.seal(cache_sql=False)._seal_cache_sql, False)
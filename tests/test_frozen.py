@@ -0,0 +1,174 @@
+import warnings
+from unittest import mock
+
+from django.db.models import Count, Prefetch, Sum
+from django.test import TestCase
+
+from seal.exceptions import FrozenInstanceError, UnsealedAttributeAccess
+from seal.frozen import freeze, invalidate
+
+from .models import Climate, Location, SeaLion
+
+
+class FrozenTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.location = Location.objects.create(latitude=51.585474, longitude=156.634331)
+        cls.climate = Climate.objects.create(temperature=100)
+        cls.location.climates.add(cls.climate)
+        cls.sealion = SeaLion.objects.create(
+            height=1, weight=100, location=cls.location
+        )
+
+    def setUp(self):
+        # Frozen instances raise regardless of warning filters.
+        warnings.simplefilter("ignore", category=UnsealedAttributeAccess)
+        self.addCleanup(warnings.resetwarnings)
+        self.addCleanup(invalidate)
+
+    def test_cached(self):
+        with self.assertNumQueries(1):
+            sealions = SeaLion.objects.frozen("sealions")
+        self.assertEqual(sealions, (self.sealion,))
+        with self.assertNumQueries(0):
+            self.assertIs(SeaLion.objects.frozen("sealions"), sealions)
+        self.assertTrue(sealions[0]._state.sealed)
+        self.assertTrue(sealions[0]._state.frozen)
+
+    def test_frozen_graph(self):
+        with self.assertNumQueries(2):
+            (sealion,) = (
+                SeaLion.objects.select_related("location")
+                .prefetch_related("location__climates")
+                .frozen("sealions")
+            )
+        with self.assertNumQueries(0):
+            self.assertEqual(sealion.location, self.location)
+            self.assertSequenceEqual(sealion.location.climates.all(), [self.climate])
+        climate = sealion.location.climates.all()[0]
+        self.assertTrue(sealion.location._state.frozen)
+        self.assertTrue(climate._state.frozen)
+        message = 'Attempt to fetch many-to-many field "locations" on sealed <Climate instance>'
+        with self.assertNumQueries(0), self.assertRaisesMessage(
+            UnsealedAttributeAccess, message
+        ):
+            climate.locations.all()
+
+    def test_frozen_to_attr(self):
+        (location,) = Location.objects.prefetch_related(
+            Prefetch("climates", to_attr="climate_list")
+        ).frozen("locations")
+        (climate,) = location.climate_list
+        self.assertTrue(climate._state.frozen)
+        Climate.objects.get().save()
+        self.assertIsNot(
+            Location.objects.prefetch_related(
+                Prefetch("climates", to_attr="climate_list")
+            ).frozen("locations")[0],
+            location,
+        )
+
+    def test_unsealed_access_raises(self):
+        (sealion,) = SeaLion.objects.only("height", "location").frozen("sealions")
+        message = (
+            'Attempt to fetch deferred field "weight" on sealed <SeaLion instance>'
+        )
+        with self.assertNumQueries(0), self.assertRaisesMessage(
+            UnsealedAttributeAccess, message
+        ):
+            sealion.weight
+        message = (
+            'Attempt to fetch related field "location" on sealed <SeaLion instance>'
+        )
+        with self.assertNumQueries(0), self.assertRaisesMessage(
+            UnsealedAttributeAccess, message
+        ):
+            sealion.location
+        message = 'Attempt to fetch many-to-many field "previous_locations" on sealed <SeaLion instance>'
+        with self.assertNumQueries(0), self.assertRaisesMessage(
+            UnsealedAttributeAccess, message
+        ):
+            sealion.previous_locations.all()
+
+    def test_writes_raise(self):
+        (sealion,) = SeaLion.objects.select_related("location").frozen("sealions")
+        message = "Cannot save or delete frozen SeaLion."
+        with self.assertRaisesMessage(FrozenInstanceError, message):
+            sealion.save()
+        with self.assertRaisesMessage(FrozenInstanceError, message):
+            sealion.delete()
+        message = "Cannot save or delete frozen Location."
+        with self.assertRaisesMessage(FrozenInstanceError, message):
+            sealion.location.save()
+
+    def test_invalidation(self):
+        sealions = SeaLion.objects.select_related("location").frozen("sealions")
+        Location.objects.get().save()
+        with self.assertNumQueries(1):
+            self.assertIsNot(SeaLion.objects.frozen("sealions"), sealions)
+        sealions = SeaLion.objects.frozen("sealions")
+        SeaLion.objects.create(height=2, weight=200)
+        self.assertEqual(len(SeaLion.objects.frozen("sealions")), 2)
+        SeaLion.objects.get(height=2).delete()
+        self.assertEqual(len(SeaLion.objects.frozen("sealions")), 1)
+
+    def test_write_during_evaluation(self):
+        def save_and_freeze(objs):
+            Location.objects.get().save()
+            return freeze(objs)
+
+        with mock.patch("seal.frozen.freeze", side_effect=save_and_freeze):
+            sealions = SeaLion.objects.select_related("location").frozen("sealions")
+        with self.assertNumQueries(1):
+            self.assertIsNot(
+                SeaLion.objects.select_related("location").frozen("sealions"),
+                sealions,
+            )
+
+    def test_m2m_invalidation(self):
+        (location,) = Location.objects.prefetch_related("climates").frozen("locations")
+        Location.objects.get().climates.clear()
+        (location,) = Location.objects.prefetch_related("climates").frozen("locations")
+        self.assertSequenceEqual(location.climates.all(), [])
+
+    def test_invalidate(self):
+        sealions = SeaLion.objects.frozen("sealions")
+        locations = Location.objects.frozen("locations")
+        invalidate("sealions")
+        self.assertIsNot(SeaLion.objects.frozen("sealions"), sealions)
+        self.assertIs(Location.objects.frozen("locations"), locations)
+        invalidate()
+        self.assertIsNot(Location.objects.frozen("locations"), locations)
+
+    def test_related_annotations(self):
+        (sealion,) = SeaLion.objects.annotate(
+            Count("previous_locations"), Sum("previous_locations__latitude")
+        ).frozen("sealions")
+        with self.assertNumQueries(0):
+            self.assertEqual(sealion.previous_locations.count(), 0)
+            self.assertIs(sealion.previous_locations.exists(), False)
+            self.assertEqual(
+                sealion.previous_locations.aggregate(Sum("latitude")),
+                {"latitude__sum": None},
+            )
+        message = (
+            'Attempt to fetch many-to-many field "previous_locations" on sealed '
+            "<SeaLion instance>."
+        )
+        with self.assertRaisesMessage(UnsealedAttributeAccess, message):
+            sealion.previous_locations.aggregate(Sum("longitude"))
+
+    def test_prefetched_not_mutated(self):
+        (location,) = Location.objects.prefetch_related("climates").frozen("locations")
+        queryset = location._prefetched_objects_cache["climates"]
+        queryset_class = queryset.__class__
+        queryset_dict = queryset.__dict__.copy()
+        with self.assertNumQueries(0):
+            self.assertEqual(list(location.climates.all()), [self.climate])
+            self.assertEqual(location.climates.get(pk=self.climate.pk), self.climate)
+            self.assertEqual(
+                list(location.climates.filter(temperature=100)), [self.climate]
+            )
+        self.assertIs(location._prefetched_objects_cache["climates"], queryset)
+        self.assertIs(queryset.__class__, queryset_class)
+        self.assertEqual(queryset.__dict__, queryset_dict)
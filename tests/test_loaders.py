@@ -0,0 +1,345 @@
+import asyncio
+import gc
+import warnings
+
+from asgiref.sync import async_to_sync
+from django.contrib.auth.models import Group, User
+from django.contrib.contenttypes.models import ContentType
+from django.db import transaction
+from django.test import TestCase, TransactionTestCase
+
+from seal import load
+from seal.exceptions import UnsealedAttributeAccess
+from seal.loaders import SealedRelationLoader, load_generic_foreign_key
+
+from .models import GreatSeaLion, Location, Nickname, SeaGull, SeaLion
+
+
+class SealedRelationLoaderTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.location = Location.objects.create(latitude=51.585474, longitude=156.634331)
+        cls.other_location = Location.objects.create(latitude=45.5, longitude=-73.5)
+        cls.sealion = SeaLion.objects.create(
+            height=1, weight=100, location=cls.location
+        )
+        cls.sealion.previous_locations.add(cls.location, cls.other_location)
+        cls.other_sealion = SeaLion.objects.create(
+            height=2, weight=200, location=cls.other_location
+        )
+        cls.gull = SeaGull.objects.create(sealion=cls.sealion)
+        cls.nickname = Nickname.objects.create(name="Jonathan", content_object=cls.gull)
+        cls.other_nickname = Nickname.objects.create(
+            name="Gary", content_object=cls.location
+        )
+        ContentType.objects.get_for_models(Location, SeaGull)
+
+    def setUp(self):
+        warnings.filterwarnings("error", category=UnsealedAttributeAccess)
+        self.addCleanup(warnings.resetwarnings)
+
+    def load(self, *requests):
+        """Perform (instances, name) load requests concurrently."""
+        loader = SealedRelationLoader()
+
+        async def gather():
+            return await asyncio.gather(
+                *(loader.load_many(instances, name) for instances, name in requests)
+            )
+
+        return async_to_sync(gather)()
+
+    def test_forward_many_to_one(self):
+        sealions = list(SeaLion.objects.order_by("pk").seal())
+        with self.assertNumQueries(1):
+            (locations,) = self.load((sealions, "location"))
+        self.assertEqual(locations, [self.location, self.other_location])
+        self.assertTrue(all(location._state.sealed for location in locations))
+        with self.assertNumQueries(0):
+            self.assertEqual(sealions[0].location, self.location)
+
+    def test_batches_per_relation(self):
+        sealions = list(SeaLion.objects.order_by("pk").seal())
+        locations = list(Location.objects.order_by("pk").seal())
+        with self.assertNumQueries(4):
+            results = self.load(
+                (sealions, "location"),
+                (sealions, "previous_locations"),
+                (sealions, "gull"),
+                (locations, "visitors"),
+            )
+        self.assertEqual(
+            results,
+            [
+                [self.location, self.other_location],
+                [[self.location, self.other_location], []],
+                [self.gull, None],
+                [[self.sealion], [self.other_sealion]],
+            ],
+        )
+        self.assertTrue(results[1][0][0]._state.sealed)
+        with self.assertNumQueries(0):
+            self.assertSequenceEqual(
+                sealions[0].previous_locations.all(),
+                [self.location, self.other_location],
+            )
+            self.assertSequenceEqual(locations[1].visitors.all(), [self.other_sealion])
+
+    def test_generic_foreign_key(self):
+        nicknames = list(Nickname.objects.order_by("pk").seal())
+        with self.assertNumQueries(2):
+            (content_objects,) = self.load((nicknames, "content_object"))
+        self.assertEqual(content_objects, [self.gull, self.location])
+        self.assertTrue(content_objects[0]._state.sealed)
+
+    def test_loaded(self):
+        sealions = list(
+            SeaLion.objects.select_related("location")
+            .prefetch_related("previous_locations")
+            .order_by("pk")
+            .seal()
+        )
+        with self.assertNumQueries(0):
+            results = self.load(
+                (sealions, "location"), (sealions, "previous_locations")
+            )
+        self.assertEqual(results[0], [self.location, self.other_location])
+
+    def test_loaded_reverse_many_to_many(self):
+        group = Group.objects.create(name="Sea lions")
+        user = User.objects.create(username="sealion")
+        group.user_set.add(user)
+        # Group.user_set is cached under the "user" query name.
+        group = Group.objects.prefetch_related("user_set").get()
+        with self.assertNumQueries(0):
+            (users,) = self.load(([group], "user_set"))
+        self.assertEqual(users, [[user]])
+
+    def test_duplicate_requests(self):
+        sealion = SeaLion.objects.seal().get(pk=self.sealion.pk)
+        with self.assertNumQueries(1):
+            (locations,) = self.load(([sealion, sealion], "location"))
+        self.assertEqual(locations, [self.location, self.location])
+
+    def test_tasks_referenced(self):
+        sealion = SeaLion.objects.seal().get(pk=self.sealion.pk)
+        loader = SealedRelationLoader()
+
+        async def load():
+            future = asyncio.ensure_future(loader.load(sealion, "location"))
+            # Let the request be queued and dispatched.
+            await asyncio.sleep(0)
+            await asyncio.sleep(0)
+            tasks = set(loader._tasks)
+            gc.collect()
+            return tasks, await future
+
+        tasks, location = async_to_sync(load)()
+        self.assertEqual(len(tasks), 1)
+        self.assertEqual(location, self.location)
+        self.assertEqual(loader._tasks, set())
+
+    def test_error(self):
+        sealions = list(SeaLion.objects.seal())
+        message = "type object 'SeaLion' has no attribute 'unknown'"
+        with self.assertRaisesMessage(AttributeError, message):
+            self.load((sealions, "unknown"))
+        message = "'height' does not resolve to an item that supports prefetching"
+        with self.assertRaisesMessage(ValueError, message):
+            self.load((sealions, "location"), (sealions, "height"))
+
+
+class LoadTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.location = Location.objects.create(latitude=51.585474, longitude=156.634331)
+        cls.other_location = Location.objects.create(latitude=45.5, longitude=-73.5)
+        cls.sealion = SeaLion.objects.create(
+            height=1, weight=100, location=cls.location
+        )
+        cls.sealion.previous_locations.add(cls.location, cls.other_location)
+        cls.other_sealion = SeaLion.objects.create(
+            height=2, weight=200, location=cls.other_location
+        )
+        cls.gull = SeaGull.objects.create(sealion=cls.sealion)
+
+    def setUp(self):
+        warnings.filterwarnings("error", category=UnsealedAttributeAccess)
+        self.addCleanup(warnings.resetwarnings)
+
+    def test_fields(self):
+        sealions = list(SeaLion.objects.only("height").order_by("pk").seal())
+        with self.assertNumQueries(1):
+            load(sealions, fields=["weight", "location"])
+        with self.assertNumQueries(0):
+            self.assertEqual([sealion.weight for sealion in sealions], [100, 200])
+            self.assertEqual(
+                [sealion.location_id for sealion in sealions],
+                [self.location.pk, self.other_location.pk],
+            )
+        self.assertEqual(sealions[0].get_deferred_fields(), {"leak_id", "leak_o2o_id"})
+        with self.assertNumQueries(0):
+            load(sealions, fields=["weight"])
+
+    def test_fields_same_pk(self):
+        sealion = SeaLion.objects.only("height").seal().get(pk=self.sealion.pk)
+        other = SeaLion.objects.only("height").seal().get(pk=self.sealion.pk)
+        with self.assertNumQueries(1):
+            load([sealion, other], fields=["weight"])
+        with self.assertNumQueries(0):
+            self.assertEqual(sealion.weight, 100)
+            self.assertEqual(other.weight, 100)
+
+    def test_fields_track_changes(self):
+        sealions = list(SeaLion.objects.only("height").seal(track_changes=True))
+        load(sealions, fields=["weight"])
+        self.assertEqual(sealions[0].get_dirty_fields(), [])
+
+    def test_select(self):
+        sealions = list(SeaLion.objects.only("height").order_by("pk").seal())
+        with self.assertNumQueries(1):
+            load(sealions, select=["location", "gull"])
+        with self.assertNumQueries(0):
+            self.assertEqual(
+                [sealion.location for sealion in sealions],
+                [self.location, self.other_location],
+            )
+            self.assertEqual(sealions[0].gull, self.gull)
+            self.assertIs(sealions[0].gull.sealion, sealions[0])
+            with self.assertRaises(SeaGull.DoesNotExist):
+                sealions[1].gull
+        self.assertTrue(sealions[0].location._state.sealed)
+        with self.assertRaises(UnsealedAttributeAccess):
+            sealions[0].weight
+
+    def test_prefetch(self):
+        sealions = list(SeaLion.objects.order_by("pk").seal())
+        with self.assertNumQueries(3):
+            load(sealions, prefetch=["previous_locations", "location__climates"])
+        with self.assertNumQueries(0):
+            self.assertEqual(
+                list(sealions[0].previous_locations.all()),
+                [self.location, self.other_location],
+            )
+            self.assertEqual(list(sealions[1].location.climates.all()), [])
+        self.assertTrue(sealions[0].location._state.sealed)
+        with self.assertRaises(UnsealedAttributeAccess):
+            list(sealions[0].location.visitors.all())
+
+    def test_mixed_models(self):
+        great_sealion = GreatSeaLion.objects.create(height=3, weight=300)
+        sealions = [
+            SeaLion.objects.only("height").seal().get(pk=self.sealion.pk),
+            GreatSeaLion.objects.only("height").seal().get(),
+        ]
+        with self.assertNumQueries(2):
+            load(sealions, fields=["weight"])
+        with self.assertNumQueries(0):
+            self.assertEqual(sealions[0].weight, 100)
+            self.assertEqual(sealions[1].weight, great_sealion.weight)
+
+    def test_batch_size(self):
+        sealions = list(SeaLion.objects.only("height").seal())
+        with self.assertNumQueries(4):
+            load(
+                sealions,
+                fields=["weight"],
+                prefetch=["previous_locations"],
+                batch_size=1,
+            )
+        with self.assertNumQueries(0):
+            self.assertEqual(
+                {sealion.weight for sealion in sealions},
+                {100, 200},
+            )
+
+
+class LoadGenericForeignKeyTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.location = Location.objects.create(latitude=51.585474, longitude=156.634331)
+        cls.sealion = SeaLion.objects.create(height=1, weight=100)
+        cls.gull = SeaGull.objects.create(sealion=cls.sealion)
+        cls.other_gull = SeaGull.objects.create()
+        cls.nicknames = [
+            Nickname.objects.create(name="Jonathan", content_object=cls.gull),
+            Nickname.objects.create(name="Gary", content_object=cls.location),
+            Nickname.objects.create(name="Sammy", content_object=cls.other_gull),
+            Nickname.objects.create(name="Stan", content_object=cls.sealion),
+        ]
+
+    def setUp(self):
+        warnings.filterwarnings("error", category=UnsealedAttributeAccess)
+        self.addCleanup(warnings.resetwarnings)
+        ContentType.objects.clear_cache()
+        self.addCleanup(ContentType.objects.clear_cache)
+
+    def test_load(self):
+        nicknames = list(Nickname.objects.order_by("pk").seal())
+        # One query for the content types and one per content type.
+        with self.assertNumQueries(4):
+            load_generic_foreign_key(nicknames, "content_object")
+        with self.assertNumQueries(0):
+            self.assertEqual(
+                [nickname.content_object for nickname in nicknames],
+                [self.gull, self.location, self.other_gull, self.sealion],
+            )
+        self.assertTrue(nicknames[0].content_object._state.sealed)
+        with self.assertRaises(UnsealedAttributeAccess):
+            nicknames[0].content_object.sealion
+        with self.assertNumQueries(0):
+            load_generic_foreign_key(nicknames, "content_object")
+
+    def test_load_missing(self):
+        Location.objects.filter(pk=self.location.pk).delete()
+        nicknames = list(Nickname.objects.order_by("pk").seal())
+        load_generic_foreign_key(nicknames, "content_object")
+        with self.assertNumQueries(0):
+            self.assertIsNone(nicknames[1].content_object)
+
+    def test_load_unsealed(self):
+        nicknames = list(Nickname.objects.order_by("pk"))
+        load_generic_foreign_key(nicknames, "content_object")
+        self.assertFalse(getattr(nicknames[0].content_object._state, "sealed", False))
+
+    def test_prefetch(self):
+        # One query for the content types and one per content type.
+        with self.assertNumQueries(5):
+            nicknames = list(
+                Nickname.objects.order_by("pk")
+                .prefetch_related("content_object")
+                .seal()
+            )
+        with self.assertNumQueries(0):
+            self.assertEqual(nicknames[2].content_object, self.other_gull)
+        self.assertTrue(nicknames[2].content_object._state.sealed)
+
+
+class LoadGenericForeignKeyConcurrentTests(TransactionTestCase):
+    available_apps = ["django.contrib.contenttypes", "seal", "tests"]
+
+    def setUp(self):
+        warnings.filterwarnings("error", category=UnsealedAttributeAccess)
+        self.addCleanup(warnings.resetwarnings)
+        self.location = Location.objects.create(
+            latitude=51.585474, longitude=156.634331
+        )
+        self.gull = SeaGull.objects.create()
+        Nickname.objects.create(name="Jonathan", content_object=self.gull)
+        Nickname.objects.create(name="Gary", content_object=self.location)
+        ContentType.objects.get_for_models(Location, SeaGull)
+
+    def test_load_concurrent(self):
+        nicknames = list(Nickname.objects.order_by("pk").seal())
+        # Queries are performed on distinct connections.
+        with self.assertNumQueries(0):
+            load_generic_foreign_key(nicknames, "content_object", concurrent=True)
+        with self.assertNumQueries(0):
+            self.assertEqual(nicknames[0].content_object, self.gull)
+            self.assertEqual(nicknames[1].content_object, self.location)
+        self.assertTrue(nicknames[0].content_object._state.sealed)
+
+    def test_load_concurrent_atomic(self):
+        nicknames = list(Nickname.objects.order_by("pk").seal())
+        with transaction.atomic(), self.assertNumQueries(2):
+            load_generic_foreign_key(nicknames, "content_object", concurrent=True)
@@ -1,12 +1,19 @@
+import pickle
 import warnings
+from datetime import datetime
 
 from django.apps import apps
+from django.contrib.auth.models import Group, Permission, User, UserManager
 from django.contrib.contenttypes.models import ContentType
 from django.core import checks
-from django.db import models
+from django.db import connection, models
+from django.db.models import Count, Prefetch
+from django.db.models.fields import DeferredAttribute
+from django.db.models.signals import post_save, pre_save
 from django.test import SimpleTestCase, TestCase
-from django.test.utils import isolate_apps
+from django.test.utils import CaptureQueriesContext, isolate_apps
 
+from seal.apps import check_seal_models
 from seal.descriptors import (
     SealableDeferredAttribute,
     SealableForwardManyToOneDescriptor,
@@ -17,9 +24,10 @@ from seal.descriptors import (
 )
 from seal.exceptions import UnsealedAttributeAccess
 from seal.models import SealableManager, SealableModel, make_model_sealable
+from seal.profiles import FetchProfile, check_fetch_profiles
 from seal.query import SealableQuerySet
 
-from .models import GreatSeaLion, Location, Nickname, SeaGull, SeaLion
+from .models import GreatSeaLion, Location, Nickname, SeaGull, SeaLion, Tide
 
 
 class SealableModelTests(SimpleTestCase):
@@ -154,6 +162,71 @@ class SealableModelTests(SimpleTestCase):
             list(previous_visitors)
 
 
+class SealableModelFromDbTests(SimpleTestCase):
+    field_names = ["id", "height", "weight", "location_id"]
+    values = (1, 2, 3, 4)
+
+    def assertFromDbEqual(self, instance, model=SeaLion):
+        expected = models.Model.from_db.__func__(
+            model, "default", self.field_names, self.values
+        )
+        self.assertIs(instance.__class__, model)
+        self.assertEqual(instance.__dict__.keys(), expected.__dict__.keys())
+        for attname in self.field_names:
+            self.assertEqual(getattr(instance, attname), getattr(expected, attname))
+        self.assertIs(instance._state.adding, False)
+        self.assertEqual(instance._state.db, "default")
+        self.assertEqual(instance.get_deferred_fields(), {"leak_id", "leak_o2o_id"})
+
+    def test_from_db(self):
+        instance = SeaLion.from_db("default", self.field_names, self.values)
+        self.assertFromDbEqual(instance)
+
+    def test_from_db_init_signals(self):
+        for signal in (models.signals.pre_init, models.signals.post_init):
+            with self.subTest(signal=signal):
+                senders = []
+
+                def receiver(sender, senders=senders, **kwargs):
+                    senders.append(sender)
+
+                signal.connect(receiver, sender=SeaLion)
+                try:
+                    instance = SeaLion.from_db("default", self.field_names, self.values)
+                finally:
+                    signal.disconnect(receiver, sender=SeaLion)
+                self.assertEqual(senders, [SeaLion])
+                self.assertFromDbEqual(instance)
+
+    @isolate_apps("tests")
+    def test_from_db_init_override(self):
+        class InitSeaLion(SealableModel):
+            height = models.PositiveIntegerField()
+
+            def __init__(self, *args, **kwargs):
+                super().__init__(*args, **kwargs)
+                self.initialized = True
+
+        instance = InitSeaLion.from_db("default", ["id", "height"], [1, 2])
+        self.assertIs(instance.initialized, True)
+        self.assertEqual(instance.height, 2)
+
+    @isolate_apps("tests")
+    def test_from_db_descriptor_setter(self):
+        class UpperDescriptor(DeferredAttribute):
+            def __set__(self, instance, value):
+                instance.__dict__[self.field.attname] = value.upper()
+
+        class UpperField(models.CharField):
+            descriptor_class = UpperDescriptor
+
+        class Upper(SealableModel):
+            name = UpperField(max_length=10)
+
+        instance = Upper.from_db("default", ["id", "name"], [1, "seal"])
+        self.assertEqual(instance.name, "SEAL")
+
+
 class ContentTypesSealableModelTests(TestCase):
     @classmethod
     def setUpTestData(cls):
@@ -186,6 +259,124 @@ class ContentTypesSealableModelTests(TestCase):
             list(nicknames)
 
 
+class SealableModelDirtyTrackingTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.location = Location.objects.create(latitude=51.585474, longitude=156.634331)
+        cls.sealion = SeaLion.objects.create(
+            height=1, weight=100, location=cls.location
+        )
+
+    def setUp(self):
+        warnings.filterwarnings("error", category=UnsealedAttributeAccess)
+        self.addCleanup(warnings.resetwarnings)
+
+    def get_sealion(self, queryset=SeaLion.objects):
+        return queryset.seal(track_changes=True).get()
+
+    def test_untracked(self):
+        sealion = SeaLion.objects.seal().get()
+        self.assertIsNone(sealion.get_dirty_fields())
+        with CaptureQueriesContext(connection) as ctx:
+            sealion.save()
+        self.assertIn('"weight"', ctx.captured_queries[0]["sql"])
+
+    def test_get_dirty_fields(self):
+        sealion = self.get_sealion()
+        self.assertEqual(sealion.get_dirty_fields(), [])
+        sealion.weight = 100
+        self.assertEqual(sealion.get_dirty_fields(), [])
+        sealion.weight = 101
+        sealion.location_id = None
+        self.assertEqual(sealion.get_dirty_fields(), ["weight", "location"])
+
+    def test_snapshot(self):
+        sealion = self.get_sealion(
+            SeaLion.objects.only("height").annotate(Count("previous_locations"))
+        )
+        self.assertEqual(sealion._state.snapshot, {"id": self.sealion.pk, "height": 1})
+
+    def test_get_dirty_fields_deferred(self):
+        sealion = self.get_sealion(SeaLion.objects.only("height"))
+        self.assertEqual(sealion.get_dirty_fields(), [])
+        sealion.weight = 101
+        self.assertEqual(sealion.get_dirty_fields(), ["weight"])
+
+    def test_save_changed_fields(self):
+        sealion = self.get_sealion()
+        sealion.weight = 101
+        with CaptureQueriesContext(connection) as ctx:
+            sealion.save()
+        (query,) = ctx.captured_queries
+        self.assertIn('SET "weight" = 101 WHERE', query["sql"])
+        self.assertEqual(sealion.get_dirty_fields(), [])
+        self.assertEqual(SeaLion.objects.get().weight, 101)
+
+    def test_save_unchanged(self):
+        sealion = self.get_sealion()
+        with self.assertNumQueries(0):
+            sealion.save()
+
+    def test_save_unchanged_signals(self):
+        sealion = self.get_sealion()
+        senders = []
+
+        def receiver(sender, instance, **kwargs):
+            senders.append((sender, instance))
+
+        pre_save.connect(receiver, sender=SeaLion)
+        self.addCleanup(pre_save.disconnect, receiver, sender=SeaLion)
+        post_save.connect(receiver, sender=SeaLion)
+        self.addCleanup(post_save.disconnect, receiver, sender=SeaLion)
+        with self.assertNumQueries(0):
+            sealion.save()
+        self.assertEqual(senders, [(SeaLion, sealion), (SeaLion, sealion)])
+
+    def test_save_auto_now(self):
+        tide = Tide.objects.create(height=1)
+        Tide.objects.update(updated_at=datetime(2000, 1, 1))
+        tide = Tide.objects.seal(track_changes=True).get()
+        tide.height = 2
+        with CaptureQueriesContext(connection) as ctx:
+            tide.save()
+        (query,) = ctx.captured_queries
+        self.assertIn('"height" = 2', query["sql"])
+        self.assertNotIn('"created_at"', query["sql"])
+        self.assertEqual(tide.get_dirty_fields(), [])
+        self.assertEqual(Tide.objects.get().updated_at, tide.updated_at)
+        self.assertGreater(tide.updated_at, datetime(2000, 1, 1))
+        # auto_now fields are saved even when no other field changed.
+        Tide.objects.update(updated_at=datetime(2000, 1, 1))
+        tide = Tide.objects.seal(track_changes=True).get()
+        with self.assertNumQueries(1):
+            tide.save()
+        self.assertGreater(Tide.objects.get().updated_at, datetime(2000, 1, 1))
+
+    def test_save_update_fields(self):
+        sealion = self.get_sealion()
+        sealion.height = 2
+        sealion.weight = 101
+        sealion.save(update_fields=["height"])
+        self.assertEqual(sealion.get_dirty_fields(), ["weight"])
+        sealion.save()
+        self.assertEqual(
+            SeaLion.objects.values_list("height", "weight").get(), (2, 101)
+        )
+
+    def test_save_changed_pk(self):
+        sealion = self.get_sealion()
+        sealion.pk = None
+        sealion.save()
+        self.assertEqual(SeaLion.objects.count(), 2)
+
+    def test_save_using(self):
+        sealion = self.get_sealion()
+        sealion.weight = 101
+        with CaptureQueriesContext(connection) as ctx:
+            sealion.save(using="default")
+        self.assertIn('SET "weight" = 101 WHERE', ctx.captured_queries[0]["sql"])
+
+
 class SealableManagerTests(SimpleTestCase):
     def test_isinstance_manager(self):
         """Manager classes are subclasses of Manager as many third-party apps expect."""
@@ -262,6 +453,183 @@ class SealableManagerTests(SimpleTestCase):
         )
 
 
+class FetchProfileChecksTests(SimpleTestCase):
+    def test_valid(self):
+        self.assertEqual(check_fetch_profiles(SeaLion), [])
+
+    @isolate_apps("tests")
+    def test_not_a_dict(self):
+        class Foo(SealableModel):
+            seal_profiles = [("list", {})]
+
+        self.assertEqual(
+            Foo.check(),
+            [
+                checks.Error(
+                    "'seal_profiles' must be a dictionary.",
+                    id="seal.E003",
+                    obj=Foo,
+                )
+            ],
+        )
+
+    @isolate_apps("tests")
+    def test_invalid_arguments(self):
+        class Foo(SealableModel):
+            seal_profiles = {
+                "list": {"selected_related": ["bar"]},
+                "detail": FetchProfile(lazzy=True),
+            }
+
+        self.assertEqual(
+            Foo.check(),
+            [
+                checks.Error(
+                    "Fetch profile 'list' is invalid: got an unexpected keyword "
+                    "argument 'selected_related'.",
+                    hint="Fetch profiles must be FetchProfile instances or "
+                    "dictionaries of FetchProfile arguments.",
+                    id="seal.E003",
+                    obj=Foo,
+                ),
+                checks.Error(
+                    "Fetch profile 'detail' is invalid: got an unexpected keyword "
+                    "argument 'lazzy'.",
+                    hint="Fetch profiles must be FetchProfile instances or "
+                    "dictionaries of FetchProfile arguments.",
+                    id="seal.E003",
+                    obj=Foo,
+                ),
+            ],
+        )
+
+    @isolate_apps("tests")
+    def test_invalid_lookups(self):
+        class Bar(SealableModel):
+            name = models.CharField(max_length=10)
+
+            @property
+            def computed(self):
+                return self
+
+        class Foo(SealableModel):
+            bar = models.ForeignKey(Bar, models.CASCADE)
+            bars = models.ManyToManyField(Bar, related_name="foos")
+            seal_profiles = {
+                "valid": {
+                    "only": ["bar__name"],
+                    "select_related": ["bar"],
+                    "prefetch_related": [
+                        "bars__foos",
+                        Prefetch("bar__computed"),
+                        "bar__computed__other",
+                    ],
+                },
+                "invalid": {
+                    "only": ["bar__nam"],
+                    "defer": ["baz"],
+                    "select_related": ["bars", "bar__name"],
+                    "prefetch_related": [Prefetch("bars__unknown")],
+                },
+            }
+
+        self.assertEqual(
+            Foo.check(),
+            [
+                checks.Error(
+                    "Fetch profile 'invalid' %s lookup '%s' refers to '%s' which is "
+                    "not a valid field." % error,
+                    id="seal.E004",
+                    obj=Foo,
+                )
+                for error in [
+                    ("only", "bar__nam", "nam"),
+                    ("defer", "baz", "baz"),
+                    ("select_related", "bars", "bars"),
+                    ("select_related", "bar__name", "name"),
+                    ("prefetch_related", "bars__unknown", "unknown"),
+                ]
+            ],
+        )
+
+
+class SealModelsSettingTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user("sealion")
+        cls.group = Group.objects.create(name="Pinnipeds")
+        cls.user.groups.add(cls.group)
+
+    def setUp(self):
+        warnings.filterwarnings("error", category=UnsealedAttributeAccess)
+        self.addCleanup(warnings.resetwarnings)
+
+    def test_descriptors(self):
+        self.assertIsInstance(User.groups, SealableManyToManyDescriptor)
+        self.assertIsInstance(User.username, SealableDeferredAttribute)
+        self.assertIsInstance(Group.user_set, SealableManyToManyDescriptor)
+        # Reverse descriptors are only made sealable on sealable models.
+        self.assertNotIsInstance(Permission.group_set, SealableManyToManyDescriptor)
+        self.assertNotIsInstance(Permission.name, SealableDeferredAttribute)
+
+    def test_managers(self):
+        self.assertIsInstance(User.objects.all(), SealableQuerySet)
+        self.assertIsInstance(Group.objects.all(), SealableQuerySet)
+        self.assertNotIsInstance(Permission.objects.all(), SealableQuerySet)
+        self.assertEqual(User.objects.__class__.__name__, "SealableUserManager")
+        self.assertIsInstance(User.objects, UserManager)
+        self.assertEqual(
+            User.objects.deconstruct(),
+            (False, "django.contrib.auth.models.UserManager", None, (), {}),
+        )
+
+    def test_sealed(self):
+        user = User.objects.seal().get()
+        message = (
+            'Attempt to fetch many-to-many field "groups" on sealed <User instance>'
+        )
+        with self.assertRaisesMessage(UnsealedAttributeAccess, message):
+            list(user.groups.all())
+        user = User.objects.only("pk").seal().get()
+        message = 'Attempt to fetch deferred field "username" on sealed <User instance>'
+        with self.assertRaisesMessage(UnsealedAttributeAccess, message):
+            user.username
+
+    def test_sealed_prefetch(self):
+        with self.assertNumQueries(2):
+            user = User.objects.prefetch_related("groups").seal().get()
+        with self.assertNumQueries(0):
+            (group,) = user.groups.all()
+        self.assertEqual(group, self.group)
+        self.assertTrue(group._state.sealed)
+        message = (
+            'Attempt to fetch many-to-many field "user" on sealed <Group instance>'
+        )
+        with self.assertRaisesMessage(UnsealedAttributeAccess, message):
+            list(group.user_set.all())
+
+    def test_pickle(self):
+        queryset = pickle.loads(pickle.dumps(User.objects.seal()))
+        self.assertIs(queryset.__class__, User.objects.all().__class__)
+        self.assertEqual(list(queryset), [self.user])
+        user = User.objects.prefetch_related("groups").seal().get()
+        groups = pickle.loads(pickle.dumps(user.groups.all()))
+        self.assertEqual(list(groups.all()), [self.group])
+
+    def test_check_unmatched_pattern(self):
+        with self.settings(SEAL_MODELS=["auth.*", "unknown.Model"]):
+            self.assertEqual(
+                check_seal_models(),
+                [
+                    checks.Warning(
+                        "SEAL_MODELS entry 'unknown.model' doesn't match any "
+                        "installed model.",
+                        id="seal.W001",
+                    )
+                ],
+            )
+
+
 class MakeModelSealableTests(SimpleTestCase):
     @isolate_apps("tests")
     def test_make_non_sealable_model_subclass(self):
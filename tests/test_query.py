@@ -1,18 +1,50 @@
+import multiprocessing
 import pickle
 import warnings
+from concurrent.futures import ThreadPoolExecutor
+from types import SimpleNamespace
+from unittest import mock
 
 from django.apps import apps
 from django.contrib.contenttypes.models import ContentType
-from django.db import models
-from django.db.models import Prefetch
-from django.db.models.query import ModelIterable
-from django.test import SimpleTestCase, TestCase
+from django.db import connection, models, transaction
+from django.db.models import (
+    Avg,
+    Count,
+    Exists,
+    F,
+    Max,
+    Min,
+    OuterRef,
+    Prefetch,
+    Q,
+    Sum,
+)
+from django.db.models.query import ModelIterable, RawModelIterable
+from django.test import SimpleTestCase, TestCase, TransactionTestCase
 from django.test.utils import isolate_apps
 
 from seal.descriptors import _SealedRelatedQuerySet
 from seal.exceptions import UnsealedAttributeAccess
 from seal.models import make_model_sealable
-from seal.query import SealableQuerySet, SealedModelIterable
+from seal.partitions import (
+    _evaluate_partition_task,
+    _get_queryset_state,
+    get_pk_ranges,
+)
+from seal.profiles import get_fields_fetch_profile, get_serializer_declaration
+from seal.query import (
+    LazySealedResults,
+    SealableQuerySet,
+    SealableRawQuerySet,
+    SealedModelIterable,
+    SealedRawModelIterable,
+    SealedRowBuilder,
+    _prefetch_related_objects_task,
+    get_known_related_objects,
+    group_prefetch_lookups,
+    prefetch_related_objects_concurrently,
+)
 
 from .models import (
     Climate,
@@ -539,6 +571,397 @@ class SealableQuerySetTests(TestCase):
             self.assertEqual(list(results[0].nicknames.all()), [self.nickname])
             self.assertEqual(list(results[1].nicknames.all()), [other_nickname])
 
+    def test_sealed_intern_select_related(self):
+        other_sealion = SeaLion.objects.create(
+            height=2, weight=200, location=self.location
+        )
+        queryset = SeaLion.objects.select_related("location").order_by("pk")
+        results = list(queryset.seal())
+        self.assertIsNot(results[0].location, results[1].location)
+        with self.assertNumQueries(1):
+            results = list(queryset.seal(intern=True))
+        self.assertEqual(results, [self.sealion, other_sealion])
+        self.assertIs(results[0].location, results[1].location)
+        self.assertTrue(results[0].location._state.sealed)
+        # Interning is preserved through chaining and resealing.
+        results = list(queryset.seal(intern=True).filter(height__gt=0).seal())
+        self.assertIs(results[0].location, results[1].location)
+        results = list(queryset.seal(intern=True).seal(intern=False))
+        self.assertIsNot(results[0].location, results[1].location)
+
+    def test_sealed_intern_nested_select_related(self):
+        other_sealion = SeaLion.objects.create(
+            height=2, weight=200, location=self.location
+        )
+        other_gull = SeaGull.objects.create(sealion=other_sealion)
+        results = list(
+            SeaGull.objects.select_related("sealion__location")
+            .order_by("pk")
+            .seal(intern=True)
+        )
+        self.assertEqual(results, [self.gull, other_gull])
+        # One-to-one relationships are never interned.
+        self.assertIsNot(results[0].sealion, results[1].sealion)
+        self.assertIs(results[0].sealion.location, results[1].sealion.location)
+        message = (
+            'Attempt to fetch deferred field "longitude" on sealed <Location instance>'
+        )
+        results = list(
+            SeaGull.objects.select_related("sealion__location")
+            .only("sealion__location__latitude")
+            .order_by("pk")
+            .seal(intern=True)
+        )
+        with self.assertWarnsMessage(UnsealedAttributeAccess, message):
+            results[1].sealion.location.longitude
+
+    def test_sealed_raw(self):
+        queryset = SeaLion.objects.raw(
+            "SELECT id, height, location_id FROM tests_sealion"
+        )
+        self.assertIsInstance(queryset, SealableRawQuerySet)
+        instance = queryset[0]
+        self.assertFalse(getattr(instance._state, "sealed", False))
+        with self.assertNumQueries(1):
+            instance = queryset.seal()[0]
+        self.assertTrue(instance._state.sealed)
+        message = (
+            'Attempt to fetch deferred field "weight" on sealed <SeaLion instance>'
+        )
+        with self.assertWarnsMessage(UnsealedAttributeAccess, message) as ctx:
+            instance.weight
+        self.assertEqual(ctx.filename, __file__)
+        message = (
+            'Attempt to fetch related field "location" on sealed <SeaLion instance>'
+        )
+        with self.assertWarnsMessage(UnsealedAttributeAccess, message) as ctx:
+            instance.location
+        self.assertEqual(ctx.filename, __file__)
+        instance = queryset.seal().using("default")[0]
+        self.assertTrue(instance._state.sealed)
+
+    def test_sealed_raw_prefetch_related(self):
+        queryset = (
+            SeaLion.objects.prefetch_related("previous_locations")
+            .seal()
+            .raw("SELECT id FROM tests_sealion")
+        )
+        with self.assertNumQueries(2):
+            (instance,) = queryset
+        self.assertTrue(instance._state.sealed)
+        with self.assertNumQueries(0):
+            self.assertSequenceEqual(instance.previous_locations.all(), [self.location])
+        self.assertTrue(instance.previous_locations.all()[0]._state.sealed)
+
+    def test_columnar(self):
+        other_sealion = SeaLion.objects.create(height=2, weight=200)
+        with self.assertNumQueries(1):
+            columns = (
+                SeaLion.objects.select_related("location")
+                .only("height", "location__latitude")
+                .annotate(double_height=F("height") * 2)
+                .order_by("pk")
+                .columnar()
+            )
+        self.assertEqual(len(columns), 2)
+        self.assertEqual(
+            columns.names,
+            (
+                "id",
+                "height",
+                "location_id",
+                "location__id",
+                "location__latitude",
+                "double_height",
+            ),
+        )
+        self.assertEqual(columns["id"], (self.sealion.pk, other_sealion.pk))
+        self.assertEqual(columns["height"], (1, 2))
+        self.assertEqual(columns["location__latitude"], (self.location.latitude, None))
+        self.assertEqual(columns["double_height"], (2, 4))
+        self.assertIn("height", columns)
+        self.assertNotIn("weight", columns)
+        for name in ("weight", "location__longitude", "leak__description"):
+            message = (
+                'Attempt to fetch undeclared column "%s" on sealed <SeaLion columns>.'
+                % name
+            )
+            with self.subTest(name=name), self.assertRaisesMessage(
+                UnsealedAttributeAccess, message
+            ):
+                columns[name]
+
+    def test_columnar_rows(self):
+        columns = (
+            SeaLion.objects.select_related("location", "gull")
+            .defer("weight")
+            .filter(pk=self.sealion.pk)
+            .columnar()
+        )
+        self.assertEqual(columns["gull__sealion_id"], (self.sealion.pk,))
+        with self.assertNumQueries(0):
+            (instance,) = columns.rows()
+            self.assertEqual(instance, self.sealion)
+            self.assertEqual(instance.location, self.location)
+            self.assertEqual(instance.gull, self.gull)
+            self.assertIs(instance.gull.sealion, instance)
+        self.assertTrue(instance._state.sealed)
+        self.assertTrue(instance.location._state.sealed)
+        message = (
+            'Attempt to fetch deferred field "weight" on sealed <SeaLion instance>'
+        )
+        with self.assertWarnsMessage(UnsealedAttributeAccess, message):
+            instance.weight
+
+    def test_columnar_empty(self):
+        columns = SeaLion.objects.only("height").filter(height=-1).columnar()
+        self.assertEqual(len(columns), 0)
+        self.assertEqual(columns["height"], ())
+        self.assertEqual(list(columns.rows()), [])
+        with self.assertNumQueries(0):
+            columns = SeaLion.objects.none().columnar()
+        self.assertEqual(len(columns), 0)
+
+    def test_sealed_lazy(self):
+        other_sealion = SeaLion.objects.create(
+            height=2, weight=200, location=self.location
+        )
+        queryset = (
+            SeaLion.objects.select_related("location")
+            .defer("weight")
+            .order_by("pk")
+            .seal(lazy=True)
+        )
+        with self.assertNumQueries(1):
+            self.assertEqual(len(queryset), 2)
+        self.assertIsInstance(queryset._result_cache, LazySealedResults)
+        self.assertEqual(queryset._result_cache._objs, [None, None])
+        with self.assertNumQueries(0):
+            instance = queryset[1]
+            self.assertEqual(instance, other_sealion)
+            self.assertIs(queryset[1], instance)
+            self.assertEqual(instance.location, self.location)
+        self.assertEqual(queryset._result_cache._objs, [None, instance])
+        self.assertTrue(instance._state.sealed)
+        self.assertTrue(instance.location._state.sealed)
+        message = (
+            'Attempt to fetch deferred field "weight" on sealed <SeaLion instance>'
+        )
+        with self.assertWarnsMessage(UnsealedAttributeAccess, message):
+            instance.weight
+        with self.assertNumQueries(0):
+            self.assertEqual(queryset[:1], [self.sealion])
+            self.assertEqual(list(queryset), [self.sealion, other_sealion])
+
+    def test_sealed_lazy_interactions(self):
+        queryset = SeaLion.objects.select_related("location").seal(lazy=True)
+        with self.assertNumQueries(1):
+            self.assertEqual(queryset.get(), self.sealion)
+        with self.assertNumQueries(1):
+            self.assertFalse(queryset.filter(height=5))
+        results = list(
+            SeaLion.objects.seal(lazy=True, intern=True).select_related("location")
+        )
+        self.assertEqual(results, [self.sealion])
+        with self.assertNumQueries(2):
+            (instance,) = SeaLion.objects.prefetch_related("previous_locations").seal(
+                lazy=True
+            )
+        with self.assertNumQueries(0):
+            self.assertSequenceEqual(instance.previous_locations.all(), [self.location])
+        queryset = SeaLion.objects.seal(lazy=True)
+        len(queryset)
+        queryset = pickle.loads(pickle.dumps(queryset))
+        self.assertEqual(queryset._result_cache, [self.sealion])
+        self.assertTrue(queryset._result_cache[0]._state.sealed)
+
+    def test_sealed_shared_deferred_fields(self):
+        SeaLion.objects.create(height=2, weight=200)
+        first, second = SeaLion.objects.defer("weight", "leak").seal()
+        self.assertEqual(first.get_deferred_fields(), {"weight", "leak_id"})
+        self.assertIs(first.get_deferred_fields(), second.get_deferred_fields())
+        second.weight = 300
+        self.assertEqual(second.get_deferred_fields(), {"leak_id"})
+        self.assertEqual(first.get_deferred_fields(), {"weight", "leak_id"})
+        (instance,) = SeaLion.objects.seal().raw("SELECT id FROM tests_sealion")[:1]
+        self.assertIn("weight", instance.get_deferred_fields())
+
+    def test_sealed_shared_deferred_fields_parent_link(self):
+        with self.assertNumQueries(1):
+            instances = list(GreatSeaLion.objects.seal())
+        with self.assertNumQueries(0):
+            self.assertEqual(instances[0].sealion_ptr, self.sealion)
+        instance = GreatSeaLion.objects.defer("weight").seal().get()
+        self.assertEqual(instance.get_deferred_fields(), {"weight"})
+        message = 'Attempt to fetch related field "sealion_ptr" on sealed <GreatSeaLion instance>'
+        with self.assertWarnsMessage(UnsealedAttributeAccess, message):
+            instance.sealion_ptr
+
+    def test_sealed_track_changes(self):
+        queryset = SeaLion.objects.seal(track_changes=True)
+        self.assertIs(queryset.all()._seal_track_changes, True)
+        (instance,) = queryset
+        self.assertEqual(instance.get_dirty_fields(), [])
+        (instance,) = SeaLion.objects.seal(track_changes=True, lazy=True)
+        self.assertEqual(instance.get_dirty_fields(), [])
+        instance = SeaLion.objects.seal(track_changes=True).columnar().row(0)
+        self.assertEqual(instance.get_dirty_fields(), [])
+        (instance,) = SeaLion.objects.seal()
+        self.assertIsNone(instance.get_dirty_fields())
+
+    def test_bulk_save(self):
+        SeaLion.objects.create(height=2, weight=200)
+        SeaLion.objects.create(height=3, weight=300)
+        first, second, third = (
+            SeaLion.objects.order_by("pk").seal(track_changes=True).only("height")
+        )
+        first.height = 10
+        second.height = 20
+        third.location = None
+        with self.assertNumQueries(2):
+            self.assertEqual(SeaLion.objects.bulk_save([first, second, third]), 3)
+        self.assertEqual(
+            list(SeaLion.objects.order_by("pk").values_list("height", "location")),
+            [(10, self.location.pk), (20, None), (3, None)],
+        )
+        with self.assertNumQueries(0):
+            self.assertEqual(SeaLion.objects.bulk_save([first, second, third]), 0)
+
+    def test_bulk_save_untracked(self):
+        (instance,) = SeaLion.objects.seal()
+        message = (
+            "bulk_save() can only be used with instances retrieved from a queryset "
+            "sealed with track_changes=True."
+        )
+        with self.assertRaisesMessage(ValueError, message):
+            SeaLion.objects.bulk_save([instance])
+
+    def test_profile(self):
+        queryset = SeaLion.objects.profile("list")
+        self.assertTrue(issubclass(queryset._iterable_class, SealedModelIterable))
+        with self.assertNumQueries(1):
+            (instance,) = queryset
+        with self.assertNumQueries(0):
+            self.assertEqual(instance.location.latitude, self.location.latitude)
+        self.assertEqual(
+            instance.get_deferred_fields(), {"weight", "leak_id", "leak_o2o_id"}
+        )
+        self.assertEqual(instance.location.get_deferred_fields(), {"longitude"})
+        self.assertTrue(instance.location._state.sealed)
+        message = (
+            'Attempt to fetch deferred field "weight" on sealed <SeaLion instance>'
+        )
+        with self.assertRaisesMessage(UnsealedAttributeAccess, message):
+            instance.weight
+
+    def test_profile_seal_options(self):
+        queryset = SeaLion.objects.filter(pk=self.sealion.pk).profile("detail")
+        self.assertIs(queryset._seal_intern, True)
+        with self.assertNumQueries(2):
+            (instance,) = queryset
+        with self.assertNumQueries(0):
+            self.assertEqual(instance.location, self.location)
+            self.assertSequenceEqual(instance.previous_locations.all(), [self.location])
+
+    def test_profile_walker_plan(self):
+        queryset = SeaLion.objects.profile("detail")
+        profile = queryset._seal_profile
+        self.assertIs(SeaLion.objects.profile("detail")._seal_profile, profile)
+        walker = queryset._iterable_class(queryset)._get_related_walker()
+        self.assertIs(walker.keywords["getters"], profile.select_related_getters)
+        # Altering the select_related of a profiled queryset builds a new plan.
+        queryset = queryset.select_related("leak")
+        walker = queryset._iterable_class(queryset)._get_related_walker()
+        self.assertIsNot(walker.keywords["getters"], profile.select_related_getters)
+        (instance,) = queryset
+        self.assertTrue(instance.leak._state.sealed)
+
+    def test_unknown_profile(self):
+        message = "SeaLion has no fetch profile named 'unknown'."
+        with self.assertRaisesMessage(ValueError, message):
+            SeaLion.objects.profile("unknown")
+
+    def test_fields_profile(self):
+        fields = {
+            "height": None,
+            "location": {"latitude": None},
+            "previous_locations": {"climates": ["temperature"]},
+            "gull": {"nicknames": ["name"]},
+            "leak": None,
+            # Attributes that are not fields are ignored.
+            "natural_key": None,
+        }
+        profile = get_fields_fetch_profile(SeaLion, fields)
+        self.assertIs(get_fields_fetch_profile(SeaLion, dict(fields)), profile)
+        queryset = SeaLion.objects.filter(pk=self.sealion.pk).profile(profile)
+        with self.assertNumQueries(4):
+            (instance,) = queryset
+        with self.assertNumQueries(0):
+            self.assertEqual(instance.height, 1)
+            self.assertEqual(instance.leak_id, self.leak.pk)
+            self.assertEqual(instance.location.latitude, self.location.latitude)
+            (location,) = instance.previous_locations.all()
+            self.assertEqual(location.climates.all()[0].temperature, 100)
+            self.assertEqual(instance.gull.nicknames.all()[0].name, self.nickname.name)
+        self.assertEqual(instance.location.get_deferred_fields(), {"longitude"})
+        self.assertEqual(location.get_deferred_fields(), {"latitude", "longitude"})
+        message = (
+            'Attempt to fetch deferred field "weight" on sealed <SeaLion instance>'
+        )
+        with self.assertRaisesMessage(UnsealedAttributeAccess, message):
+            instance.weight
+        message = 'Attempt to fetch related field "leak" on sealed <SeaLion instance>'
+        with self.assertRaisesMessage(UnsealedAttributeAccess, message):
+            instance.leak
+
+    def test_fields_profile_serializer(self):
+        serializer = SimpleNamespace(
+            fields={
+                "height": SimpleNamespace(source="height"),
+                "latitude": SimpleNamespace(source="location.latitude"),
+                "password": SimpleNamespace(source="weight", write_only=True),
+                "locations": SimpleNamespace(
+                    source="previous_locations",
+                    child=SimpleNamespace(
+                        fields={"longitude": SimpleNamespace(source="longitude")}
+                    ),
+                ),
+            }
+        )
+        self.assertEqual(
+            get_serializer_declaration(serializer),
+            {
+                "height": None,
+                "location": {"latitude": None},
+                "previous_locations": {"longitude": None},
+            },
+        )
+        profile = get_fields_fetch_profile(SeaLion, serializer)
+        self.assertEqual(profile.only, ("height", "location", "location__latitude"))
+        self.assertEqual(profile.select_related, ("location",))
+        (prefetch,) = profile.prefetch_related
+        self.assertEqual(prefetch.prefetch_through, "previous_locations")
+        with self.assertNumQueries(2):
+            (instance,) = SeaLion.objects.filter(pk=self.sealion.pk).profile(profile)
+        with self.assertNumQueries(0):
+            self.assertEqual(instance.location.latitude, self.location.latitude)
+            self.assertEqual(
+                instance.previous_locations.all()[0].longitude, self.location.longitude
+            )
+
+    def test_fields_profile_serializer_class(self):
+        class SeaLionSerializer:
+            instances = 0
+            fields = {"height": SimpleNamespace(source="height")}
+
+            def __init__(self):
+                SeaLionSerializer.instances += 1
+
+        profile = get_fields_fetch_profile(SeaLion, SeaLionSerializer)
+        self.assertEqual(profile.only, ("height",))
+        self.assertIs(get_fields_fetch_profile(SeaLion, SeaLionSerializer), profile)
+        self.assertEqual(SeaLionSerializer.instances, 1)
+
     def test_related_sealed_pickleability(self):
         location = Location.objects.prefetch_related("climates").seal().get()
         climates_dump = pickle.dumps(location.climates.all())
@@ -547,6 +970,294 @@ class SealableQuerySetTests(TestCase):
             self.assertEqual(list(climates)[0], self.climate)
 
 
+class PrefetchedRelatedQuerySetTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.location = Location.objects.create(latitude=51.585474, longitude=156.634331)
+        cls.leak = Leak.objects.create(description="Salt water")
+        cls.sealions = [
+            SeaLion.objects.create(
+                height=height, weight=weight, location=cls.location, leak=leak
+            )
+            for height, weight, leak in [
+                (3, 100, cls.leak),
+                (1, 200, None),
+                (2, 100, cls.leak),
+            ]
+        ]
+
+    def setUp(self):
+        warnings.filterwarnings("error", category=UnsealedAttributeAccess)
+        self.addCleanup(warnings.resetwarnings)
+
+    def get_location(self, *lookups):
+        return (
+            Location.objects.prefetch_related(*(lookups or ["visitors"])).seal().get()
+        )
+
+    def test_filter(self):
+        location = self.get_location()
+        first, second, third = self.sealions
+        with self.assertNumQueries(0):
+            self.assertEqual(list(location.visitors.filter(weight=100)), [first, third])
+            self.assertEqual(
+                list(location.visitors.filter(height__in=[1, 3])), [first, second]
+            )
+            self.assertEqual(
+                list(location.visitors.filter(height__gt=1, height__lte=3)),
+                [first, third],
+            )
+            self.assertEqual(list(location.visitors.filter(leak=None)), [second])
+            self.assertEqual(
+                list(location.visitors.filter(leak=self.leak)), [first, third]
+            )
+            self.assertEqual(
+                list(location.visitors.filter(leak_id__isnull=False)), [first, third]
+            )
+            self.assertEqual(
+                list(location.visitors.filter(Q(height=1) | Q(height=2))),
+                [second, third],
+            )
+            self.assertEqual(
+                list(location.visitors.filter(weight=100).exclude(height=3)), [third]
+            )
+            self.assertEqual(list(location.visitors.exclude(leak=self.leak)), [second])
+            self.assertFalse(location.visitors.filter(height__lt=1).exists())
+
+    def test_order_by(self):
+        location = self.get_location()
+        first, second, third = self.sealions
+        with self.assertNumQueries(0):
+            self.assertEqual(
+                list(location.visitors.order_by("height")), [second, third, first]
+            )
+            self.assertEqual(
+                list(location.visitors.order_by("weight", "-height")),
+                [first, third, second],
+            )
+            self.assertEqual(
+                list(location.visitors.order_by("-leak_id", "-pk")),
+                [third, first, second],
+            )
+            self.assertEqual(location.visitors.order_by("height")[1], third)
+            self.assertEqual(location.visitors.order_by("height").first(), second)
+            self.assertEqual(location.visitors.order_by("height").last(), first)
+            self.assertEqual(location.visitors.first(), first)
+            self.assertEqual(location.visitors.last(), third)
+
+    def test_order_by_nulls_largest(self):
+        location = self.get_location()
+        first, second, third = self.sealions
+        with mock.patch.object(
+            connection.features, "nulls_order_largest", True
+        ), self.assertNumQueries(0):
+            self.assertEqual(
+                list(location.visitors.order_by("leak_id", "pk")),
+                [first, third, second],
+            )
+            self.assertEqual(
+                list(location.visitors.order_by("-leak_id", "-pk")),
+                [second, third, first],
+            )
+
+    def test_get(self):
+        location = self.get_location()
+        first, second, third = self.sealions
+        with self.assertNumQueries(0):
+            self.assertEqual(location.visitors.get(pk=second.pk), second)
+            self.assertEqual(location.visitors.get(id=str(third.pk)), third)
+            self.assertEqual(location.visitors.get(height=3), first)
+            with self.assertRaisesMessage(
+                SeaLion.DoesNotExist, "SeaLion matching query does not exist."
+            ):
+                location.visitors.get(pk=0)
+            with self.assertRaisesMessage(
+                SeaLion.DoesNotExist, "SeaLion matching query does not exist."
+            ):
+                location.visitors.get(height=4)
+            with self.assertRaisesMessage(
+                SeaLion.MultipleObjectsReturned,
+                "get() returned more than one SeaLion -- it returned 2!",
+            ):
+                location.visitors.get(weight=100)
+            self.assertEqual(location.visitors.in_bulk([first.pk]), {first.pk: first})
+
+    def test_many_to_many(self):
+        sealion = self.sealions[0]
+        sealion.previous_locations.add(self.location)
+        sealion = (
+            SeaLion.objects.prefetch_related("previous_locations")
+            .seal()
+            .get(pk=sealion.pk)
+        )
+        with self.assertNumQueries(0):
+            self.assertEqual(
+                sealion.previous_locations.get(pk=self.location.pk), self.location
+            )
+            self.assertEqual(
+                list(sealion.previous_locations.filter(latitude__gt=50)),
+                [self.location],
+            )
+
+    def test_unsupported(self):
+        location = self.get_location()
+        message = 'Attempt to fetch many-to-many field "visitors" on sealed <Location instance>.'
+        with self.assertNumQueries(0):
+            queryset = location.visitors.filter(weight=F("height"))
+        with self.assertRaisesMessage(UnsealedAttributeAccess, message):
+            list(queryset)
+        with self.assertRaisesMessage(UnsealedAttributeAccess, message):
+            list(location.visitors.filter(previous_locations__latitude=1))
+        with self.assertRaisesMessage(UnsealedAttributeAccess, message):
+            list(location.visitors.order_by("location__latitude"))
+        with self.assertRaisesMessage(UnsealedAttributeAccess, message):
+            list(location.visitors.values_list("height"))
+        warnings.filterwarnings("ignore", category=UnsealedAttributeAccess)
+        with self.assertNumQueries(1):
+            self.assertEqual(
+                list(location.visitors.filter(height__range=(1, 2))),
+                self.sealions[1:],
+            )
+
+    def test_deferred_fields(self):
+        location = self.get_location(
+            Prefetch("visitors", SeaLion.objects.only("height", "location"))
+        )
+        with self.assertNumQueries(0):
+            self.assertEqual(
+                list(location.visitors.filter(height=1)), [self.sealions[1]]
+            )
+        with self.assertRaises(UnsealedAttributeAccess):
+            list(location.visitors.filter(weight=100))
+
+    def test_unsealed(self):
+        location = Location.objects.prefetch_related("visitors").get()
+        with self.assertNumQueries(1):
+            self.assertEqual(
+                list(location.visitors.filter(height=1)), [self.sealions[1]]
+            )
+
+    def test_aggregate(self):
+        location = self.get_location()
+        with self.assertNumQueries(0):
+            self.assertEqual(location.visitors.count(), 3)
+            self.assertIs(location.visitors.exists(), True)
+            self.assertEqual(
+                location.visitors.aggregate(
+                    Sum("weight"),
+                    Min("height"),
+                    Max("height"),
+                    Count("leak"),
+                    Count("weight", distinct=True),
+                    total=Count("*"),
+                ),
+                {
+                    "weight__sum": 400,
+                    "height__min": 1,
+                    "height__max": 3,
+                    "leak__count": 2,
+                    "weight__count": 2,
+                    "total": 3,
+                },
+            )
+            self.assertEqual(
+                location.visitors.filter(height=0).aggregate(
+                    Sum("weight"), Max("height", default=0)
+                ),
+                {"weight__sum": None, "height__max": 0},
+            )
+        message = 'Attempt to fetch many-to-many field "visitors" on sealed <Location instance>.'
+        with self.assertRaisesMessage(UnsealedAttributeAccess, message):
+            location.visitors.aggregate(Avg("weight"))
+        with self.assertRaisesMessage(UnsealedAttributeAccess, message):
+            location.visitors.aggregate(Sum("weight", filter=Q(height=1)))
+
+    def test_aggregate_annotations(self):
+        location = (
+            Location.objects.annotate(
+                Count("visitors"),
+                Sum("visitors__weight"),
+                visitors__exists=Exists(
+                    SeaLion.objects.filter(location=OuterRef("pk"))
+                ),
+            )
+            .seal()
+            .get()
+        )
+        with self.assertNumQueries(0):
+            self.assertEqual(location.visitors.count(), 3)
+            self.assertIs(location.visitors.exists(), True)
+            self.assertEqual(
+                location.visitors.aggregate(Sum("weight")), {"weight__sum": 400}
+            )
+            self.assertEqual(
+                location.visitors.aggregate(total=Sum("weight")), {"total": 400}
+            )
+        location = Location.objects.annotate(Count("previous_visitors")).seal().get()
+        with self.assertNumQueries(0):
+            self.assertEqual(location.previous_visitors.count(), 0)
+            self.assertIs(location.previous_visitors.exists(), False)
+        message = 'Attempt to fetch many-to-many field "visitors" on sealed <Location instance>.'
+        with self.assertRaisesMessage(UnsealedAttributeAccess, message):
+            location.visitors.count()
+
+    def test_aggregate_annotations_unsupported(self):
+        location = Location.objects.annotate(Sum("visitors__weight")).seal().get()
+        with self.assertRaises(UnsealedAttributeAccess):
+            location.visitors.aggregate(Sum("weight", filter=Q(height=1)))
+        with self.assertRaises(UnsealedAttributeAccess):
+            location.visitors.aggregate(Sum("weight", distinct=True))
+
+    def test_aggregate_annotations_mutated(self):
+        location = (
+            Location.objects.annotate(Count("visitors"), Count("previous_visitors"))
+            .seal()
+            .get()
+        )
+        location.previous_visitors.add(self.sealions[0])
+        with self.assertRaises(UnsealedAttributeAccess):
+            location.previous_visitors.count()
+        self.assertEqual(location.visitors.count(), 3)
+        location.visitors.create(height=4, weight=100)
+        with self.assertRaises(UnsealedAttributeAccess):
+            location.visitors.count()
+
+    def test_aggregate_unavailable(self):
+        location = Location.objects.seal().get()
+        for method in ["count", "exists"]:
+            with self.subTest(method=method):
+                message = 'Attempt to fetch many-to-many field "visitors" on sealed <Location instance>.'
+                with self.assertRaisesMessage(UnsealedAttributeAccess, message):
+                    getattr(location.visitors, method)()
+                message = 'Attempt to fetch many-to-many field "previous_visitors" on sealed <Location instance>.'
+                with self.assertRaisesMessage(UnsealedAttributeAccess, message):
+                    getattr(location.previous_visitors, method)()
+        with self.assertRaisesMessage(UnsealedAttributeAccess, message):
+            location.previous_visitors.aggregate(Sum("weight"))
+        warnings.filterwarnings("ignore", category=UnsealedAttributeAccess)
+        with self.assertNumQueries(1):
+            self.assertEqual(location.visitors.count(), 3)
+
+    def test_write(self):
+        location = self.get_location("previous_visitors", "visitors")
+        first, second, third = self.sealions
+        location.visitors.filter(height=2).update(weight=300)
+        location.visitors.all().update(leak=None)
+        self.assertEqual(SeaLion.objects.filter(leak=None, weight=300).get(), third)
+        location.visitors.filter(height=1).delete()
+        location.visitors.filter(weight__gt=200).delete()
+        self.assertEqual(list(SeaLion.objects.all()), [first])
+        location.visitors.all().delete()
+        location.previous_visitors.all().delete()
+        self.assertEqual(SeaLion.objects.count(), 0)
+
+    def test_pickling(self):
+        location = self.get_location()
+        visitors = pickle.loads(pickle.dumps(location.visitors.filter(weight=100)))
+        with self.assertNumQueries(0):
+            self.assertEqual(visitors.get(height=2), self.sealions[2])
+
+
 class SealableQuerySetInteractionTests(SimpleTestCase):
     def test_values_seal_disallowed(self):
         with self.assertRaisesMessage(
@@ -560,6 +1271,18 @@ class SealableQuerySetInteractionTests(SimpleTestCase):
         ):
             SeaGull.objects.values_list("id").seal()
 
+    def test_values_columnar_disallowed(self):
+        with self.assertRaisesMessage(
+            TypeError, "Cannot call columnar() after .values() or .values_list()"
+        ):
+            SeaGull.objects.values("id").columnar()
+
+    def test_prefetch_related_columnar_disallowed(self):
+        with self.assertRaisesMessage(
+            TypeError, "Cannot call columnar() after .prefetch_related()"
+        ):
+            SeaGull.objects.prefetch_related("nicknames").columnar()
+
     def test_seal_sealable_model_iterable_subclass(self):
         class SealableModelIterableSubclass(SealedModelIterable):
             pass
@@ -575,6 +1298,322 @@ class SealableQuerySetInteractionTests(SimpleTestCase):
         with self.assertRaisesMessage(TypeError, message):
             SeaGull.objects.seal(iterable_class=ModelIterable)
 
+    def test_raw_seal_non_sealed_raw_model_iterable_subclass(self):
+        message = (
+            "iterable_class <class 'django.db.models.query.RawModelIterable'> "
+            "is not a subclass of SealedRawModelIterable"
+        )
+        with self.assertRaisesMessage(TypeError, message):
+            SeaGull.objects.raw("SELECT id FROM tests_seagull").seal(
+                iterable_class=RawModelIterable
+            )
+
+    def test_raw_seal_sealed_raw_model_iterable_subclass(self):
+        class SealedRawModelIterableSubclass(SealedRawModelIterable):
+            pass
+
+        queryset = SeaGull.objects.raw("SELECT id FROM tests_seagull").seal(
+            iterable_class=SealedRawModelIterableSubclass
+        )
+        self.assertIs(queryset._iterable_class, SealedRawModelIterableSubclass)
+
+
+class SealableQuerySetConcurrentPrefetchTests(TransactionTestCase):
+    available_apps = ["django.contrib.contenttypes", "seal", "tests"]
+
+    def setUp(self):
+        warnings.filterwarnings("error", category=UnsealedAttributeAccess)
+        self.addCleanup(warnings.resetwarnings)
+        self.location = Location.objects.create(
+            latitude=51.585474, longitude=156.634331
+        )
+        self.climate = Climate.objects.create(temperature=100)
+        self.location.climates.add(self.climate)
+        self.sealion = SeaLion.objects.create(
+            height=1, weight=100, location=self.location
+        )
+        self.sealion.previous_locations.add(self.location)
+        self.gull = SeaGull.objects.create(sealion=self.sealion)
+        self.queryset = SeaLion.objects.prefetch_related(
+            "previous_locations",
+            "gull",
+            "location",
+            Prefetch("location__climates", Climate.objects.order_by("pk")),
+        )
+
+    def assertPrefetched(self, instance):
+        with self.assertNumQueries(0):
+            self.assertSequenceEqual(instance.previous_locations.all(), [self.location])
+            self.assertEqual(instance.gull, self.gull)
+            self.assertEqual(instance.location, self.location)
+            self.assertSequenceEqual(instance.location.climates.all(), [self.climate])
+        self.assertTrue(instance.previous_locations.all()[0]._state.sealed)
+
+    def test_concurrent_prefetch(self):
+        # Prefetch queries are performed on distinct connections.
+        with self.assertNumQueries(1):
+            instance = self.queryset.seal(concurrent_prefetch=True).get()
+        self.assertPrefetched(instance)
+
+    def test_concurrent_prefetch_single_valued(self):
+        for height in range(2, 10):
+            sealion = SeaLion.objects.create(
+                height=height, weight=100, location=self.location
+            )
+            SeaGull.objects.create(sealion=sealion)
+        instances = list(SeaLion.objects.order_by("pk"))
+        fields_caches = []
+
+        def prefetch_related_objects_task(instances, lookups):
+            fields_caches.append(
+                [instance._state.__dict__.get("fields_cache") for instance in instances]
+            )
+            _prefetch_related_objects_task(instances, lookups)
+
+        with mock.patch(
+            "seal.query._prefetch_related_objects_task", prefetch_related_objects_task
+        ):
+            prefetch_related_objects_concurrently(instances, [["gull"], ["location"]])
+        # Related fields caches are initialized before lookups are dispatched.
+        self.assertNotIn(None, fields_caches[0])
+        with self.assertNumQueries(0):
+            for instance in instances:
+                self.assertEqual(instance.location, self.location)
+                self.assertEqual(instance.gull.sealion_id, instance.pk)
+
+    def test_concurrent_prefetch_connections_closed(self):
+        instances = list(SeaLion.objects.all())
+        with mock.patch("seal.workers.close_old_connections") as close_old_connections:
+            _prefetch_related_objects_task(instances, ["location"])
+            self.assertEqual(close_old_connections.call_count, 1)
+            with self.assertRaises(AttributeError):
+                _prefetch_related_objects_task(instances, ["unknown"])
+            self.assertEqual(close_old_connections.call_count, 2)
+
+    def test_concurrent_prefetch_atomic(self):
+        with transaction.atomic(), self.assertNumQueries(5):
+            instance = self.queryset.seal(concurrent_prefetch=True).get()
+        self.assertPrefetched(instance)
+
+    def test_group_prefetch_lookups(self):
+        groups = group_prefetch_lookups(
+            [
+                "location",
+                "previous_locations",
+                Prefetch("gull", to_attr="seagull"),
+                "location__climates",
+                "seagull__nicknames",
+            ]
+        )
+        self.assertEqual(
+            [[lookup.prefetch_to for lookup in lookups] for lookups in groups],
+            [
+                ["previous_locations"],
+                ["location", "location__climates"],
+                ["seagull", "seagull__nicknames"],
+            ],
+        )
+
+
+def get_sealion_location(sealion):
+    return sealion.pk, sealion._state.sealed, sealion.location.latitude
+
+
+class SealableQuerySetParallelMapTests(TransactionTestCase):
+    available_apps = ["django.contrib.contenttypes", "seal", "tests"]
+
+    def setUp(self):
+        warnings.filterwarnings("error", category=UnsealedAttributeAccess)
+        self.addCleanup(warnings.resetwarnings)
+        self.location = Location.objects.create(
+            latitude=51.585474, longitude=156.634331
+        )
+        self.sealions = [
+            SeaLion.objects.create(height=height, weight=100, location=self.location)
+            for height in range(10)
+        ]
+        self.executor = ThreadPoolExecutor(max_workers=2)
+        self.addCleanup(self.executor.shutdown)
+
+    def test_parallel_map(self):
+        queryset = SeaLion.objects.select_related("location")
+        with self.assertNumQueries(1):
+            results = list(
+                queryset.parallel_map(
+                    get_sealion_location, partitions=3, executor=self.executor
+                )
+            )
+        self.assertEqual(
+            results,
+            [(sealion.pk, True, self.location.latitude) for sealion in self.sealions],
+        )
+
+    def test_parallel_map_unordered(self):
+        results = SeaLion.objects.select_related("location").parallel_map(
+            get_sealion_location, partitions=4, ordered=False, executor=self.executor
+        )
+        self.assertEqual(
+            sorted(pk for pk, _, _ in results),
+            [sealion.pk for sealion in self.sealions],
+        )
+
+    def test_parallel_map_sealed(self):
+        # Partitions are sealed in the workers.
+        results = SeaLion.objects.parallel_map(
+            get_sealion_location, partitions=2, executor=self.executor
+        )
+        message = (
+            'Attempt to fetch related field "location" on sealed <SeaLion instance>'
+        )
+        with self.assertRaisesMessage(UnsealedAttributeAccess, message):
+            list(results)
+
+    def test_parallel_map_processes(self):
+        if (
+            connection.vendor == "sqlite"
+            and connection.is_in_memory_db()
+            and multiprocessing.get_start_method() != "fork"
+        ):
+            self.skipTest("Only forked processes share an in-memory database.")
+        results = SeaLion.objects.select_related("location").parallel_map(
+            get_sealion_location, partitions=3
+        )
+        self.assertEqual(
+            list(results),
+            [(sealion.pk, True, self.location.latitude) for sealion in self.sealions],
+        )
+
+    def test_queryset_state_pickling(self):
+        queryset = SeaLion.objects.select_related("location").seal().filter(height=1)
+        with self.assertNumQueries(0):
+            state = pickle.loads(pickle.dumps(_get_queryset_state(queryset)))
+        self.assertIsNone(queryset._result_cache)
+        self.assertEqual(
+            _evaluate_partition_task(get_sealion_location, state),
+            [(self.sealions[1].pk, True, self.location.latitude)],
+        )
+
+    def test_parallel_map_atomic(self):
+        queryset = SeaLion.objects.filter(height__gte=5).select_related("location")
+        # Partitions are evaluated in the current process.
+        with transaction.atomic(), self.assertNumQueries(3):
+            results = list(
+                queryset.parallel_map(
+                    get_sealion_location, partitions=2, executor=self.executor
+                )
+            )
+        self.assertEqual(len(results), 5)
+
+    def test_get_pk_ranges(self):
+        first, last = self.sealions[0].pk, self.sealions[-1].pk
+        self.assertEqual(
+            get_pk_ranges(SeaLion.objects.all(), 2),
+            [(None, first + 5), (first + 5, None)],
+        )
+        # Ranges are not split further than the number of rows.
+        self.assertEqual(len(get_pk_ranges(SeaLion.objects.all(), 20)), 10)
+        self.assertEqual(
+            get_pk_ranges(SeaLion.objects.filter(pk=last), 3), [(None, None)]
+        )
+        self.assertEqual(get_pk_ranges(SeaLion.objects.none(), 3), [])
+
+    def test_parallel_map_disallowed(self):
+        message = "Cannot call parallel_map() after .values() or .values_list()"
+        with self.assertRaisesMessage(TypeError, message):
+            SeaLion.objects.values("pk").parallel_map(get_sealion_location)
+        message = "Cannot call parallel_map() after a slice has been taken."
+        with self.assertRaisesMessage(TypeError, message):
+            SeaLion.objects.all()[:5].parallel_map(get_sealion_location)
+
+
+class SealedRowBuilderTests(TestCase):
+    """
+    SealedRowBuilder must build the same instances as Django's ModelIterable.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.location = Location.objects.create(latitude=51.585474, longitude=156.634331)
+        cls.leak = Leak.objects.create(description="Salt water")
+        cls.sealion = SeaLion.objects.create(
+            height=1, weight=100, location=cls.location, leak=cls.leak
+        )
+        cls.sealion.previous_locations.add(cls.location)
+        SeaLion.objects.create(height=2, weight=200)
+        SeaGull.objects.create(sealion=cls.sealion)
+        SeaGull.objects.create()
+        GreatSeaLion.objects.create(height=3, weight=300, location=cls.location)
+
+    def get_state(self, obj, path=()):
+        """Return a comparable representation of obj and its related objects."""
+        if obj is None:
+            return None
+        if any(obj is path_obj for path_obj in path):
+            # One-to-one relationships cache a reference to their origin.
+            return (obj.__class__, obj.pk)
+        path += (obj,)
+        return (
+            obj.__class__,
+            obj._state.db,
+            obj._state.adding,
+            {name: value for name, value in obj.__dict__.items() if name != "_state"},
+            {
+                name: self.get_state(related_obj, path)
+                for name, related_obj in obj._state.fields_cache.items()
+            },
+        )
+
+    def assertBuildsSameInstances(self, queryset):
+        expected = list(ModelIterable(queryset))
+        compiler = queryset.query.get_compiler(using=queryset.db)
+        results = compiler.execute_sql()
+        builder = SealedRowBuilder(
+            compiler,
+            queryset.db,
+            known_related_objects=get_known_related_objects(queryset),
+        )
+        objs = [builder.build(row) for row in compiler.results_iter(results)]
+        self.assertTrue(objs)
+        self.assertEqual(
+            [self.get_state(obj) for obj in objs],
+            [self.get_state(obj) for obj in expected],
+        )
+        for obj in objs:
+            self.assertTrue(obj._state.sealed)
+
+    def test_plain(self):
+        self.assertBuildsSameInstances(SeaLion.objects.order_by("pk"))
+
+    def test_deferred(self):
+        self.assertBuildsSameInstances(
+            SeaLion.objects.only("height", "location__latitude")
+            .select_related("location")
+            .order_by("pk")
+        )
+
+    def test_select_related(self):
+        self.assertBuildsSameInstances(
+            SeaLion.objects.select_related("location", "leak", "gull").order_by("pk")
+        )
+        self.assertBuildsSameInstances(
+            SeaGull.objects.select_related("sealion__location").order_by("pk")
+        )
+
+    def test_annotations(self):
+        self.assertBuildsSameInstances(
+            SeaLion.objects.annotate(
+                Count("previous_locations"), double_height=F("height") * 2
+            ).order_by("pk")
+        )
+
+    def test_known_related_objects(self):
+        self.assertBuildsSameInstances(self.location.visitors.order_by("pk"))
+
+    def test_inheritance(self):
+        self.assertBuildsSameInstances(
+            GreatSeaLion.objects.select_related("location").order_by("pk")
+        )
+
 
 class SealableQuerySetNonSealableModelTests(TestCase):
     """
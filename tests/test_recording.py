@@ -0,0 +1,93 @@
+import warnings
+
+from django.test import TestCase
+
+from seal.exceptions import UnsealedAttributeAccess
+from seal.recording import profile_unsealed_accesses, record_unsealed_accesses
+
+from .models import Location, SeaLion
+
+
+class RecordingTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.location = Location.objects.create(latitude=51.585474, longitude=156.634331)
+        for height in range(3):
+            sealion = SeaLion.objects.create(
+                height=height, weight=100, location=cls.location
+            )
+            sealion.previous_locations.add(cls.location)
+
+    def setUp(self):
+        warnings.simplefilter("ignore", category=UnsealedAttributeAccess)
+        self.addCleanup(warnings.resetwarnings)
+
+    def test_record_unsealed_accesses(self):
+        sealion, *_ = SeaLion.objects.defer("weight").seal()
+        with record_unsealed_accesses() as outer:
+            sealion.weight
+            with record_unsealed_accesses() as inner:
+                sealion.location
+        self.assertEqual(
+            [(access.instance, access.name) for access in outer],
+            [(sealion, "weight"), (sealion, "location")],
+        )
+        self.assertEqual(
+            inner[0].message,
+            'Attempt to fetch related field "location" on sealed <SeaLion instance>.',
+        )
+        self.assertEqual(len(inner), 1)
+
+    def test_profile_unsealed_accesses(self):
+        sealions = SeaLion.objects.seal()
+        with profile_unsealed_accesses() as profile:
+            for sealion in sealions:
+                sealion.location
+            for sealion in sealions:
+                list(sealion.previous_locations.all())
+        location_cost, previous_locations_cost = sorted(
+            profile.costs.values(), key=lambda cost: cost.name
+        )
+        self.assertEqual(location_cost.model, SeaLion)
+        self.assertEqual(location_cost.name, "location")
+        self.assertEqual(location_cost.filename, __file__)
+        self.assertEqual(location_cost.function, "test_profile_unsealed_accesses")
+        self.assertEqual(location_cost.count, 3)
+        self.assertEqual(location_cost.queries, 3)
+        self.assertGreater(location_cost.db_time, 0)
+        self.assertGreaterEqual(location_cost.wall_time, location_cost.db_time)
+        self.assertEqual(previous_locations_cost.name, "previous_locations")
+        self.assertEqual(previous_locations_cost.count, 3)
+        self.assertEqual(previous_locations_cost.queries, 3)
+        self.assertEqual(previous_locations_cost.lineno, location_cost.lineno + 2)
+        self.assertEqual(
+            profile.ranked(),
+            sorted(
+                [location_cost, previous_locations_cost],
+                key=lambda cost: cost.db_time,
+                reverse=True,
+            ),
+        )
+
+    def test_profile_unrelated_queries(self):
+        sealion, *_ = SeaLion.objects.seal()
+        with profile_unsealed_accesses() as profile:
+            sealion.location
+            # Queries performed after an access are not attributed to it.
+            list(Location.objects.all())
+            self.helper(sealion)
+        (location_cost,) = profile.costs.values()
+        self.assertEqual(location_cost.queries, 1)
+
+    def helper(self, sealion):
+        list(Location.objects.all())
+
+    def test_profile_no_query(self):
+        sealion, *_ = SeaLion.objects.seal()
+        previous_locations = sealion.previous_locations.all()
+        with profile_unsealed_accesses(using=["default"]) as profile:
+            previous_locations[0:0]
+        self.assertEqual(
+            [(cost.name, cost.count, cost.queries) for cost in profile.ranked()],
+            [("previous_locations", 1, 0)],
+        )
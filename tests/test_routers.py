@@ -0,0 +1,116 @@
+import warnings
+
+from django.db import transaction
+from django.test import TransactionTestCase, override_settings
+
+from seal.exceptions import UnsealedAttributeAccess
+from seal.models import SealableManager
+from seal.routers import SealedReplicaRouter, pin_primary, unpin_primary
+
+from .models import Location, SeaLion
+
+
+@override_settings(
+    DATABASE_ROUTERS=["seal.routers.SealedReplicaRouter"],
+    SEAL_REPLICA_DATABASE="replica",
+)
+class SealedReplicaRouterTests(TransactionTestCase):
+    available_apps = ["django.contrib.contenttypes", "seal", "tests"]
+    databases = {"default", "replica"}
+    # Rows share primary keys between databases like on an actual replica.
+    reset_sequences = True
+
+    def setUp(self):
+        warnings.filterwarnings("error", category=UnsealedAttributeAccess)
+        self.addCleanup(warnings.resetwarnings)
+        self.addCleanup(unpin_primary)
+        # Distinct rows on each database tell which one was read from.
+        with self.settings(DATABASE_ROUTERS=[]):
+            for alias, height in [("default", 1), ("replica", 2)]:
+                location = Location.objects.using(alias).create(
+                    latitude=height, longitude=height
+                )
+                sealion = SeaLion.objects.using(alias).create(
+                    height=height, weight=height, location=location
+                )
+                sealion.previous_locations.add(location)
+
+    def test_unsealed_read(self):
+        self.assertEqual(SeaLion.objects.get().height, 1)
+
+    def test_sealed_read(self):
+        queryset = SeaLion.objects.seal()
+        self.assertEqual(queryset.db, "replica")
+        (sealion,) = queryset
+        self.assertEqual(sealion.height, 2)
+        self.assertEqual(sealion._state.db, "replica")
+        # Hints are not leaked to the original queryset.
+        self.assertEqual(SeaLion.objects.all().db, "default")
+
+    def test_sealed_prefetch(self):
+        with self.assertNumQueries(0, using="default"), self.assertNumQueries(
+            3, using="replica"
+        ):
+            (sealion,) = SeaLion.objects.prefetch_related(
+                "location", "previous_locations"
+            ).seal()
+        self.assertEqual(sealion.location.latitude, 2)
+        self.assertEqual(
+            [location.latitude for location in sealion.previous_locations.all()], [2]
+        )
+
+    def test_sealed_raw(self):
+        # Raw querysets are bound to the database of the queryset they are
+        # created from.
+        queryset = SeaLion.objects.raw("SELECT * FROM tests_sealion")
+        self.assertEqual(queryset.seal().db, "default")
+        queryset = SeaLion.objects.seal().raw("SELECT * FROM tests_sealion")
+        self.assertEqual(queryset.db, "replica")
+        self.assertEqual([sealion.height for sealion in queryset], [2])
+
+    def test_atomic(self):
+        with transaction.atomic():
+            self.assertEqual(SeaLion.objects.seal().get().height, 1)
+
+    def test_sticky(self):
+        Location.objects.create(latitude=3, longitude=3)
+        self.assertEqual(SeaLion.objects.seal().get().height, 1)
+        unpin_primary()
+        self.assertEqual(SeaLion.objects.seal().get().height, 2)
+        pin_primary()
+        self.assertEqual(SeaLion.objects.seal().get().height, 1)
+
+    def test_request_unpins(self):
+        pin_primary()
+        self.client.get("/")
+        self.assertEqual(SeaLion.objects.seal().get().height, 2)
+
+    def test_save_replica_instance(self):
+        sealion = SeaLion.objects.seal().get()
+        sealion.weight = 3
+        sealion.save()
+        self.assertEqual(sealion._state.db, "default")
+        self.assertEqual(SeaLion.objects.using("default").get(pk=sealion.pk).weight, 3)
+        self.assertEqual(SeaLion.objects.using("replica").get().weight, 2)
+
+    def test_relation_between_databases(self):
+        location = Location.objects.seal().get()
+        sealion = SeaLion(height=4, weight=4, location=location)
+        sealion.save()
+        self.assertEqual(sealion._state.db, "default")
+
+    def test_manager_override(self):
+        manager = SealableManager(seal=True, replica=False)
+        manager.model = SeaLion
+        self.assertEqual(manager.get_queryset().db, "default")
+        self.assertEqual(manager.get().height, 1)
+        manager = SealableManager(seal=True, replica="default")
+        manager.model = SeaLion
+        self.assertEqual(manager.get_queryset().db, "default")
+
+    def test_no_replica(self):
+        router = SealedReplicaRouter(replica="")
+        self.assertIsNone(router.db_for_read(SeaLion, sealed=True))
+        router = SealedReplicaRouter(primary="replica", replica="default")
+        self.assertEqual(router.db_for_read(SeaLion, sealed=True), "default")
+        self.assertIsNone(router.db_for_read(SeaLion))
@@ -0,0 +1,136 @@
+import pickle
+import warnings
+
+from django.db.models import Count, Prefetch
+from django.test import TestCase
+
+from seal.exceptions import UnsealedAttributeAccess
+from seal.serialization import dumps, loads
+
+from .models import (
+    Climate,
+    GreatSeaLion,
+    Island,
+    Leak,
+    Location,
+    SeaGull,
+    SeaLion,
+)
+
+
+class SerializationTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.location = Location.objects.create(latitude=51.585474, longitude=156.634331)
+        cls.climate = Climate.objects.create(temperature=100)
+        cls.location.climates.add(cls.climate)
+        cls.leak = Leak.objects.create(description="Salt water")
+        cls.sealions = [
+            SeaLion.objects.create(height=1, weight=100, location=cls.location),
+            SeaLion.objects.create(height=2, weight=200, location=cls.location),
+            GreatSeaLion.objects.create(height=3, weight=300, leak=cls.leak),
+        ]
+        cls.sealions[0].previous_locations.add(cls.location)
+        cls.gull = SeaGull.objects.create(sealion=cls.sealions[0])
+        cls.island = Island.objects.create(location=cls.location)
+
+    def setUp(self):
+        warnings.filterwarnings("error", category=UnsealedAttributeAccess)
+        self.addCleanup(warnings.resetwarnings)
+
+    def test_roundtrip(self):
+        sealions = list(
+            SeaLion.objects.select_related("location", "leak", "gull")
+            .prefetch_related("previous_locations__climates", "location__island_set")
+            .annotate(Count("previous_locations"))
+            .order_by("pk")
+            .seal(intern=True)
+        )
+        with self.assertNumQueries(0):
+            restored = loads(dumps(sealions))
+            self.assertEqual(restored, sealions)
+            first, second, third = restored
+            self.assertTrue(first._state.sealed)
+            self.assertEqual(first.weight, 100)
+            self.assertEqual(first.previous_locations__count, 1)
+            self.assertEqual(first.location, self.location)
+            # Shared objects are preserved.
+            self.assertIs(first.location, second.location)
+            self.assertIs(first.gull.sealion, first)
+            self.assertIsNone(third.location)
+            self.assertEqual(third.leak, self.leak)
+            self.assertEqual(list(first.previous_locations.all()), [self.location])
+            self.assertEqual(
+                list(first.previous_locations.all()[0].climates.all()), [self.climate]
+            )
+            self.assertEqual(
+                list(first.location.island_set.all()),
+                [self.island],
+            )
+            self.assertEqual(list(second.previous_locations.all()), [])
+            self.assertEqual(
+                first.previous_locations.get(pk=self.location.pk), self.location
+            )
+        self.assertTrue(first.location._state.sealed)
+        message = (
+            'Attempt to fetch many-to-many field "visitors" on sealed '
+            "<Location instance>."
+        )
+        with self.assertRaisesMessage(UnsealedAttributeAccess, message):
+            list(first.location.visitors.all())
+
+    def test_deferred_fields(self):
+        sealions = list(SeaLion.objects.only("height").order_by("pk").seal())
+        restored = loads(dumps(sealions))
+        self.assertEqual([sealion.height for sealion in restored], [1, 2, 3])
+        self.assertEqual(
+            restored[0].get_deferred_fields(), sealions[0].get_deferred_fields()
+        )
+        self.assertIs(
+            restored[0].get_deferred_fields(), restored[1].get_deferred_fields()
+        )
+        message = (
+            'Attempt to fetch deferred field "weight" on sealed <SeaLion instance>.'
+        )
+        with self.assertRaisesMessage(UnsealedAttributeAccess, message):
+            restored[0].weight
+
+    def test_to_attr(self):
+        locations = list(
+            Location.objects.prefetch_related(
+                Prefetch(
+                    "visitors", SeaLion.objects.order_by("pk"), to_attr="visitor_list"
+                ),
+                Prefetch("climates", to_attr="climate_list"),
+            ).seal()
+        )
+        with self.assertNumQueries(0):
+            (location,) = loads(dumps(locations))
+            self.assertEqual(location.visitor_list, self.sealions[:2])
+            self.assertEqual(location.climate_list, [self.climate])
+        self.assertTrue(location.visitor_list[0]._state.sealed)
+
+    def test_unsealed(self):
+        sealions = list(SeaLion.objects.select_related("location").order_by("pk"))
+        restored = loads(dumps(sealions))
+        self.assertFalse(getattr(restored[0]._state, "sealed", False))
+        self.assertEqual(restored[0].location, self.location)
+
+    def test_compact(self):
+        sealions = list(
+            SeaLion.objects.select_related("location").order_by("pk").seal(intern=True)
+        )
+        # Each distinct shape and instance is stored once.
+        _, labels, shapes, rows, roots = pickle.loads(dumps(sealions))
+        self.assertEqual(labels, ("tests.sealion", "tests.location"))
+        self.assertEqual(len(shapes), 2)
+        self.assertEqual(len(rows), 4)
+        self.assertEqual(roots, (0, 1, 2))
+        self.assertLess(len(dumps(sealions)), len(pickle.dumps(sealions)))
+
+    def test_version(self):
+        data = pickle.dumps((0, (), (), (), ()))
+        with self.assertRaisesMessage(
+            ValueError, "Unsupported serialization format version 0."
+        ):
+            loads(data)
@@ -0,0 +1,126 @@
+import warnings
+
+from django.template import Context, Engine
+from django.test import RequestFactory, TestCase
+
+from seal.exceptions import UnsealedAttributeAccess
+from seal.templating import (
+    TemplateAccess,
+    TemplateAccessReportMiddleware,
+    record_template_accesses,
+)
+
+from .models import Location, SeaLion
+
+SEALION_LIST = """<ul>
+{% for sealion in sealions %}
+  <li>{{ sealion.height }}
+  {% if sealion.location %}{{ sealion.location.latitude }}{% endif %}
+  {% for location in sealion.previous_locations.all %}{{ location.pk }}{% endfor %}
+  </li>
+{% endfor %}
+</ul>
+"""
+
+
+class TemplateAccessTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.location = Location.objects.create(latitude=51.585474, longitude=156.634331)
+        for height in range(3):
+            sealion = SeaLion.objects.create(
+                height=height, weight=100, location=cls.location
+            )
+            sealion.previous_locations.add(cls.location)
+
+    def setUp(self):
+        warnings.simplefilter("ignore", category=UnsealedAttributeAccess)
+        self.addCleanup(warnings.resetwarnings)
+        self.engine = Engine(
+            loaders=[
+                (
+                    "django.template.loaders.locmem.Loader",
+                    {
+                        "sealion_list.html": SEALION_LIST,
+                        "other.html": "{{ sealion.weight }}",
+                    },
+                )
+            ]
+        )
+
+    def render(self, template_name, **context):
+        return self.engine.get_template(template_name).render(Context(context))
+
+    def test_record(self):
+        sealions = SeaLion.objects.order_by("pk").seal()
+        with record_template_accesses() as report:
+            self.render("sealion_list.html", sealions=sealions)
+        self.assertEqual(len(report), 6)
+        self.assertEqual(
+            report.accesses[0],
+            TemplateAccess(
+                "sealion_list.html",
+                4,
+                "sealion.location",
+                "sealion",
+                "select_related('location')",
+                'Attempt to fetch related field "location" on sealed <SeaLion instance>.',
+            ),
+        )
+        self.assertEqual(
+            report.summary(),
+            [
+                ("sealion_list.html", 4, "select_related('location')", 3),
+                ("sealion_list.html", 5, "prefetch_related('previous_locations')", 3),
+            ],
+        )
+        self.assertEqual(
+            str(report),
+            "sealion_list.html:4 needs select_related('location') "
+            "(3 unsealed accesses)\n"
+            "sealion_list.html:5 needs prefetch_related('previous_locations') "
+            "(3 unsealed accesses)",
+        )
+
+    def test_record_fields(self):
+        sealion = SeaLion.objects.only("height").seal()[0]
+        with record_template_accesses() as report:
+            self.render("other.html", sealion=sealion)
+        self.assertEqual(report.summary(), [("other.html", 1, "field 'weight'", 1)])
+        self.assertIsNone(report.accesses[0].loop_variable)
+
+    def test_record_sealed(self):
+        sealions = (
+            SeaLion.objects.select_related("location")
+            .prefetch_related("previous_locations")
+            .seal()
+        )
+        with record_template_accesses() as report:
+            self.render("sealion_list.html", sealions=sealions)
+        self.assertEqual(len(report), 0)
+
+    def test_outside_template(self):
+        sealion = SeaLion.objects.seal()[0]
+        with record_template_accesses() as report:
+            sealion.location
+        self.assertEqual(len(report), 0)
+
+    def test_middleware(self):
+        sealions = SeaLion.objects.order_by("pk").seal()
+
+        def get_response(request):
+            return self.render("sealion_list.html", sealions=sealions)
+
+        middleware = TemplateAccessReportMiddleware(get_response)
+        request = RequestFactory().get("/sealions/")
+        with self.assertLogs("seal.templating", "WARNING") as logs:
+            middleware(request)
+        self.assertEqual(
+            [record.getMessage() for record in logs.records],
+            [
+                "sealion_list.html:4 needs select_related('location') "
+                "(3 unsealed accesses while rendering /sealions/).",
+                "sealion_list.html:5 needs prefetch_related('previous_locations') "
+                "(3 unsealed accesses while rendering /sealions/).",
+            ],
+        )
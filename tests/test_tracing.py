@@ -0,0 +1,181 @@
+import io
+import json
+import os
+import tempfile
+import time
+import warnings
+from functools import partial
+
+from django.db import connection, connections
+from django.db.models import Prefetch
+from django.test import TestCase, TransactionTestCase
+
+from seal.exceptions import UnsealedAttributeAccess
+from seal.query import SealedModelIterable
+from seal.tracing import (
+    PHASES,
+    InMemoryExporter,
+    JSONLinesExporter,
+    is_tracing,
+    trace_evaluations,
+)
+
+from .models import Location, SeaLion
+
+SLOW_FETCH_DELAY = 0.05
+
+
+class SlowFetchCursor:
+    def __init__(self, cursor):
+        self.cursor = cursor
+
+    def __getattr__(self, name):
+        return getattr(self.cursor, name)
+
+    def fetchmany(self, *args):
+        time.sleep(SLOW_FETCH_DELAY)
+        return self.cursor.fetchmany(*args)
+
+
+def slow_fetch(execute, sql, params, many, context):
+    cursor = context["cursor"]
+    cursor.cursor = SlowFetchCursor(cursor.cursor)
+    return execute(sql, params, many, context)
+
+
+class TracingTests(TestCase):
+    databases = {"default", "replica"}
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.location = Location.objects.create(latitude=51.585474, longitude=156.634331)
+        for height in range(3):
+            sealion = SeaLion.objects.create(
+                height=height, weight=100, location=cls.location
+            )
+            sealion.previous_locations.add(cls.location)
+
+    def setUp(self):
+        warnings.filterwarnings("error", category=UnsealedAttributeAccess)
+        self.addCleanup(warnings.resetwarnings)
+        self.queryset = (
+            SeaLion.objects.select_related("location")
+            .prefetch_related("previous_locations")
+            .seal()
+        )
+
+    def test_spans(self):
+        exporter = InMemoryExporter()
+        with trace_evaluations(exporter):
+            self.assertTrue(is_tracing())
+            sealions = list(self.queryset)
+        self.assertFalse(is_tracing())
+        # Child spans are exported first.
+        prefetch_span, span = exporter.spans
+        self.assertIs(span.model, SeaLion)
+        self.assertEqual(span.db, "default")
+        self.assertIsNone(span.parent_id)
+        self.assertEqual(span.rows, 3)
+        self.assertEqual(span.related_objects, 3)
+        self.assertEqual(set(span.phases), set(PHASES))
+        self.assertGreater(span.phases["sql"], 0)
+        self.assertGreater(span.phases["prefetch"], 0)
+        self.assertGreaterEqual(span.duration, span.phases["prefetch"])
+        self.assertIs(prefetch_span.model, Location)
+        self.assertEqual(prefetch_span.parent_id, span.id)
+        self.assertEqual(prefetch_span.rows, 3)
+        self.assertGreater(prefetch_span.phases["sql"], 0)
+        self.assertEqual(prefetch_span.phases["prefetch"], 0)
+        self.assertEqual(
+            repr(span), "<EvaluationSpan tests.SeaLion: 3 rows, %.6fs>" % span.duration
+        )
+        # Sealing guarantees are unchanged.
+        self.assertTrue(sealions[0].location._state.sealed)
+        with self.assertNumQueries(0):
+            self.assertEqual(
+                list(sealions[0].previous_locations.all()), [self.location]
+            )
+
+    def test_fetch_timed(self):
+        exporter = InMemoryExporter()
+        with connection.execute_wrapper(slow_fetch), trace_evaluations(exporter):
+            list(SeaLion.objects.seal())
+        (span,) = exporter.spans
+        self.assertGreaterEqual(span.phases["sql"], SLOW_FETCH_DELAY)
+
+    def test_other_database(self):
+        queryset = SeaLion.objects.prefetch_related(
+            Prefetch("previous_locations", Location.objects.using("replica"))
+        ).seal()
+        exporter = InMemoryExporter()
+        with connections["replica"].execute_wrapper(slow_fetch), trace_evaluations(
+            exporter
+        ):
+            list(queryset)
+        prefetch_span, span = exporter.spans
+        self.assertEqual(span.db, "default")
+        self.assertEqual(prefetch_span.db, "replica")
+        self.assertGreaterEqual(prefetch_span.phases["sql"], SLOW_FETCH_DELAY)
+
+    def test_unsealed(self):
+        exporter = InMemoryExporter()
+        with trace_evaluations(exporter):
+            list(SeaLion.objects.all())
+        self.assertEqual(exporter.spans, [])
+
+    def test_lazy(self):
+        exporter = InMemoryExporter()
+        with trace_evaluations(exporter):
+            sealions = list(SeaLion.objects.select_related("location").seal(lazy=True))
+        (span,) = exporter.spans
+        self.assertEqual(span.rows, 3)
+        self.assertEqual(span.related_objects, 0)
+        self.assertTrue(sealions[0].location._state.sealed)
+
+    def test_disabled(self):
+        iterable = SealedModelIterable(self.queryset)
+        self.assertIsInstance(iterable._get_related_walker(), partial)
+
+    def test_json_lines(self):
+        file = io.StringIO()
+        with trace_evaluations(JSONLinesExporter(file)):
+            list(self.queryset)
+        prefetch_span, span = map(json.loads, file.getvalue().splitlines())
+        self.assertEqual(span["model"], "tests.SeaLion")
+        self.assertEqual(span["rows"], 3)
+        self.assertEqual(span["related_objects"], 3)
+        self.assertEqual(set(span["phases"]), set(PHASES))
+        self.assertEqual(prefetch_span["model"], "tests.Location")
+        self.assertEqual(prefetch_span["parent_id"], span["id"])
+
+    def test_json_lines_path(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "spans.jsonl")
+            exporter = JSONLinesExporter(path)
+            with trace_evaluations(exporter):
+                list(SeaLion.objects.seal())
+                list(SeaLion.objects.seal())
+            exporter.close()
+            with open(path) as file:
+                self.assertEqual(len(file.readlines()), 2)
+
+
+class ConcurrentPrefetchTracingTests(TransactionTestCase):
+    def setUp(self):
+        location = Location.objects.create(latitude=51.585474, longitude=156.634331)
+        sealion = SeaLion.objects.create(height=1, weight=100, location=location)
+        sealion.previous_locations.add(location)
+
+    def test_spans(self):
+        exporter = InMemoryExporter()
+        with trace_evaluations(exporter):
+            list(
+                SeaLion.objects.prefetch_related("location", "previous_locations").seal(
+                    concurrent_prefetch=True
+                )
+            )
+        prefetch_span, span = exporter.spans
+        self.assertIs(prefetch_span.model, Location)
+        self.assertEqual(prefetch_span.parent_id, span.id)
+        self.assertEqual(prefetch_span.rows, 1)
+        self.assertGreater(prefetch_span.phases["sql"], 0)